@@ -0,0 +1 @@
+from paranoid_model.profiling import profile  # noqa: F401
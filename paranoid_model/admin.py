@@ -4,6 +4,7 @@ from django.http import HttpResponseRedirect
 from django.core.exceptions import ValidationError
 from django.contrib import messages
 from django.contrib.admin.actions import delete_selected
+from paranoid_model.audit import actor
 
 
 class ParanoidAdminFilter(admin.SimpleListFilter):
@@ -70,7 +71,8 @@ class ParanoidAdmin(admin.ModelAdmin):
         """
 
         if '_restore' in request.POST:
-            obj.restore()
+            with actor(request.user):
+                obj.restore()
 
             level, message = messages.SUCCESS, f'{obj.__str__()} restored.'
             log_message = 'Restored'
@@ -89,13 +91,11 @@ class ParanoidAdmin(admin.ModelAdmin):
 
         _return = super().delete_view(request, object_id, extra_context=None)
         if request.POST:
-            try:
-                obj = self.model.objects.get(pk=object_id)
-            except obj.SoftDeleted:
-                obj = self.model.objects.get_deleted(pk=object_id)
+            obj = self.model.objects.get(pk=object_id, with_deleted=True)
 
             hard_delete = 'hard_delete' in request.GET.keys()
-            obj.delete(hard_delete=hard_delete)
+            with actor(request.user):
+                obj.delete(hard_delete=hard_delete)
 
             report = 'Permanently deleted.' if hard_delete else 'Soft deleted.'
 
@@ -107,7 +107,8 @@ class ParanoidAdmin(admin.ModelAdmin):
         """
         Action method to restore every instance selected
         """
-        count = queryset.restore()
+        with actor(request.user):
+            count = queryset.restore()
         messages.add_message(request, messages.INFO, f'{count} restored.')
 
     def permanently_delete(self, request, queryset):
@@ -121,7 +122,8 @@ class ParanoidAdmin(admin.ModelAdmin):
         """
         Delete a queryset
         """
-        queryset.delete(hard_delete=self.hard_delete)
+        with actor(request.user):
+            queryset.delete(hard_delete=self.hard_delete)
         self.hard_delete = False
     hard_delete = False  # boolean for 'permanently delete' action
     # use django delete confirmation is pretty hard, so instaead of create
@@ -139,8 +141,6 @@ class ParanoidAdmin(admin.ModelAdmin):
         field = model._meta.pk if from_field is None else model._meta.get_field(from_field)
         try:
             object_id = field.to_python(object_id)
-            return queryset.get(**{field.name: object_id})
-        except model.SoftDeleted:
-            return queryset.get_deleted(**{field.name: object_id})
+            return queryset.get(with_deleted=True, **{field.name: object_id})
         except (model.DoesNotExist, ValidationError, ValueError):
             return None
@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class ParanoidModelConfig(AppConfig):
     name = 'paranoid_model'
+
+    def ready(self):
+        from paranoid_model import cache, counters
+        from paranoid_model.audit import enable_from_settings
+        enable_from_settings()
+        counters.connect()
+        cache.connect_all()
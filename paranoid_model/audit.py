@@ -0,0 +1,248 @@
+"""
+File with the optional audit log of Paranoid Model operations.
+Soft deletes, restores and purges are recorded per row, with the actor,
+and written to a sink once the operation has finished, in bulk writes of
+BATCH_SIZE records, never an insert per row inside the cascade.
+
+Enable it with setting AUDIT_SINK, or with ``paranoid_model.audit.enable()``.
+"""
+
+
+import abc
+import logging
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from itertools import islice
+
+from django.apps import apps
+from django.db import models, router
+from django.db.models.signals import post_delete
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from paranoid_model.conf import get_setting
+from paranoid_model.instrumentation import current_operation, stage, AUDIT, SOFT_DELETE, RESTORE, PURGE
+from paranoid_model.signals import paranoid_operation, post_soft_delete, post_restore, post_purge
+
+
+BATCH_SIZE = 1000
+
+AuditRecord = namedtuple('AuditRecord', 'action model pk using actor timestamp operation_id')
+
+_local = threading.local()
+_sink = None
+
+
+@contextmanager
+def actor(value):
+    """
+    Context manager to set who is making the operations on current thread
+    Args:
+        value: user or any object, recorded as ``str(value)``
+    """
+    previous = getattr(_local, 'actor', None)
+    _local.actor = value
+    try:
+        yield
+    finally:
+        _local.actor = previous
+
+
+def current_actor():
+    value = getattr(_local, 'actor', None)
+    return '' if value is None else str(value)
+
+
+class AuditSink(abc.ABC):
+    """
+    Destination of audit records.
+    Subclasses implement ``write()``.
+    """
+
+    @abc.abstractmethod
+    def write(self, records):
+        """
+        Write records of a single operation, called once per BATCH_SIZE records
+        Args:
+            records: list of AuditRecord
+        """
+
+
+class ModelSink(AuditSink):
+    """
+    Sink writing records with bulk_create to a concrete AbstractAuditEntry model
+    Args:
+        model: model class or 'app_label.ModelName'. Default {setting AUDIT_MODEL}
+        batch_size: int max amount of rows per INSERT
+    """
+
+    def __init__(self, model=None, batch_size=BATCH_SIZE):
+        self._model = model or get_setting('AUDIT_MODEL')
+        self.batch_size = batch_size
+
+    @property
+    def model(self):
+        if isinstance(self._model, str):
+            self._model = apps.get_model(self._model)
+        return self._model
+
+    def write(self, records):
+        self.model._default_manager.using(router.db_for_write(self.model)).bulk_create(
+            [
+                self.model(
+                    action=record.action,
+                    model=record.model._meta.label_lower,
+                    object_pk=str(record.pk),
+                    database=record.using,
+                    actor=record.actor,
+                    operation_id=record.operation_id,
+                    created_at=record.timestamp,
+                )
+                for record in records
+            ],
+            batch_size=self.batch_size,
+        )
+
+
+class LoggingSink(AuditSink):
+    """
+    Sink streaming records to a Python logger, one message per record
+    Args:
+        name: logger name. Default {'paranoid_model.audit'}
+    """
+
+    def __init__(self, name='paranoid_model.audit'):
+        self.logger = logging.getLogger(name)
+
+    def write(self, records):
+        for record in records:
+            self.logger.info(
+                '%s %s %s', record.action, record.model._meta.label_lower, record.pk,
+                extra={'audit': record._asdict()},
+            )
+
+
+class AbstractAuditEntry(models.Model):
+    """
+    Abstract model of an audit entry, used by ModelSink.
+    Attributes:
+        action: 'soft_delete', 'restore' or 'purge'
+        model: label of the model, like 'app_label.modelname'
+        object_pk: primary key of the row
+        database: database alias written
+        actor: who made the operation, see paranoid_model.audit.actor()
+        operation_id: UUID shared by every row of the same operation, cascade included
+        created_at: when the operation was made
+    """
+    ACTIONS = (
+        (SOFT_DELETE, 'Soft delete'),
+        (RESTORE, 'Restore'),
+        (PURGE, 'Purge'),
+    )
+
+    action = models.CharField(max_length=16, choices=ACTIONS)
+    model = models.CharField(max_length=255)
+    object_pk = models.CharField(max_length=255)
+    database = models.CharField(max_length=255)
+    actor = models.CharField(max_length=255, blank=True)
+    operation_id = models.UUIDField(db_index=True)
+    created_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        abstract = True
+
+
+def _buffer():
+    """Pending records of the operation running on current thread"""
+    operation = current_operation()
+    if getattr(_local, 'operation', None) is not operation:
+        _local.operation = operation
+        _local.pending = []
+    return _local.pending
+
+
+def _record(action, model, pks, using, timestamp):
+    if current_operation() is None:
+        return
+    _buffer().append((action, model, pks, using, current_actor(), timestamp))
+
+
+def _on_soft_delete(sender, pks, using, deleted_at, **kwargs):
+    _record(SOFT_DELETE, sender, pks, using, deleted_at)
+
+
+def _on_restore(sender, pks, using, updated_at=None, **kwargs):
+    _record(RESTORE, sender, pks, using, updated_at or timezone.now())
+
+
+def _on_purge(sender, instance, using, **kwargs):
+    _record(PURGE, sender, [instance.pk], using, timezone.now())
+
+
+def _on_fast_purge(sender, pks, using, **kwargs):
+    _record(PURGE, sender, pks, using, timezone.now())
+
+
+def _on_operation(sender, operation_id, **kwargs):
+    operation = getattr(_local, 'operation', None)
+    pending = getattr(_local, 'pending', [])
+    _local.operation, _local.pending = None, []
+    # records left by an operation that failed are discarded
+    if getattr(operation, 'id', None) != operation_id or not pending or _sink is None:
+        return
+
+    records = (
+        AuditRecord(action, model, pk, using, who, timestamp, operation_id)
+        for action, model, pks, using, who, timestamp in pending
+        for pk in pks
+    )
+    with stage(AUDIT):
+        chunk = list(islice(records, BATCH_SIZE))
+        while chunk:
+            _sink.write(chunk)
+            chunk = list(islice(records, BATCH_SIZE))
+
+
+def enable(sink):
+    """
+    Start recording operations of every Paranoid model
+    Args:
+        sink: AuditSink instance
+    """
+    from paranoid_model.cascade import is_paranoid
+
+    global _sink
+    _sink = sink
+
+    post_soft_delete.connect(_on_soft_delete, dispatch_uid='paranoid_model_audit')
+    post_restore.connect(_on_restore, dispatch_uid='paranoid_model_audit')
+    paranoid_operation.connect(_on_operation, dispatch_uid='paranoid_model_audit')
+
+    # Per model, so Django keeps fast deletes of other models
+    for model in apps.get_models():
+        if is_paranoid(model):
+            post_delete.connect(_on_purge, sender=model, dispatch_uid='paranoid_model_audit')
+            post_purge.connect(_on_fast_purge, sender=model, dispatch_uid='paranoid_model_audit')
+
+
+def disable():
+    """Stop recording operations"""
+    from paranoid_model.cascade import is_paranoid
+
+    global _sink
+    _sink = None
+
+    post_soft_delete.disconnect(dispatch_uid='paranoid_model_audit')
+    post_restore.disconnect(dispatch_uid='paranoid_model_audit')
+    paranoid_operation.disconnect(dispatch_uid='paranoid_model_audit')
+    for model in apps.get_models():
+        if is_paranoid(model):
+            post_delete.disconnect(sender=model, dispatch_uid='paranoid_model_audit')
+            post_purge.disconnect(sender=model, dispatch_uid='paranoid_model_audit')
+
+
+def enable_from_settings():
+    """Enable the audit log with setting AUDIT_SINK, if any"""
+    sink = get_setting('AUDIT_SINK')
+    if sink is not None:
+        enable(import_string(sink)() if isinstance(sink, str) else sink)
@@ -0,0 +1,265 @@
+"""
+File with the background execution of big cascades.
+A Paranoid model with ``paranoid_cascade_limits`` on its Meta soft deletes
+or restores at most that many rows, or levels, inside the request: when the
+cascade goes over a limit only the roots are written, and the rest of the
+cascade is saved as a job on a concrete AbstractCascadeJob model, setting
+CASCADE_JOB_MODEL, to be run later by ``run_pending()`` or the
+``paranoid_jobs`` management command.
+A job writes a single level of the cascade, a batch of roots at a time,
+and saves the level below as new jobs.
+"""
+
+
+import datetime
+import json
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+from paranoid_model.conf import get_setting
+from paranoid_model.instrumentation import SOFT_DELETE, RESTORE
+
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+MAX_ATTEMPTS = 3
+
+# roots written by a job on each transaction
+BATCH_SIZE = 500
+
+# how long a worker keeps a job, renewed after each batch
+LEASE = datetime.timedelta(minutes=5)
+
+
+class CascadeLimitExceeded(Exception):
+    """Cascade reached more rows or levels than model's paranoid_cascade_limits"""
+    pass
+
+
+class AbstractCascadeJob(models.Model):
+    """
+    Abstract model of the rest of a cascade, whose roots were already
+    written. Each batch of roots is written on its own transaction, which
+    saves the progress, so a job interrupted in the middle is resumed after
+    the last batch written.
+    Attributes:
+        operation: 'soft_delete' or 'restore'
+        model: label of the roots' model, like 'app_label.modelname'
+        pks: JSON list of the roots' primary keys
+        timestamp: deleted_at of a soft delete, updated_at of a restore
+        live_only: bool to stamp only rows not soft deleted yet
+        actor: who made the operation, see paranoid_model.audit.actor()
+        status: 'pending', 'done' or 'failed'
+        attempts: int amount of failed runs
+        error: last error
+        created_at: when the operation was made
+        finished_at: when the job was done
+        progress: int amount of roots whose level is written
+        locked_until: until when the job is kept by the worker running it
+    """
+    OPERATIONS = (
+        (SOFT_DELETE, 'Soft delete'),
+        (RESTORE, 'Restore'),
+    )
+    STATUSES = (
+        (PENDING, 'Pending'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    operation = models.CharField(max_length=16, choices=OPERATIONS)
+    model = models.CharField(max_length=255)
+    pks = models.TextField()
+    timestamp = models.DateTimeField()
+    live_only = models.BooleanField(default=False)
+    actor = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=16, choices=STATUSES, default=PENDING, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    progress = models.PositiveIntegerField(default=0)
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+    def run(self):
+        """
+        Write the level below the roots not written yet, a batch of roots
+        per transaction, saving the progress and the level below as new jobs
+        """
+        from paranoid_model.audit import actor
+
+        using = self._state.db
+        model = apps.get_model(self.model)
+        pks = json.loads(self.pks)
+        manager = type(self)._default_manager.using(using)
+
+        with actor(self.actor or None):
+            while self.progress < len(pks):
+                progress = min(self.progress + BATCH_SIZE, len(pks))
+                locked_until = timezone.now() + LEASE
+
+                with transaction.atomic(using=using):
+                    self._write_level(model, pks[self.progress:progress])
+                    manager.filter(pk=self.pk).update(progress=progress, locked_until=locked_until)
+
+                self.progress = progress
+                self.locked_until = locked_until
+
+    def _in_state(self, model, pks):
+        """
+        Roots still in the state the operation left them: soft deleted at
+        job's timestamp, or live for a restore. Roots changed since then,
+        like restored, soft deleted again or gone, are skipped with their cascade
+        Args:
+            model: Paranoid model of the roots
+            pks: list of roots' primary keys
+        Returns:
+            list of primary keys
+        """
+        if self.operation == SOFT_DELETE:
+            state = Q(deleted_at=self.timestamp)
+        else:
+            state = Q(deleted_at__isnull=True)
+        queryset = model._base_manager.using(self._state.db).filter(Q(pk__in=pks), state)
+        return list(queryset.values_list('pk', flat=True))
+
+    def _write_level(self, model, pks):
+        """
+        Write the children of the roots and save the rows below them as new jobs
+        Args:
+            model: Paranoid model of the roots
+            pks: list of roots' primary keys
+        """
+        from paranoid_model.cascade import Cascade
+
+        pks = self._in_state(model, pks)
+        if not pks:
+            return
+
+        cascade = Cascade(model, pks, self._state.db, background=True, levels=1)
+        if self.operation == SOFT_DELETE:
+            cascade.soft_delete(live_only=self.live_only, deleted_at=self.timestamp)
+        else:
+            cascade.restore(updated_at=self.timestamp)
+
+        for child, child_pks in cascade.frontier.items():
+            if child_pks and cascade.relations(child):
+                type(self)._default_manager.using(self._state.db).create(
+                    operation=self.operation,
+                    model=child._meta.label_lower,
+                    pks=json.dumps(sorted(child_pks), cls=DjangoJSONEncoder),
+                    timestamp=self.timestamp,
+                    live_only=self.live_only,
+                    actor=self.actor,
+                )
+            child_pks.close()
+
+
+def job_model():
+    """
+    Concrete AbstractCascadeJob model of setting CASCADE_JOB_MODEL
+    Returns:
+        model class
+    """
+    label = get_setting('CASCADE_JOB_MODEL')
+    if label is None:
+        raise ImproperlyConfigured(
+            'Setting PARANOID_MODEL_CASCADE_JOB_MODEL is required by paranoid_cascade_limits.')
+    return apps.get_model(label)
+
+
+def enqueue(cascade, operation, live_only, timestamp):
+    """
+    Save the rest of a cascade, over its limits, as a job on cascade's database
+    Args:
+        cascade: Cascade whose roots are being written
+        operation: 'soft_delete' or 'restore'
+        live_only: bool
+        timestamp: datetime used by the operation
+    Returns:
+        job instance
+    """
+    from paranoid_model.audit import current_actor
+
+    return job_model()._default_manager.using(cascade.using).create(
+        operation=operation,
+        model=cascade.model._meta.label_lower,
+        pks=json.dumps(sorted(cascade.roots), cls=DjangoJSONEncoder),
+        timestamp=timestamp,
+        live_only=live_only,
+        actor=current_actor(),
+    )
+
+
+def run_next(using=None):
+    """
+    Run the oldest pending job not being run by other workers.
+    The job is claimed with ``select_for_update(skip_locked=True)`` and kept
+    by the worker for a LEASE, renewed after each batch, so when the worker
+    dies the job is taken by another one once the lease is over, and resumed
+    after the last batch written.
+    Args:
+        using: database alias of the jobs. Default {router's db_for_write}
+    Returns:
+        job instance run, or None when there is none pending
+    """
+    model = job_model()
+    using = using or router.db_for_write(model)
+
+    with transaction.atomic(using=using):
+        now = timezone.now()
+        job = (
+            model._default_manager.using(using)
+            .select_for_update(skip_locked=True)
+            .filter(Q(locked_until__isnull=True) | Q(locked_until__lt=now), status=PENDING)
+            .order_by('pk')
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.locked_until = now + LEASE
+        job.save(update_fields=['locked_until'])
+
+    try:
+        job.run()
+    except Exception as error:
+        job.attempts += 1
+        job.error = '%s: %s' % (error.__class__.__name__, error)
+        if job.attempts >= MAX_ATTEMPTS:
+            job.status = FAILED
+    else:
+        job.status = DONE
+        job.error = ''
+        job.finished_at = timezone.now()
+
+    job.locked_until = None
+    job.save(update_fields=['status', 'attempts', 'error', 'finished_at', 'locked_until'])
+    return job
+
+
+def run_pending(using=None, limit=None):
+    """
+    Run pending jobs, one at a time, until there is none left
+    Args:
+        using: database alias of the jobs. Default {router's db_for_write}
+        limit: int max amount of jobs to run. Default {None} for every one
+    Returns:
+        list of jobs run
+    """
+    jobs = []
+    while limit is None or len(jobs) < limit:
+        job = run_next(using)
+        if job is None:
+            break
+        jobs.append(job)
+    return jobs
@@ -0,0 +1,255 @@
+"""
+File with the primary key cache used on Paranoid Manager
+"""
+
+
+import abc
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models.signals import post_save, post_delete
+from paranoid_model.signals import post_soft_delete, post_restore, post_purge
+
+
+class StateCache(abc.ABC):
+    """
+    Cache of rows looked up by primary key, live or soft deleted.
+    Rows are stored as a tuple with the values of the concrete fields,
+    so a soft deleted row is remembered as well as a live one.
+    It is invalidated on save, hard delete, soft delete and restore, and
+    again once the transaction making them commits, since other threads
+    may cache the row in between. Inside a transaction the cache is not
+    used, see ``usable()``, so rows written and rolled back by it are never
+    cached nor served.
+
+    Each invalidation changes the row's version, so a row read before an
+    invalidation is not cached after it, see ``set_instance()``.
+    Receivers are connected once apps are ready, see ``connect_all()``, so
+    processes that only write invalidate the cache too.
+
+    Updates made with ``QuerySet.update()`` are not seen by the cache.
+    """
+
+    def __init__(self, timeout=60):
+        self.timeout = timeout
+        self._connected = set()
+
+    @abc.abstractmethod
+    def _get(self, key):
+        """Value of key, or None when missing or expired"""
+
+    @abc.abstractmethod
+    def _set(self, key, value):
+        """Save value of key for ``timeout`` seconds"""
+
+    @abc.abstractmethod
+    def _set_many(self, mapping):
+        """Save every value of dict {key: value} for ``timeout`` seconds"""
+
+    @abc.abstractmethod
+    def _delete_many(self, keys):
+        """Remove keys, missing ones included"""
+
+    @staticmethod
+    def key(model, using, pk):
+        return 'paranoid_model:%s:%s:%s' % (model._meta.label_lower, using, pk)
+
+    @staticmethod
+    def version_key(key):
+        return '%s:version' % key
+
+    def version(self, model, using, pk):
+        """
+        Version of a row, changed every time it is invalidated. Read it
+        before querying the row and pass it to ``set_instance()``.
+        Args:
+            model: model class
+            using: database alias
+            pk: primary key
+        Returns:
+            str or None
+        """
+        return self._get(self.version_key(self.key(model, using, pk)))
+
+    @staticmethod
+    def usable(using):
+        """
+        Check if the cache can be used on database alias: not inside a
+        transaction, whose reads may see rows that are not committed
+        Args:
+            using: database alias
+        Returns:
+            bool
+        """
+        return not connections[using].in_atomic_block
+
+    def get_instance(self, model, using, pk):
+        """
+        Get instance from cache
+        Args:
+            model: model class
+            using: database alias
+            pk: primary key
+        Returns:
+            instance or None when not cached
+        """
+        values = self._get(self.key(model, using, pk))
+        if values is None:
+            return None
+
+        attnames = [field.attname for field in model._meta.concrete_fields]
+        return model.from_db(using, attnames, values)
+
+    def set_instance(self, instance, using, version):
+        """
+        Save instance on cache, unless it was invalidated since it was read
+        Args:
+            instance: model instance
+            using: database alias
+            version: version() read before the instance was queried
+        """
+        model = instance.__class__
+        key = self.key(model, using, instance.pk)
+        if self._get(self.version_key(key)) != version:
+            return
+
+        values = tuple(getattr(instance, field.attname) for field in model._meta.concrete_fields)
+        self._set(key, values)
+
+    def invalidate(self, model, pks):
+        """
+        Remove rows from cache, on every database alias
+        Args:
+            model: model class
+            pks: iterable with primary keys
+        """
+        models = [model] + model._meta.get_parent_list()
+        keys = [
+            self.key(each, using, pk)
+            for each in models
+            for using in settings.DATABASES
+            for pk in pks
+        ]
+        version = uuid.uuid4().hex
+        self._set_many({self.version_key(key): version for key in keys})
+        self._delete_many(keys)
+
+    def connect(self, model):
+        """
+        Connect receivers to invalidate the cache when model's rows are written
+        Args:
+            model: model class
+        """
+        if model in self._connected:
+            return
+
+        self._connected.add(model)
+        uid = 'paranoid_model_cache_%s_%s' % (id(self), model._meta.label_lower)
+        post_save.connect(self._on_save, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(self._on_save, sender=model, weak=False, dispatch_uid=uid)
+        post_soft_delete.connect(self._on_bulk, sender=model, weak=False, dispatch_uid=uid)
+        post_restore.connect(self._on_bulk, sender=model, weak=False, dispatch_uid=uid)
+        post_purge.connect(self._on_bulk, sender=model, weak=False, dispatch_uid=uid)
+
+    def _invalidate_on_commit(self, model, pks, using):
+        self.invalidate(model, pks)
+        if connections[using].in_atomic_block:
+            pks = list(pks)
+            transaction.on_commit(lambda: self.invalidate(model, pks), using=using)
+
+    def _on_save(self, sender, instance, using, **kwargs):
+        self._invalidate_on_commit(sender, [instance.pk], using)
+
+    def _on_bulk(self, sender, pks, using, **kwargs):
+        self._invalidate_on_commit(sender, pks, using)
+
+
+def connect_all():
+    """Connect receivers of the cache of every model's managers, once apps are ready"""
+    for model in apps.get_models():
+        for manager in model._meta.managers:
+            cache = getattr(manager, 'cache', None)
+            if cache is not None:
+                cache.connect(model)
+
+
+class LocalCache(StateCache):
+    """
+    In process LRU cache with time to live
+    Args:
+        size: int max amount of rows
+        timeout: int seconds to live
+    """
+
+    def __init__(self, size=1024, timeout=60):
+        super().__init__(timeout=timeout)
+        self.size = size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                return None
+
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def _set(self, key, value):
+        self._set_many({key: value})
+
+    def _set_many(self, mapping):
+        expires = time.monotonic() + self.timeout
+        with self._lock:
+            for key, value in mapping.items():
+                self._data[key] = (expires, value)
+                self._data.move_to_end(key)
+
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def _delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+
+class DjangoCache(StateCache):
+    """
+    Cache backed by Django's cache framework
+    Args:
+        alias: alias on settings.CACHES
+        timeout: int seconds to live
+    """
+
+    def __init__(self, alias='default', timeout=60):
+        super().__init__(timeout=timeout)
+        self.alias = alias
+
+    @property
+    def backend(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def _get(self, key):
+        return self.backend.get(key)
+
+    def _set(self, key, value):
+        self.backend.set(key, value, self.timeout)
+
+    def _set_many(self, mapping):
+        self.backend.set_many(mapping, self.timeout)
+
+    def _delete_many(self, keys):
+        self.backend.delete_many(keys)
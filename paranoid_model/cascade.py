@@ -0,0 +1,798 @@
+"""
+File with the cascade used on Paranoid Model soft delete and restore
+"""
+
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+
+from django.db import connections, models, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+from paranoid_model import background, triggers
+from paranoid_model.conf import get_setting
+from paranoid_model.instrumentation import (
+    instrument, stage, visited, SOFT_DELETE, RESTORE, PURGE, DISCOVERY, WRITE, SIGNALS
+)
+from paranoid_model.partitions import ensure_month_partition
+from paranoid_model.pkset import PkSet
+from paranoid_model.profiling import current_profile
+from paranoid_model.signals import (
+    pre_soft_delete, post_soft_delete, pre_restore, post_restore, pre_purge, post_purge
+)
+import paranoid_model.models
+
+
+BATCH_SIZE = 500
+
+# cascades running on current thread, see Cascade._remember()
+_local = threading.local()
+
+
+def is_paranoid(model):
+    """
+    Check if model has a Paranoid behavior
+    Args:
+        model: model class
+    Returns:
+        bool
+    """
+    return issubclass(model, paranoid_model.models.Paranoid)
+
+
+def batches(pks, batch_size=BATCH_SIZE):
+    """
+    Split primary keys into lists with at most ``batch_size`` items
+    Args:
+        pks: iterable of primary keys
+        batch_size: int
+    Returns:
+        generator of lists
+    """
+    batch = []
+    for pk in pks:
+        batch.append(pk)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def read_database(model, using):
+    """
+    Database used to read the cascade of an operation written on ``using``.
+    With setting CASCADE_READ_DATABASE = 'read' the router's db_for_read()
+    is used, unless the operation is written on a database other than the
+    router's db_for_write().
+    Args:
+        model: model class to be read
+        using: database alias written
+    Returns:
+        str: database alias
+    """
+    if (get_setting('CASCADE_READ_DATABASE') == 'read' and
+            using == router.db_for_write(model)):
+        return router.db_for_read(model)
+    return using
+
+
+def _candidate_relations(model):
+    """Reverse relations that cascade on delete, the same ones Django's Collector follows"""
+    for related in model._meta.get_fields(include_hidden=True):
+        if (related.auto_created and not related.concrete and
+                (related.one_to_one or related.one_to_many) and
+                related.field.remote_field.on_delete is models.CASCADE):
+            yield related.related_model, related.field
+
+    for field in model._meta.private_fields:
+        if hasattr(field, 'bulk_related_objects'):
+            # GenericRelation
+            yield field.remote_field.model, field
+
+
+def _reaches_paranoid(model, seen):
+    """Check if model is Paranoid or has any Paranoid model on its cascade"""
+    if is_paranoid(model):
+        return True
+
+    seen.add(model)
+    return any(
+        _reaches_paranoid(related_model, seen)
+        for related_model, _ in _candidate_relations(model)
+        if related_model not in seen
+    )
+
+
+@lru_cache(maxsize=None)
+def cascade_relations(model):
+    """
+    Relations that must be followed when model is soft deleted or restored.
+    Relations without any Paranoid model on its cascade are ignored.
+    Args:
+        model: model class
+    Returns:
+        tuple((related_model, field))
+    """
+    return tuple(
+        (related_model, field)
+        for related_model, field in _candidate_relations(model)
+        if _reaches_paranoid(related_model, set())
+    )
+
+
+def related_queryset(model, related_model, field, pks, using):
+    """
+    QuerySet of related_model rows related to model's rows with primary key in pks
+    Args:
+        model: model class of pks
+        related_model: model class to look for
+        field: field on related_model pointing to model, or GenericRelation on model
+        pks: list of primary keys
+        using: database alias
+    Returns:
+        QuerySet
+    """
+    queryset = related_model._base_manager.using(using)
+
+    if hasattr(field, 'bulk_related_objects'):
+        from django.contrib.contenttypes.models import ContentType
+
+        content_type = ContentType.objects.db_manager(using).get_for_model(
+            model, for_concrete_model=field.for_concrete_model)
+        return queryset.filter(**{
+            field.content_type_field_name: content_type,
+            '%s__in' % field.object_id_field_name: pks,
+        })
+    elif field.target_field.primary_key:
+        return queryset.filter(**{'%s__in' % field.name: pks})
+
+    return queryset.filter(**{
+        '%s__in' % field.name: model._base_manager.using(using).filter(pk__in=pks)
+    })
+
+
+def related_pks(model, related_model, field, pks, using):
+    """
+    Primary keys of related_model rows related to model's rows with primary key in pks
+    Args:
+        model: model class of pks
+        related_model: model class to look for
+        field: field on related_model pointing to model, or GenericRelation on model
+        pks: list of primary keys
+        using: database alias
+    Returns:
+        list of primary keys
+    """
+    return list(related_queryset(model, related_model, field, pks, using).values_list('pk', flat=True))
+
+
+class Cascade:
+    """
+    Set based cascade of a paranoid operation.
+    The primary keys of every row reached from the roots are collected with
+    one query per relation and batch, on ``read_database()``, and then
+    written with one UPDATE per model and batch, instead of loading and
+    saving each row.
+
+    Each row is collected once, however many roots or relations reach it,
+    and rows written by another cascade of the same operation are skipped,
+    see paranoid_model.instrumentation.visited(). Primary keys are kept on
+    PkSet, compact and spilled to disk when there are too many of them,
+    and removed once the cascade has run, see close().
+
+    When the cascade goes over the roots' model ``paranoid_cascade_limits``
+    only the roots are written, the rest is left to a background job, see
+    paranoid_model.background.
+    Attributes:
+        model: model class of the roots
+        using: database alias
+        roots: PkSet of roots' primary keys, pks itself when it is a PkSet
+        background: bool, True when roots were already written by the
+            operation and the rest of the cascade is run by a job
+        limits: dict {'rows': int, 'depth': int} or None
+        data: OrderedDict {model: PkSet}, in discovery order
+        depths: dict {model: cascade level where model was first reached}
+        seen: dict {model: PkSet} written by the operation before this cascade
+        dry_run: bool, True while counting, see count()
+        updated: OrderedDict {model: amount of rows written}
+        job: background job with the rest of the cascade, if it went over the limits
+        levels: int max cascade levels collected, or None for every level
+        frontier: OrderedDict {model: PkSet} of rows on the last level
+            collected, whose relations were not followed because of levels
+        by_triggers: dict {model: PkSet} of rows reached by relations whose
+            writes are made by database triggers, see _write()
+    """
+
+    def __init__(self, model, pks, using, background=False, levels=None):
+        self.model = model
+        self.using = using
+        self.roots = pks if isinstance(pks, PkSet) else PkSet(pks)
+        self.background = background
+        self.limits = None if background else getattr(model._meta, 'paranoid_cascade_limits', None)
+        self.levels = levels
+        self.frontier = OrderedDict()
+        self.by_triggers = {}
+        self.data = OrderedDict()
+        self.depths = {}
+        self.seen = {}
+        self.dry_run = False
+        self.updated = OrderedDict()
+        self.job = None
+        self._add(model, self.roots, depth=0)
+
+    def _add(self, model, pks, depth):
+        """
+        Add primary keys to the collected data
+        Returns:
+            list(): primary keys that were not collected yet
+        """
+        if model not in self.data:
+            self.data[model] = PkSet()
+        self.depths.setdefault(model, depth)
+
+        seen = self.seen.get(model)
+        if seen:
+            pks = [pk for pk in pks if pk not in seen]
+        return self.data[model].add_new(pks)
+
+    def _skip_seen(self, name):
+        """Leave out roots already written by the operation"""
+        self.seen = visited(name, self.using)
+        if self.seen.get(self.model):
+            roots = self.data[self.model]
+            self.data[self.model] = roots.difference(self.seen[self.model])
+            roots.close()
+
+    def _remember(self):
+        """
+        Remember rows collected as written by the operation. Sets are given
+        to the operation instead of copied, and merged in place, unless
+        this cascade was started inside another one, like by a signal
+        receiver, whose sets are still being written.
+        """
+        nested = getattr(_local, 'running', 0) > 1
+        for model, pks in self.data.items():
+            seen = self.seen.get(model)
+            if seen is None:
+                self.seen[model] = pks
+            elif nested:
+                merged = PkSet(seen, seen.spill_rows)
+                merged.update(pks)
+                self.seen[model] = merged
+            else:
+                seen.update(pks)
+
+    def close(self):
+        """
+        Remove the temporary files of the primary keys collected, but the
+        ones remembered by the operation, removed once it has finished.
+        The frontier is left to the caller.
+        """
+        remembered = {id(pks) for pks in self.seen.values()}
+        for pks in [self.roots] + list(self.data.values()) + list(self.by_triggers.values()):
+            if id(pks) not in remembered:
+                pks.close()
+
+    def collect(self, defer_leaves=False):
+        """
+        Collect every row reached by the roots, level by level.
+        A row is visited only once, so cycles end the cascade.
+        Args:
+            defer_leaves: bool to not look for rows of models without
+                relations to follow, leaving them to the caller. Default {False}
+        Returns:
+            OrderedDict {leaf model: {(model, field): PkSet of model's primary keys}}
+            of deferred leaves
+        """
+        with stage(DISCOVERY):
+            return self._collect(defer_leaves)
+
+    def _collect(self, defer_leaves):
+        # a copy, roots' model may be reached again while its roots are read
+        frontier = OrderedDict([(self.model, PkSet(self.data[self.model]))])
+        leaves = OrderedDict()
+        depth = 0
+
+        while frontier:
+            if self.levels is not None and depth >= self.levels:
+                self.frontier = frontier
+                break
+
+            depth += 1
+            next_frontier = OrderedDict()
+
+            for model, pks in frontier.items():
+                by_triggers = self.trigger_relations(model)
+                for related_model, field in self.relations(model):
+                    if defer_leaves and not self.relations(related_model):
+                        self.depths.setdefault(related_model, depth)
+                        relations = leaves.setdefault(related_model, OrderedDict())
+                        relations.setdefault((model, field), PkSet()).update(pks)
+                        continue
+
+                    for batch in batches(pks):
+                        found = related_pks(
+                            model, related_model, field, batch,
+                            read_database(related_model, self.using))
+                        new = self._add(related_model, found, depth)
+                        if (related_model, field) in by_triggers:
+                            self.by_triggers.setdefault(related_model, PkSet()).update(found)
+                        if new:
+                            self._check_limits(depth)
+                            if related_model not in next_frontier:
+                                next_frontier[related_model] = PkSet()
+                            next_frontier[related_model].update(new)
+
+            for pks in frontier.values():
+                pks.close()
+            frontier = next_frontier
+
+        return leaves
+
+    def _check_limits(self, depth):
+        """Raise CascadeLimitExceeded if rows collected or depth are over the limits"""
+        if not self.limits or self.dry_run:
+            return
+
+        max_depth = self.limits.get('depth')
+        max_rows = self.limits.get('rows')
+        if ((max_depth is not None and depth > max_depth) or
+                (max_rows is not None and sum(len(pks) for pks in self.data.values()) > max_rows)):
+            raise background.CascadeLimitExceeded()
+
+    def _collect_or_defer(self, operation, live_only, timestamp):
+        """
+        Collect the cascade, or only the roots when it goes over the limits,
+        leaving the rest to a background job
+        """
+        try:
+            self.collect()
+        except background.CascadeLimitExceeded:
+            self.data = OrderedDict([(self.model, PkSet(self.roots))])
+            self.job = background.enqueue(self, operation, live_only, timestamp)
+
+    def count(self):
+        """
+        Amount of rows reached by the roots, per model, without writing
+        nor loading instances. Models without relations to follow are
+        counted with COUNT queries instead of collecting its primary keys,
+        unless they are reached by more than one relation.
+        Returns:
+            OrderedDict {model: int}
+        """
+        self.dry_run = True
+        leaves = self.collect(defer_leaves=True)
+        counts = OrderedDict((model, len(pks)) for model, pks in self.data.items())
+
+        try:
+            with stage(DISCOVERY):
+                self._count_leaves(leaves, counts)
+        finally:
+            for relations in leaves.values():
+                for pks in relations.values():
+                    pks.close()
+            self.close()
+        return counts
+
+    def _count_leaves(self, leaves, counts):
+        for related_model, relations in leaves.items():
+            using = read_database(related_model, self.using)
+
+            if len(relations) == 1 and related_model not in self.data:
+                (model, field), pks = next(iter(relations.items()))
+                counts[related_model] = sum(
+                    related_queryset(model, related_model, field, batch, using).count()
+                    for batch in batches(pks)
+                )
+            else:
+                for (model, field), pks in relations.items():
+                    for batch in batches(pks):
+                        self._add(related_model, related_pks(model, related_model, field, batch, using), 0)
+                counts[related_model] = len(self.data[related_model])
+
+    def relations(self, model):
+        """
+        Relations followed by the cascade
+        Args:
+            model: model class
+        Returns:
+            tuple((related_model, field))
+        """
+        return cascade_relations(model)
+
+    def trigger_relations(self, model):
+        """
+        Relations whose rows are written by database triggers, when model
+        has ``paranoid_db_cascade`` and its triggers are installed on the
+        database. They are still followed, so every row is sent by signals
+        and its own relations are followed too, only its write is left out.
+        Args:
+            model: model class
+        Returns:
+            tuple((related_model, field))
+        """
+        if (self.dry_run or not getattr(model._meta, 'paranoid_db_cascade', False) or
+                not triggers.installed(model, self.using)):
+            return ()
+        return triggers.trigger_relations(model)
+
+    def summary(self, include=is_paranoid):
+        """
+        Dry run of the operation
+        Args:
+            include: function to choose the models reported. Default {is_paranoid}
+        Returns:
+            tuple(int total, dict {model label: amount}), like Django's delete()
+        """
+        counts = {
+            model._meta.label: amount
+            for model, amount in self.count().items()
+            if amount and include(model)
+        }
+        return sum(counts.values()), counts
+
+    def paranoid_data(self):
+        """
+        Returns:
+            generator of (model, PkSet) of Paranoid models only
+        """
+        for model, pks in self.data.items():
+            if self.background and model is self.model:
+                pks = pks.difference(self.roots)
+            if pks and is_paranoid(model):
+                yield model, pks
+
+    @staticmethod
+    def _signal_pks(model, pks, *signals):
+        """Primary keys sent by signals, as a list only when they have receivers"""
+        if any(signal.has_listeners(model) for signal in signals):
+            return list(pks)
+        return pks
+
+    def _write(self, model, pks, live_only, values):
+        """UPDATE rows of model with values, returns amount of rows updated"""
+        by_triggers = self.by_triggers.get(model, ())
+        updated = 0
+        with stage(WRITE):
+            for batch in batches(pks):
+                own = [pk for pk in batch if pk not in by_triggers]
+                if own:
+                    queryset = model._base_manager.using(self.using).filter(pk__in=own)
+                    if live_only:
+                        queryset = queryset.filter(deleted_at__isnull=True)
+                    updated += queryset.update(**values)
+                if len(own) < len(batch):
+                    updated += self._write_rest(model, [pk for pk in batch if pk in by_triggers], live_only, values)
+        return updated
+
+    def _write_rest(self, model, pks, live_only, values):
+        """
+        UPDATE rows written by database triggers that the triggers left out:
+        triggers only write the live children of a parent when it changes
+        from live to soft deleted, and the soft deleted children when it is
+        restored, so children of a parent soft deleted before, or soft
+        deleted children re-stamped by the operation, are written here.
+        Rows end the same as without triggers.
+        Returns:
+            int: amount of rows updated, by the triggers or here
+        """
+        queryset = model._base_manager.using(self.using).filter(pk__in=pks)
+        deleted_at = values['deleted_at']
+        if deleted_at is None:
+            queryset.filter(deleted_at__isnull=False).update(**values)
+        elif live_only:
+            # rows stamped by the triggers were live too
+            return queryset.filter(Q(deleted_at__isnull=True) | Q(deleted_at=deleted_at)).update(**values)
+        else:
+            queryset.filter(~Q(deleted_at=deleted_at)).update(**values)
+        return len(pks)
+
+    def _write_branch(self, wrapper, model, pks, live_only, values):
+        """_write() on a thread of the pool, with its own connection and transaction"""
+        connection = connections[self.using]
+        try:
+            with connection.execute_wrapper(wrapper), transaction.atomic(using=self.using):
+                return self._write(model, pks, live_only, values)
+        finally:
+            connection.close()
+
+    def _send(self, signal, model, pks, **kwargs):
+        with stage(SIGNALS):
+            signal.send(sender=model, pks=pks, using=self.using, **kwargs)
+
+    def parallel(self):
+        """
+        Check if branches of the cascade are written concurrently: setting
+        CASCADE_WORKERS is greater than 1 and the operation is not inside
+        a transaction, which would have to hold every branch.
+        SQLite allows a single writer, so it is always serial, and so is a
+        cascade with limits, whose job must be saved with the roots.
+        Returns:
+            bool
+        """
+        connection = connections[self.using]
+        return (
+            get_setting('CASCADE_WORKERS') > 1 and
+            not self.limits and
+            not connection.in_atomic_block and
+            connection.vendor != 'sqlite'
+        )
+
+    def _run(self, name, operation, live_only, values, pre, post, **kwargs):
+        """
+        Collect and write the cascade, sending pre and post signals per model.
+        In parallel, every model but the roots' is written on a thread pool,
+        each one on its own transaction, and the roots are written last, so
+        when a branch fails the roots are left as they were and the
+        operation can be retried. Branches committed before the failure
+        still send their post signal.
+        Rows are remembered as written by the operation before any write,
+        so cascades started by signal receivers skip them.
+        """
+        _local.running = getattr(_local, 'running', 0) + 1
+        try:
+            self._skip_seen(name)
+            self._run_collected(operation, name, live_only, values, pre, post, **kwargs)
+        finally:
+            _local.running -= 1
+            self.close()
+
+    def _run_collected(self, operation, name, live_only, values, pre, post, **kwargs):
+        if not self.parallel():
+            with transaction.atomic(using=self.using):
+                self._collect_or_defer(name, live_only, values['updated_at'])
+                self._remember()
+
+                for model, pks in self.paranoid_data():
+                    sent = self._signal_pks(model, pks, pre, post)
+                    self._send(pre, model, sent, **kwargs)
+                    self._record(operation, model, self._write(model, pks, live_only, values))
+                    self._send(post, model, sent, **kwargs)
+            return
+
+        self.collect()
+        self._remember()
+        data = [(model, pks, self._signal_pks(model, pks, pre, post)) for model, pks in self.paranoid_data()]
+        branches = [(model, pks) for model, pks, _ in data if model is not self.model]
+
+        for model, _, sent in data:
+            self._send(pre, model, sent, **kwargs)
+
+        # queries of the pool are counted by the operation, and captured by current profile
+        wrapper = operation
+        profile = current_profile()
+        if profile is not None:
+            wrapper = lambda execute, *args: profile(partial(operation, execute), *args)  # noqa: E731
+
+        workers = min(get_setting('CASCADE_WORKERS'), len(branches) or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._write_branch, wrapper, model, pks, live_only, values)
+                for model, pks in branches
+            ]
+
+        # every branch has finished, the ones committed are reported even if another one failed
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        committed = set()
+        for (model, _), future in zip(branches, futures):
+            if future.exception() is None:
+                committed.add(model)
+                self._record(operation, model, future.result())
+
+        if errors:
+            for model, _, sent in data:
+                if model in committed:
+                    self._send(post, model, sent, **kwargs)
+            if committed:
+                operation.mark_committed()
+            raise errors[0]
+
+        with transaction.atomic(using=self.using):
+            for model, pks, _ in data:
+                if model is self.model:
+                    self._record(operation, model, self._write(model, pks, live_only, values))
+
+        for model, _, sent in data:
+            self._send(post, model, sent, **kwargs)
+
+    def _record(self, operation, model, updated):
+        self.updated[model] = self.updated.get(model, 0) + updated
+        operation.add(model, updated, self.depths[model])
+
+    def soft_delete(self, live_only=False, deleted_at=None):
+        """
+        Soft delete all roots and its cascade
+        Args:
+            live_only: bool to stamp only rows not soft deleted yet, so rows
+                soft deleted before, or by a concurrent operation, keep
+                their deleted_at. Default {False}
+            deleted_at: datetime to stamp. Default {now}
+        Returns:
+            datetime: deleted_at used
+        """
+        deleted_at = deleted_at or timezone.now()
+
+        with instrument(SOFT_DELETE, self.model) as operation:
+            self._ensure_partitions(deleted_at)
+            self._run(
+                SOFT_DELETE, operation, live_only, {'deleted_at': deleted_at, 'updated_at': deleted_at},
+                pre_soft_delete, post_soft_delete, deleted_at=deleted_at,
+            )
+
+        return deleted_at
+
+    def _ensure_partitions(self, deleted_at):
+        """
+        Create the month partitions of deleted_at of every model the cascade
+        may reach, before the cascade's transaction, so it doesn't hold their locks
+        """
+        models, pending = {self.model}, [self.model]
+        while pending:
+            for related_model, _ in self.relations(pending.pop()):
+                if related_model not in models:
+                    models.add(related_model)
+                    pending.append(related_model)
+
+        for model in models:
+            ensure_month_partition(model, deleted_at, self.using)
+
+    def restore(self, updated_at=None):
+        """
+        Restore all roots and its cascade
+        Args:
+            updated_at: datetime to stamp. Default {now}
+        Returns:
+            datetime: updated_at used
+        """
+        updated_at = updated_at or timezone.now()
+
+        with instrument(RESTORE, self.model) as operation:
+            values = {'deleted_at': None, 'updated_at': updated_at}
+            self._run(RESTORE, operation, False, values, pre_restore, post_restore, updated_at=updated_at)
+
+        return updated_at
+
+
+@lru_cache(maxsize=None)
+def purge_relations(model):
+    """
+    Relations followed when model is hard deleted, every model included
+    Args:
+        model: model class
+    Returns:
+        tuple((related_model, field))
+    """
+    return tuple(_candidate_relations(model))
+
+
+class PurgeCascade(Cascade):
+    """
+    Cascade of a hard delete, used to preview it: every model reached by
+    Django's delete is followed, Paranoid or not.
+    """
+
+    def relations(self, model):
+        return purge_relations(model)
+
+    def summary(self, include=lambda model: True):
+        return super().summary(include)
+
+
+def _fast_purge_paths(model, path, reached):
+    """
+    Paths of relations below model, each one after the paths below it.
+    Raises:
+        ValueError: if a row reached needs Django's Collector
+    """
+    if model._meta.parents or any(hasattr(field, 'bulk_related_objects') for field in model._meta.private_fields):
+        raise ValueError('%s has parents or generic relations' % model._meta.label)
+
+    for related in model._meta.get_fields(include_hidden=True):
+        if not (related.auto_created and not related.concrete and (related.one_to_one or related.one_to_many)):
+            continue
+
+        on_delete = related.field.remote_field.on_delete
+        if on_delete is models.DO_NOTHING:
+            continue
+        if on_delete is not models.CASCADE or related.related_model in reached:
+            raise ValueError('%s is not a cascade tree' % model._meta.label)
+
+        child = path + ((related.related_model, related.field),)
+        yield from _fast_purge_paths(related.related_model, child, reached | {related.related_model})
+        yield child
+
+
+@lru_cache(maxsize=None)
+def fast_purge_paths(model):
+    """
+    Paths of relations deleted by a hard delete of model, leaves first, when
+    it can be deleted without Django's Collector: every relation reached is
+    on_delete CASCADE or DO_NOTHING, with no cycles, multi-table inheritance
+    nor generic relations.
+    Args:
+        model: model class
+    Returns:
+        tuple(tuple((related_model, field))) or None if not supported
+    """
+    model = model._meta.concrete_model
+    try:
+        return tuple(_fast_purge_paths(model, (), {model}))
+    except ValueError:
+        return None
+
+
+class FastPurge:
+    """
+    Hard delete of a tree of rows without loading them. For each batch of
+    roots, the rows reached by each path of fast_purge_paths() are deleted
+    with a single ``DELETE ... WHERE fk IN (subquery)``, leaves first, and
+    the roots last, on a transaction per batch.
+    pre_purge and post_purge are sent per model and batch, with the primary
+    keys deleted, only when they have receivers. Django's pre_delete and
+    post_delete are not sent.
+    Attributes:
+        model: model class of the roots
+        using: database alias
+        paths: tuple of paths of relations, see fast_purge_paths()
+        deleted: OrderedDict {model label: amount of rows deleted}
+    """
+
+    def __init__(self, model, using):
+        self.model = model
+        self.using = using
+        self.paths = fast_purge_paths(model)
+        self.deleted = OrderedDict()
+
+    def delete(self, pks):
+        """
+        Hard delete a batch of roots and its cascade. It is part of the
+        purge operation running, or it is one, so receivers waiting for
+        the operation to finish, like counters, see the batch.
+        Args:
+            pks: list of roots' primary keys
+        """
+        with instrument(PURGE, self.model), transaction.atomic(using=self.using):
+            for path in self.paths:
+                self._delete(path[-1][0], self._queryset(pks, path))
+            self._delete(self.model, self.model._base_manager.using(self.using).filter(pk__in=pks))
+
+    def _queryset(self, pks, path):
+        """Rows reached from the roots by path, on nested subqueries"""
+        (related_model, field), rest = path[0], path[1:]
+        if field.target_field.primary_key:
+            queryset = related_model._base_manager.using(self.using).filter(**{'%s__in' % field.name: pks})
+        else:
+            queryset = related_queryset(self.model, related_model, field, pks, self.using)
+
+        for related_model, field in rest:
+            queryset = related_model._base_manager.using(self.using).filter(**{'%s__in' % field.name: queryset})
+        return queryset
+
+    def _delete(self, model, queryset):
+        if not (pre_purge.has_listeners(model) or post_purge.has_listeners(model)):
+            with stage(WRITE):
+                deleted = queryset._raw_delete(self.using)
+        else:
+            pks = list(queryset.values_list('pk', flat=True))
+            deleted = 0
+            for batch in batches(pks):
+                with stage(SIGNALS):
+                    pre_purge.send(sender=model, pks=batch, using=self.using)
+                with stage(WRITE):
+                    deleted += model._base_manager.using(self.using).filter(pk__in=batch)._raw_delete(self.using)
+                with stage(SIGNALS):
+                    post_purge.send(sender=model, pks=batch, using=self.using)
+
+        if deleted:
+            label = model._meta.label
+            self.deleted[label] = self.deleted.get(label, 0) + deleted
+
+    def collected(self):
+        """
+        Returns:
+            tuple(int total, dict {model label: amount}), like Django's delete()
+        """
+        return sum(self.deleted.values()), dict(self.deleted)
@@ -0,0 +1,45 @@
+"""
+File with Paranoid Model settings, every setting can be overwritten on
+Django's settings with prefix ``PARANOID_MODEL_``, like ``PARANOID_MODEL_BATCH_SIZE``
+"""
+
+
+from django.conf import settings
+
+
+DEFAULTS = {
+    # Database used to discover the cascade of soft delete and restore:
+    # 'write' to read from the same database written, or 'read' to use the
+    # router's db_for_read(), like a read replica.
+    'CASCADE_READ_DATABASE': 'write',
+
+    # Threads writing independent branches of a cascade concurrently, each one
+    # on its own connection and transaction. 1 writes them serially on a
+    # single transaction, see paranoid_model.cascade.Cascade.parallel().
+    'CASCADE_WORKERS': 1,
+
+    # Primary keys of a model kept in memory by a cascade, the ones above it
+    # are spilled to temporary files, see paranoid_model.pkset.
+    'CASCADE_MEMORY_ROWS': 1000000,
+
+    # Concrete AbstractCascadeJob model keeping the rest of cascades over
+    # ``paranoid_cascade_limits``, like 'app_label.CascadeJob', see paranoid_model.background.
+    'CASCADE_JOB_MODEL': None,
+
+    # Audit log of soft deletes, restores and purges, see paranoid_model.audit:
+    # an AuditSink instance or its dotted path, like 'paranoid_model.audit.ModelSink'.
+    'AUDIT_SINK': None,
+    # Concrete AbstractAuditEntry model used by ModelSink, like 'app_label.AuditEntry'.
+    'AUDIT_MODEL': None,
+}
+
+
+def get_setting(name):
+    """
+    Get a Paranoid Model setting
+    Args:
+        name: setting name without prefix
+    Returns:
+        value on Django's settings or the default one
+    """
+    return getattr(settings, 'PARANOID_MODEL_' + name, DEFAULTS[name])
@@ -0,0 +1,138 @@
+"""
+File with the live children counters of Paranoid models, see
+paranoid_model.fields.LiveCounterField.
+Counters are recomputed set wise, with one UPDATE per batch of parents
+counting its live children on a subquery, whenever children are created,
+saved, soft deleted, restored or hard deleted.
+"""
+
+
+from django.apps import apps
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import pre_save, post_save, post_delete
+from paranoid_model.cascade import batches
+from paranoid_model.instrumentation import on_finish
+from paranoid_model.signals import post_soft_delete, post_restore, pre_purge
+
+
+def counter_fields(model):
+    """
+    Returns:
+        list of LiveCounterField declared on model
+    """
+    from paranoid_model.fields import LiveCounterField
+
+    return [field for field in model._meta.concrete_fields if isinstance(field, LiveCounterField)]
+
+
+def live_count(field):
+    """Subquery counting live children of the outer parent row"""
+    relation = field.relation
+    children = relation.related_model._base_manager.filter(
+        **{relation.field.name: OuterRef(relation.field.target_field.attname), 'deleted_at__isnull': True}
+    ).order_by().values(relation.field.attname).annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(children), Value(0))
+
+
+def refresh(field, parent_pks, using):
+    """
+    Recompute counter of parents
+    Args:
+        field: LiveCounterField
+        parent_pks: iterable of parent primary keys, None values are ignored
+        using: database alias
+    """
+    parent_pks = {pk for pk in parent_pks if pk is not None}
+    queryset = field.model._base_manager.using(using)
+    for batch in batches(parent_pks):
+        queryset.filter(pk__in=batch).update(**{field.attname: live_count(field)})
+
+
+def rebuild(model, using, batch_size=1000):
+    """
+    Recompute every counter of every row of model, to fix any drift
+    Args:
+        model: model class with LiveCounterField
+        using: database alias
+        batch_size: int amount of rows per UPDATE
+    Returns:
+        int: amount of rows recomputed
+    """
+    values = {field.attname: live_count(field) for field in counter_fields(model)}
+    rows = model._default_manager.using(using).all(with_deleted=True)
+    amount = 0
+
+    for pks in rows.iter_batches(batch_size, flat=True):
+        amount += model._base_manager.using(using).filter(pk__in=pks).update(**values)
+    return amount
+
+
+class Counter:
+    """Receivers keeping a LiveCounterField up to date"""
+
+    def __init__(self, field):
+        self.field = field
+        self.relation = field.relation
+
+    @property
+    def uid(self):
+        return 'paranoid_model_counter_%s_%s' % (self.field.model._meta.label_lower, self.field.name)
+
+    def connect(self):
+        child = self.relation.related_model
+        for signal, receiver in ((post_soft_delete, self.on_bulk), (post_restore, self.on_bulk),
+                                 (post_save, self.on_save), (post_delete, self.on_delete),
+                                 (pre_save, self.on_pre_save), (pre_purge, self.on_purge)):
+            signal.connect(receiver, sender=child, weak=False, dispatch_uid=self.uid)
+
+    def parent_pks(self, pks, using):
+        child = self.relation.related_model
+        queryset = child._base_manager.using(using)
+        for batch in batches(pks):
+            yield from queryset.filter(pk__in=batch).values_list(self.relation.field.attname, flat=True).distinct()
+
+    def on_bulk(self, sender, pks, using, **kwargs):
+        refresh(self.field, self.parent_pks(pks, using), using)
+
+    def on_pre_save(self, sender, instance, using, update_fields=None, raw=False, **kwargs):
+        # parent on the database, so moving the child to another one refreshes both
+        attname = self.relation.field.attname
+        previous = None
+        if not (raw or instance._state.adding or instance.pk is None or
+                (update_fields is not None and attname not in update_fields)):
+            previous = sender._base_manager.using(using).filter(pk=instance.pk).values_list(
+                attname, flat=True).first()
+        instance.__dict__.setdefault('_paranoid_counter_parents', {})[self.uid] = previous
+
+    def on_save(self, sender, instance, using, **kwargs):
+        previous = instance.__dict__.get('_paranoid_counter_parents', {}).pop(self.uid, None)
+        refresh(self.field, [previous, getattr(instance, self.relation.field.attname)], using)
+
+    def on_delete(self, sender, instance, using, **kwargs):
+        parent_pk = getattr(instance, self.relation.field.attname)
+
+        # on a hard delete cascade, parents are refreshed at once when it finishes
+        pending = on_finish('paranoid_model.counters', flush)
+        if pending is None:
+            refresh(self.field, [parent_pk], using)
+        else:
+            pending.setdefault((self.field, using), set()).add(parent_pk)
+
+    def on_purge(self, sender, pks, using, **kwargs):
+        # parents are read before the children are deleted, and refreshed once the purge finishes
+        parent_pks = set(self.parent_pks(pks, using))
+        on_finish('paranoid_model.counters', flush).setdefault((self.field, using), set()).update(parent_pks)
+
+
+def flush(pending):
+    """Refresh parents of children hard deleted by an operation"""
+    for (field, using), parent_pks in pending.items():
+        refresh(field, parent_pks, using)
+
+
+def connect():
+    """Connect receivers of every LiveCounterField, once apps are ready"""
+    for model in apps.get_models():
+        for field in counter_fields(model):
+            Counter(field).connect()
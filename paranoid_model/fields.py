@@ -0,0 +1,224 @@
+"""
+File with fields used on Paranoid Model
+"""
+
+
+from django.core import checks
+from django.db import models, router, transaction
+from django.db.models.fields.related_descriptors import (
+    ManyToManyDescriptor, create_forward_many_to_many_manager
+)
+from django.utils.functional import cached_property
+import paranoid_model.models
+
+
+def create_paranoid_many_to_many_manager(superclass):
+    """
+    Extend Django's ManyRelatedManager so links are soft deleted.
+    Args:
+        superclass: ManyRelatedManager class created by Django
+    Returns:
+        ParanoidManyRelatedManager class
+    """
+
+    class ParanoidManyRelatedManager(superclass):
+        def __init__(self, instance=None):
+            super().__init__(instance)
+
+            # Filter by the through model instead of the relation, so live
+            # links and live targets are filtered on the same JOIN.
+            link = self.target_field.related_query_name()
+            self.core_filters = {
+                '%s__%s' % (link, lh_field.name): getattr(instance, rh_field.attname)
+                for lh_field, rh_field in self.source_field.related_fields
+            }
+            self.core_filters['%s__deleted_at__isnull' % link] = True
+            if issubclass(self.model, paranoid_model.models.Paranoid):
+                self.core_filters['with_deleted'] = False
+
+        def get_prefetch_queryset(self, instances, queryset=None):
+            """
+            Same as Django's, but the instances and the live links are
+            filtered on a single JOIN of the through model, and the
+            instance each target was prefetched for is read from it.
+            """
+            if queryset is None:
+                queryset = super(superclass, self).get_queryset()
+
+            queryset._add_hints(instance=instances[0])
+            queryset = queryset.using(queryset._db or self._db)
+
+            link = self.target_field.related_query_name()
+            queryset = queryset.filter(models.Q(**{
+                '%s__%s__in' % (link, self.source_field_name): instances,
+                '%s__deleted_at__isnull' % link: True,
+            }))
+            if issubclass(self.model, paranoid_model.models.Paranoid):
+                queryset = queryset.filter(with_deleted=False)
+
+            # F() of the same relation reuses the JOIN filtered above
+            fk = self.through._meta.get_field(self.source_field_name)
+            queryset = queryset.annotate(**{
+                '_prefetch_related_val_%s' % field.attname: models.F('%s__%s' % (link, field.attname))
+                for field in fk.local_related_fields
+            })
+            return (
+                queryset,
+                lambda result: tuple(
+                    getattr(result, '_prefetch_related_val_%s' % field.attname)
+                    for field in fk.local_related_fields
+                ),
+                lambda instance: tuple(
+                    getattr(instance, field.attname) for field in fk.foreign_related_fields
+                ),
+                False,
+                self.prefetch_cache_name,
+                False,
+            )
+
+        def add(self, *objs, **kwargs):
+            """
+            Add links, restoring the soft deleted ones instead of creating
+            duplicated links
+            """
+            db = router.db_for_write(self.through, instance=self.instance)
+            with transaction.atomic(using=db, savepoint=False):
+                self._restore_links(db, objs)
+                super().add(*objs, **kwargs)
+        add.alters_data = True
+
+        def _restore_links(self, db, objs):
+            target_ids = self._get_target_ids(self.target_field_name, objs)
+            if not target_ids:
+                return
+
+            links = models.Q(**{
+                self.source_field_name: self.related_val[0],
+                '%s__in' % self.target_field_name: target_ids,
+            })
+            if self.symmetrical:
+                links |= models.Q(**{
+                    self.target_field_name: self.related_val[0],
+                    '%s__in' % self.source_field_name: target_ids,
+                })
+
+            self.through._default_manager.using(db).all(with_deleted=True).filter(links).restore()
+
+    return ParanoidManyRelatedManager
+
+
+class ParanoidManyToManyDescriptor(ManyToManyDescriptor):
+    """ManyToManyDescriptor with a ParanoidManyRelatedManager"""
+
+    @cached_property
+    def related_manager_cls(self):
+        related_model = self.rel.related_model if self.reverse else self.rel.model
+
+        return create_paranoid_many_to_many_manager(
+            create_forward_many_to_many_manager(
+                related_model._default_manager.__class__,
+                self.rel,
+                reverse=self.reverse,
+            )
+        )
+
+
+class ParanoidManyToManyField(models.ManyToManyField):
+    """
+    ManyToManyField with a Paranoid ``through`` model: removing a link soft
+    deletes it, adding a soft deleted link restores it, and the related
+    managers only return live targets with live links.
+
+    ``through`` is required and must be a Paranoid model.
+    """
+
+    def contribute_to_class(self, cls, name, **kwargs):
+        super().contribute_to_class(cls, name, **kwargs)
+        setattr(cls, self.name, ParanoidManyToManyDescriptor(self.remote_field, reverse=False))
+
+    def contribute_to_related_class(self, cls, related):
+        super().contribute_to_related_class(cls, related)
+        if not self.remote_field.is_hidden() and not related.related_model._meta.swapped:
+            setattr(
+                cls, related.get_accessor_name(),
+                ParanoidManyToManyDescriptor(self.remote_field, reverse=True)
+            )
+
+    def check(self, **kwargs):
+        return super().check(**kwargs) + self._check_paranoid_through()
+
+    def _check_paranoid_through(self):
+        through = self.remote_field.through
+        if isinstance(through, str) or issubclass(through, paranoid_model.models.Paranoid):
+            return []
+        return [
+            checks.Error(
+                "ParanoidManyToManyField requires a Paranoid 'through' model.",
+                obj=self,
+                id='paranoid_model.E001',
+            )
+        ]
+
+
+class LiveCounterField(models.PositiveIntegerField):
+    """
+    Denormalized amount of live children of a reverse relation to a Paranoid
+    model, so it can be read with no JOIN nor subquery, like
+    ``phones_count = LiveCounterField('phones')``.
+
+    It is recomputed set wise when children are created, saved, soft
+    deleted, restored or hard deleted, see paranoid_model.counters.
+    Saving the parent keeps the counter of the database, whatever the
+    instance has in memory, so it is never written by a regular save.
+    Updates made with ``QuerySet.update()`` are not seen, use
+    ``manage.py paranoid rebuild-counters`` to fix a drift.
+    'paranoid_model' must be on INSTALLED_APPS.
+    Args:
+        relation: accessor name of the reverse relation, like 'phones'
+    """
+
+    def __init__(self, relation=None, *args, **kwargs):
+        self.relation_name = relation
+        kwargs.setdefault('default', 0)
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['relation'] = self.relation_name
+        if kwargs.get('default') == 0:
+            del kwargs['default']
+        if kwargs.get('editable') is False:
+            del kwargs['editable']
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        if add:
+            return super().pre_save(model_instance, add)
+        return models.F(self.attname)
+
+    @property
+    def relation(self):
+        """Reverse relation counted, like ManyToOneRel of Phone.owner"""
+        for related in self.model._meta.related_objects:
+            if related.get_accessor_name() == self.relation_name:
+                return related
+        return None
+
+    def check(self, **kwargs):
+        return super().check(**kwargs) + self._check_relation()
+
+    def _check_relation(self):
+        related = self.relation
+        if (related is not None and related.one_to_many and
+                related.field.target_field.primary_key and
+                issubclass(related.related_model, paranoid_model.models.Paranoid)):
+            return []
+        return [
+            checks.Error(
+                "LiveCounterField relation '%s' must be a reverse ForeignKey of a Paranoid model "
+                "to %s's primary key." % (self.relation_name, self.model._meta.object_name),
+                obj=self,
+                id='paranoid_model.E002',
+            )
+        ]
@@ -0,0 +1,24 @@
+"""
+File with indexes used on Paranoid Model
+"""
+
+
+from django.db import models
+
+
+class AsOfIndex(models.Index):
+    """
+    Composite index on (created_at, deleted_at), so point in time queries like
+    ``as_of()`` and ``alive_between()`` are indexed range scans.
+    Args:
+        name: index name
+        **kwargs: passed to Django's Index
+    """
+
+    def __init__(self, *, name, **kwargs):
+        super().__init__(fields=['created_at', 'deleted_at'], name=name, **kwargs)
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        kwargs.pop('fields')
+        return path, args, kwargs
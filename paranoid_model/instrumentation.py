@@ -0,0 +1,244 @@
+"""
+File with the instrumentation of Paranoid Model operations
+"""
+
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from paranoid_model.signals import paranoid_operation
+
+
+SOFT_DELETE = 'soft_delete'
+RESTORE = 'restore'
+PURGE = 'purge'
+
+# Stages of an operation, see stage()
+DISCOVERY = 'discovery'
+WRITE = 'write'
+SIGNALS = 'signals'
+AUDIT = 'audit'
+FINISH = 'finish'
+
+_local = threading.local()
+
+
+class Operation:
+    """
+    Measures of a single paranoid operation, including its whole cascade.
+    Attributes:
+        id: UUID of the operation
+        name: operation name: 'soft_delete', 'restore' or 'purge'
+        model: root model of the operation
+        rows: dict {model: amount of rows affected}
+        depth: int deepest cascade level reached
+        queries: int amount of queries executed
+        duration: float seconds spent
+        committed: bool, True when part of the operation was committed
+            before it failed, see mark_committed()
+    """
+
+    def __init__(self, name, model):
+        self.id = uuid.uuid4()
+        self.name = name
+        self.model = model
+        self.rows = {}
+        self.depth = 0
+        self.queries = 0
+        self.duration = 0.0
+        self.committed = False
+        self._lock = threading.Lock()
+
+    def add(self, model, amount, depth=0):
+        """
+        Record rows affected by the operation
+        Args:
+            model: model class of the rows
+            amount: int amount of rows
+            depth: int cascade level of the rows, root is 0
+        """
+        self.rows[model] = self.rows.get(model, 0) + amount
+        self.depth = max(self.depth, depth)
+
+    def mark_committed(self):
+        """
+        Mark rows recorded so far as committed, so the operation is sent
+        even if it fails afterwards, like a parallel cascade branch failing
+        after others were committed
+        """
+        self.committed = True
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper used to count the queries, of any thread"""
+        with self._lock:
+            self.queries += 1
+        return execute(sql, params, many, context)
+
+    def send(self):
+        paranoid_operation.send(
+            sender=self.model,
+            operation=self.name,
+            operation_id=self.id,
+            rows=self.rows,
+            depth=self.depth,
+            queries=self.queries,
+            duration=self.duration,
+        )
+
+
+class NullOperation:
+    """Operation used when nobody listens to ``paranoid_operation``"""
+
+    def add(self, model, amount, depth=0):
+        pass
+
+    def mark_committed(self):
+        pass
+
+    def __call__(self, execute, sql, params, many, context):
+        return execute(sql, params, many, context)
+
+
+NULL_OPERATION = NullOperation()
+
+
+def current_operation():
+    """
+    Operation running on current thread
+    Returns:
+        Operation, NullOperation or None when there is none
+    """
+    return getattr(_local, 'operation', None)
+
+
+def current_stage():
+    """
+    Stage of the operation running on current thread
+    Returns:
+        str or None
+    """
+    return getattr(_local, 'stage', None)
+
+
+@contextmanager
+def stage(name):
+    """
+    Context manager to tag what the operation is doing on current thread,
+    like 'discovery' of the cascade or 'write' of its rows, so queries can
+    be told apart, see paranoid_model.profiling.
+    Args:
+        name: stage name
+    """
+    previous = getattr(_local, 'stage', None)
+    _local.stage = name
+    try:
+        yield
+    finally:
+        _local.stage = previous
+
+
+def on_finish(key, callback):
+    """
+    Register a callback to run once the outermost operation of current
+    thread has finished successfully, cascade included. Every call with
+    the same key shares a single callback and its state, so work can be
+    gathered during the cascade and done at once.
+    Args:
+        key: hashable
+        callback: function called with the state
+    Returns:
+        dict: state given to callback, or None when there is no operation running
+    """
+    callbacks = getattr(_local, 'callbacks', None)
+    if callbacks is None:
+        return None
+    if key not in callbacks:
+        callbacks[key] = (callback, {})
+    return callbacks[key][1]
+
+
+def visited(name, using):
+    """
+    Rows already written by the outermost operation of current thread, on
+    a database, so every cascade of the same operation, like the batches
+    of a concurrent soft delete or a delete() made by a signal receiver
+    inside the cascade, writes each row at most once.
+    Args:
+        name: operation name
+        using: database alias
+    Returns:
+        dict {model: PkSet}, empty and not kept when there is no operation running
+    """
+    operations = getattr(_local, 'visited', None)
+    if operations is None:
+        return {}
+    return operations.setdefault((name, using), {})
+
+
+def _close_visited():
+    """Remove the temporary files of the rows written by the operation, see visited()"""
+    for rows in _local.visited.values():
+        for pks in rows.values():
+            pks.close()
+
+
+def _finish(callbacks):
+    with stage(FINISH):
+        for callback, state in callbacks.values():
+            callback(state)
+
+
+@contextmanager
+def instrument(name, model):
+    """
+    Context manager to measure a paranoid operation.
+    Nested calls on the same thread (the cascade) are part of the outermost
+    operation, which sends ``paranoid_operation`` once it has finished, or
+    once it has failed after Operation.mark_committed().
+    When there is no receiver, nothing is measured.
+    Args:
+        name: operation name
+        model: root model class
+    Yields:
+        Operation or NullOperation
+    """
+    current = getattr(_local, 'operation', None)
+    if current is not None:
+        yield current
+        return
+
+    callbacks = _local.callbacks = OrderedDict()
+    _local.visited = {}
+
+    if not paranoid_operation.has_listeners(model):
+        _local.operation = NULL_OPERATION
+        try:
+            yield NULL_OPERATION
+        finally:
+            _close_visited()
+            _local.operation = _local.callbacks = _local.visited = None
+        _finish(callbacks)
+        return
+
+    operation = Operation(name, model)
+    _local.operation = operation
+    start = time.perf_counter()
+    finished = False
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(operation))
+            yield operation
+        finished = True
+    finally:
+        operation.duration = time.perf_counter() - start
+        _close_visited()
+        _local.operation = _local.callbacks = _local.visited = None
+
+        if finished or operation.committed:
+            _finish(callbacks)
+            operation.send()
@@ -0,0 +1,282 @@
+"""
+File with the ``paranoid`` management command: soft delete, restore and
+purge by filter, in batches, and stats of Paranoid models
+"""
+
+
+import datetime
+import json
+import os
+import time
+from collections import OrderedDict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+from paranoid_model import counters, instrumentation
+from paranoid_model.cascade import is_paranoid
+from paranoid_model.partitions import purge_partitions
+from paranoid_model.signals import (
+    pre_soft_delete, post_soft_delete, pre_restore, post_restore, paranoid_operation
+)
+
+
+SOFT_DELETE = 'soft-delete'
+RESTORE = 'restore'
+PURGE = 'purge'
+STATS = 'stats'
+REBUILD_COUNTERS = 'rebuild-counters'
+
+
+class Report:
+    """
+    Rows and seconds spent per model, measured with Paranoid signals while
+    the command runs. Soft delete and restore are measured per model, a
+    purge is measured as a whole on its root model.
+    """
+
+    def __init__(self):
+        self.rows = OrderedDict()
+        self.seconds = OrderedDict()
+        self._started = {}
+
+    def __enter__(self):
+        for signal in (pre_soft_delete, pre_restore):
+            signal.connect(self._pre, dispatch_uid=id(self))
+        for signal in (post_soft_delete, post_restore):
+            signal.connect(self._post, dispatch_uid=id(self))
+        paranoid_operation.connect(self._operation, dispatch_uid=id(self))
+        return self
+
+    def __exit__(self, *args):
+        for signal in (pre_soft_delete, pre_restore, post_soft_delete, post_restore, paranoid_operation):
+            signal.disconnect(dispatch_uid=id(self))
+
+    def add(self, model, rows=0, seconds=0.0):
+        self.rows[model] = self.rows.get(model, 0) + rows
+        self.seconds[model] = self.seconds.get(model, 0.0) + seconds
+
+    def _pre(self, sender, **kwargs):
+        self._started[sender] = time.perf_counter()
+
+    def _post(self, sender, **kwargs):
+        self.add(sender, seconds=time.perf_counter() - self._started.pop(sender))
+
+    def _operation(self, sender, operation, rows, duration, **kwargs):
+        for model, amount in rows.items():
+            self.add(model, rows=amount)
+        if operation == instrumentation.PURGE:
+            self.add(sender, seconds=duration)
+
+
+class Command(BaseCommand):
+    help = (
+        'Soft delete, restore or purge instances of a Paranoid model matching a filter, '
+        'in batches, show its stats, or rebuild its live counters.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=[SOFT_DELETE, RESTORE, PURGE, STATS, REBUILD_COUNTERS])
+        parser.add_argument('model', help="Model label, like 'app_label.ModelName'.")
+        parser.add_argument(
+            '--filter', default='{}',
+            help='JSON object with lookups, like \'{"name__startswith": "foo"}\'.')
+        parser.add_argument(
+            '--before', help='Purge only instances soft deleted before this date or datetime.')
+        parser.add_argument(
+            '--fast', action='store_true',
+            help='Purge without loading instances, when every relation reached allows it.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Root instances per batch.')
+        parser.add_argument('--rate', type=float, help='Max root instances per second.')
+        parser.add_argument(
+            '--checkpoint',
+            help='File with the last primary key processed, to resume an interrupted run.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows the cascade would reach.')
+        parser.add_argument('--database', help='Database alias. Default is the router\'s db_for_write.')
+
+    def handle(self, *args, **options):
+        model = self.get_model(options['model'])
+        if options['before'] is not None:
+            if options['action'] != PURGE:
+                raise CommandError('--before is only accepted by purge.')
+            options['before'] = self.parse_before(options['before'])
+        if options['fast'] and options['action'] != PURGE:
+            raise CommandError('--fast is only accepted by purge.')
+
+        using = options['database'] or router.db_for_write(model)
+        queryset = self.get_queryset(model, options).using(using)
+
+        if options['action'] == STATS:
+            return self.stats(model, queryset)
+
+        if options['action'] == REBUILD_COUNTERS:
+            return self.rebuild_counters(model, using, options)
+
+        if options['dry_run']:
+            return self.dry_run(queryset, options)
+
+        with Report() as report:
+            start = time.perf_counter()
+            self.run(model, queryset, using, options, report)
+            self.print_report(report, time.perf_counter() - start)
+
+    def get_model(self, label):
+        try:
+            model = apps.get_model(label)
+        except (LookupError, ValueError) as error:
+            raise CommandError(error)
+
+        if not is_paranoid(model):
+            raise CommandError('%s is not a Paranoid model.' % label)
+        return model
+
+    def get_queryset(self, model, options):
+        try:
+            lookups = json.loads(options['filter'])
+        except ValueError as error:
+            raise CommandError('--filter is not valid JSON: %s' % error)
+        if not isinstance(lookups, dict):
+            raise CommandError('--filter must be a JSON object.')
+
+        action = options['action']
+        if action == SOFT_DELETE:
+            queryset = model._default_manager.all()
+        elif action in (RESTORE, PURGE):
+            queryset = model._default_manager.deleted_only()
+        else:
+            queryset = model._default_manager.all(with_deleted=True)
+
+        if options['before'] is not None:
+            queryset = queryset.filter(Q(deleted_at__lt=options['before']))
+
+        # Q, so lookups on deleted_at are not dropped by ParanoidQuerySet.filter()
+        return queryset.filter(Q(**lookups))
+
+    def parse_before(self, value):
+        before = parse_datetime(value)
+        if before is None:
+            date = parse_date(value)
+            if date is None:
+                raise CommandError('--before must be a date or a datetime.')
+            before = datetime.datetime(date.year, date.month, date.day)
+
+        if settings.USE_TZ and timezone.is_naive(before):
+            before = timezone.make_aware(before)
+        return before
+
+    def run(self, model, queryset, using, options, report):
+        checkpoint = Checkpoint(options['checkpoint'], options['action'], model)
+        last = checkpoint.load()
+        if last is not None:
+            self.stdout.write('Resuming after pk %s.' % last)
+            queryset = queryset.filter(pk__gt=last)
+
+        if (options['action'] == PURGE and last is None and options['filter'] == '{}' and
+                not model._default_manager.get_queryset().query.has_filters()):
+            dropped = purge_partitions(model, options['before'], using)
+            if dropped:
+                report.add(model, rows=dropped)
+                self.stdout.write('Dropped partitions with %s rows.' % dropped)
+
+        start = time.perf_counter()
+        processed = 0
+        for number, pks in enumerate(queryset.iter_batches(options['batch_size'], flat=True), start=1):
+            batch = model._default_manager.all(with_deleted=True).using(using).filter(pk__in=pks)
+
+            if options['action'] == SOFT_DELETE:
+                batch.delete()
+            elif options['action'] == RESTORE:
+                batch.restore()
+            else:
+                batch.purge(fast=options['fast'])
+
+            processed += len(pks)
+            checkpoint.save(pks[-1])
+            self.stdout.write('Batch %s: %s %s processed, last pk %s.' % (
+                number, processed, model._meta.verbose_name_plural, pks[-1]))
+
+            if options['rate']:
+                wait = processed / options['rate'] - (time.perf_counter() - start)
+                if wait > 0:
+                    time.sleep(wait)
+
+        checkpoint.clear()
+
+    def dry_run(self, queryset, options):
+        if options['action'] == SOFT_DELETE:
+            total, counts = queryset.delete(dry_run=True)
+        elif options['action'] == RESTORE:
+            total, counts = queryset.restore(dry_run=True)
+        else:
+            total, counts = queryset.purge(dry_run=True)
+
+        for label, amount in counts.items():
+            self.stdout.write('%-40s %10s' % (label, amount))
+        self.stdout.write('%-40s %10s' % ('Total', total))
+
+    def print_report(self, report, seconds):
+        self.stdout.write('%-40s %10s %10s' % ('Model', 'Rows', 'Seconds'))
+        for model, rows in report.rows.items():
+            self.stdout.write('%-40s %10s %10.3f' % (model._meta.label, rows, report.seconds[model]))
+        self.stdout.write(self.style.SUCCESS('%-40s %10s %10.3f' % ('Total', sum(report.rows.values()), seconds)))
+
+    def rebuild_counters(self, model, using, options):
+        if not counters.counter_fields(model):
+            raise CommandError('%s has no LiveCounterField.' % model._meta.label)
+
+        start = time.perf_counter()
+        amount = counters.rebuild(model, using, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS('%s %s rebuilt in %.3f seconds.' % (
+            amount, model._meta.verbose_name_plural, time.perf_counter() - start)))
+
+    def stats(self, model, queryset):
+        stats = queryset.aggregate(
+            total=Count('pk'),
+            deleted=Count('pk', filter=Q(deleted_at__isnull=False)),
+            oldest_deleted_at=Min('deleted_at'),
+        )
+        self.stdout.write('Live: %s' % (stats['total'] - stats['deleted']))
+        self.stdout.write('Soft deleted: %s' % stats['deleted'])
+        self.stdout.write('Total: %s' % stats['total'])
+        self.stdout.write('Oldest soft delete: %s' % stats['oldest_deleted_at'])
+
+
+class Checkpoint:
+    """
+    Last primary key processed, saved on a JSON file after every batch
+    Args:
+        path: file path or None to not save checkpoints
+        action: command action
+        model: model class
+    """
+
+    def __init__(self, path, action, model):
+        self.path = path
+        self.key = {'action': action, 'model': model._meta.label}
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return None
+
+        with open(self.path) as file:
+            data = json.load(file)
+        if any(data.get(key) != value for key, value in self.key.items()):
+            raise CommandError('Checkpoint %s belongs to another run: %s.' % (self.path, data))
+        return data['last_pk']
+
+    def save(self, pk):
+        if not self.path:
+            return
+
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as file:
+            json.dump(dict(self.key, last_pk=pk), file, default=str)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
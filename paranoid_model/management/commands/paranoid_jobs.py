@@ -0,0 +1,42 @@
+"""
+File with the ``paranoid_jobs`` management command: run the background
+jobs of cascades over ``paranoid_cascade_limits``
+"""
+
+
+import time
+
+from django.core.management.base import BaseCommand
+from paranoid_model import background
+
+
+class Command(BaseCommand):
+    help = 'Run pending jobs of soft delete and restore cascades over its limits.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help='Max amount of jobs to run.')
+        parser.add_argument(
+            '--wait', type=float,
+            help='Keep running, looking for new jobs every WAIT seconds when there is none pending.')
+        parser.add_argument('--database', help='Database alias of the jobs. Default is the router\'s db_for_write.')
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        ran = 0
+
+        while limit is None or ran < limit:
+            job = background.run_next(options['database'])
+            if job is None:
+                if options['wait'] is None:
+                    break
+                time.sleep(options['wait'])
+                continue
+
+            ran += 1
+            if job.status == background.DONE:
+                self.stdout.write('Job %s: %s of %s done.' % (job.pk, job.operation, job.model))
+            else:
+                self.stderr.write('Job %s: %s of %s %s, attempt %s: %s' % (
+                    job.pk, job.operation, job.model, job.status, job.attempts, job.error))
+
+        self.stdout.write(self.style.SUCCESS('%s jobs run.' % ran))
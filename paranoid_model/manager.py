@@ -3,17 +3,30 @@ File with Manager used on Paranoid Model
 """
 
 
-from django.db import models
+from django.db import models, router
+from paranoid_model.instrumentation import instrument, PURGE
+from paranoid_model.partitions import purge_partitions
 from paranoid_model.queryset import ParanoidQuerySet
 
 
 class ParanoidManager(models.Manager):
-    """Paranoid Manager with a Paranoid behavior"""
+    """
+    Paranoid Manager with a Paranoid behavior
+    Args:
+        cache: paranoid_model.cache.StateCache used on get(pk=...) and
+            get_deleted(pk=...). Default None, no cache.
+    """
 
     _queryset_class = ParanoidQuerySet
 
+    def __init__(self, cache=None):
+        super().__init__()
+        self.cache = cache
+
     def get_queryset(self):
-        return self._queryset_class(self.model, using=self._db)
+        qs = self._queryset_class(self.model, using=self._db)
+        qs._state_cache = self.cache
+        return qs
 
     def all(self, **kwargs):
         """
@@ -55,6 +68,18 @@ class ParanoidManager(models.Manager):
         qs = self.get_queryset()
         return qs.filter(with_deleted=with_deleted, *args, **kwargs)
 
+    def soft_delete_state(self, pks):
+        """
+        Method to get the soft delete state of many instances at once,
+        fetching only primary key and deleted_at
+        Args:
+            pks: iterable of primary keys
+        Returns:
+            dict {pk: deleted_at}: deleted_at is None for instances not soft
+            deleted, and pks not found on database are left out
+        """
+        return self.get_queryset().soft_delete_state(pks)
+
     def deleted_only(self):
         """
         Method to filter only deleted instances
@@ -65,6 +90,95 @@ class ParanoidManager(models.Manager):
         qs = self.get_queryset()
         return qs.deleted_only()
 
+    def as_of(self, timestamp):
+        """
+        Method to filter instances that were live at a point in time, even
+        if they have been soft deleted since then
+        Args:
+            timestamp: datetime
+        Returns:
+            ParanoidQuerySet[]
+        """
+        return self.get_queryset().as_of(timestamp)
+
+    def alive_between(self, start, end):
+        """
+        Method to filter instances that were live at any moment of a period,
+        even if they have been soft deleted since then
+        Args:
+            start: datetime
+            end: datetime
+        Returns:
+            ParanoidQuerySet[]
+        """
+        return self.get_queryset().alive_between(start, end)
+
+    def with_related_state(self, *names):
+        """
+        Method to annotate ``<name>_is_deleted`` of related Paranoid objects
+        on instances not soft deleted, see ParanoidQuerySet.with_related_state()
+        Args:
+            *names: ForeignKey or OneToOneField names, or reverse OneToOne query names
+        Returns:
+            ParanoidQuerySet[]
+        """
+        return self.all().with_related_state(*names)
+
+    def exclude_dead_related(self, *names):
+        """
+        Method to filter instances not soft deleted whose related Paranoid
+        objects have not been soft deleted either
+        Args:
+            *names: ForeignKey or OneToOneField names, or reverse OneToOne query names
+        Returns:
+            ParanoidQuerySet[]
+        """
+        return self.all().exclude_dead_related(*names)
+
+    def iter_batches(self, batch_size=1000, order_by='pk', flat=False):
+        """
+        Iterate over instances not soft deleted in batches, with keyset pagination.
+        Use ``deleted_only().iter_batches()`` or ``all(with_deleted=True).iter_batches()``
+        to iterate over the soft deleted ones.
+        Args:
+            batch_size: int max amount of instances per batch. Default {1000}
+            order_by: 'pk' or a unique field, '-' prefix for descending. Default {'pk'}
+            flat: bool to yield primary keys instead of instances. Default {False}
+        Yields:
+            list(): instances, or primary keys if flat
+        """
+        return self.all().iter_batches(batch_size=batch_size, order_by=order_by, flat=flat)
+
+    def purge(self, before=None, using=None, dry_run=False, fast=False):
+        """
+        Method to hard delete soft deleted instances.
+        When model's table is partitioned by deleted_at, partitions with only
+        purged rows are dropped, or truncated, instead of deleted row by row,
+        unless the manager's queryset is filtered, like a related manager's.
+        Args:
+            before: datetime to purge only instances soft deleted before it.
+                Default {None}, every soft deleted instance.
+            using: database alias. Default {router's db_for_write}
+            dry_run: bool to only count the rows the cascade would reach,
+                without writing. Default {False}
+            fast: bool to hard delete without loading instances, see
+                paranoid_model.cascade.FastPurge. Default {False}
+        Returns:
+            int(): amount hard deleted
+            tuple(int total, dict {model label: amount}): if dry_run
+        """
+        using = using or self._db or router.db_for_write(self.model)
+        queryset = self.get_queryset().using(using)
+        if dry_run:
+            return queryset.purge(before, dry_run=True)
+
+        with instrument(PURGE, self.model):
+            dropped = 0
+            # partitions have rows out of a filtered queryset
+            if not queryset.query.has_filters() and not hasattr(self, 'core_filters'):
+                dropped = purge_partitions(self.model, before, using)
+            return dropped + queryset.purge(before, fast=fast)
+
     def get_deleted(self, *arg, **kwargs):
         """
         Method to get an instance that has not been soft deleted yet.
@@ -3,52 +3,101 @@ File with a based Paranoid model
 """
 
 
+import threading
+
+from django.apps import apps
 from django.db import models, router
 from django.db.models.base import subclass_exception, ModelBase
-from django.utils import timezone
-from django.contrib.admin.utils import NestedObjects
 from paranoid_model.exceptions import SoftDeleted, IsNotSoftDeleted
+from paranoid_model.cascade import Cascade
+from paranoid_model.instrumentation import instrument, PURGE
 from paranoid_model.manager import ParanoidManager
 
 
-class ParanoidMeta(ModelBase):
-    def __new__(mcs, name, bases, attrs, **kwargs):
-        new_class = super().__new__(mcs, name, bases, attrs, **kwargs)
-        parents = [b for b in bases if isinstance(b, ModelBase)]
+# Options accepted on ``class Meta`` of a Paranoid model, with its default value.
+# They are available on ``model._meta``, like ``model._meta.paranoid_db_cascade``.
+PARANOID_OPTIONS = {
+    # Cascade is made by database triggers, see paranoid_model.operations
+    'paranoid_db_cascade': False,
+    # Table is partitioned by deleted_at, 'state' or 'month', see paranoid_model.partitions
+    'paranoid_partition': None,
+    # Max rows and levels written inside the operation, like {'rows': 10000, 'depth': 3},
+    # the rest of the cascade is left to a background job, see paranoid_model.background
+    'paranoid_cascade_limits': None,
+}
 
-        attr_meta = attrs.pop('Meta', None)
-        abstract = getattr(attr_meta, 'abstract', False)
 
-        if not abstract:
-            mcs._add_soft_deleted_exception(new_class, parents)
-        return new_class
+class SoftDeletedDescriptor:
+    """
+    Descriptor of ``Model.SoftDeleted``, the exception raised by get() of a
+    soft deleted instance. The exception is created on first access, and
+    cached on the model, instead of when the model class is created.
+    It is a subclass of Model.DoesNotExist, of the SoftDeleted of every
+    concrete Paranoid parent, or of paranoid_model.exceptions.SoftDeleted.
+    It is created under a lock, so threads racing on the first access get
+    the same class, and ``except Model.SoftDeleted`` catches all of them.
+    """
 
-    @classmethod
-    def _add_soft_deleted_exception(mcs, new_class, parents):
-        module = mcs.__module__
+    cache_name = '_soft_deleted_exception'
 
-        parents_soft_delete_exceptions = tuple(
-            parent.DoesNotExist for parent in parents
-            if hasattr(parent, '_meta') and not parent._meta.abstract and hasattr(parent, 'DoesNotExist')
-        )
+    def __init__(self):
+        # reentrant: creating the exception reads SoftDeleted of the parents
+        self.lock = threading.RLock()
 
-        default = mcs._get_default_exception_bases(new_class, 'DoesNotExist', SoftDeleted)
+    def __get__(self, instance, owner):
+        if self.cache_name in owner.__dict__:
+            return owner.__dict__[self.cache_name]
 
-        new_class.add_to_class(
+        if owner._meta.abstract:
+            raise AttributeError("Abstract model '%s' has no SoftDeleted." % owner.__name__)
+
+        with self.lock:
+            if self.cache_name not in owner.__dict__:
+                setattr(owner, self.cache_name, self._create(owner))
+        return owner.__dict__[self.cache_name]
+
+    @staticmethod
+    def _create(owner):
+        parents = tuple(
+            parent.SoftDeleted for parent in owner.__bases__
+            if isinstance(parent, ParanoidMeta) and not parent._meta.abstract
+        )
+        return subclass_exception(
             name='SoftDeleted',
-            value=subclass_exception(
-                name='SoftDeleted',
-                bases=parents_soft_delete_exceptions or default,
-                module=module,
-                attached_to=new_class
-            )
+            bases=(owner.DoesNotExist,) + (parents or (SoftDeleted,)),
+            module=owner.__module__,
+            attached_to=owner
         )
 
-    @classmethod
-    def _get_default_exception_bases(mcs, new_class, name, base_exception):
-        if hasattr(new_class, name):
-            return getattr(new_class, name), base_exception
-        return base_exception,
+
+class ParanoidMeta(ModelBase):
+    def __new__(mcs, name, bases, attrs, **kwargs):
+        attr_meta = attrs.get('Meta')
+        if attr_meta is not None:
+            mcs._pop_paranoid_options(attr_meta)
+
+        new_class = super().__new__(mcs, name, bases, attrs, **kwargs)
+        mcs._add_paranoid_options(new_class, attr_meta or getattr(new_class, 'Meta', None))
+        return new_class
+
+    @staticmethod
+    def _pop_paranoid_options(meta):
+        """
+        Remove paranoid options from Meta, because Django doesn't accept them,
+        and keep them on ``Meta._paranoid_options`` so they are inherited.
+        """
+        options = dict(getattr(meta, '_paranoid_options', {}))
+        for option in PARANOID_OPTIONS:
+            if option in meta.__dict__:
+                options[option] = meta.__dict__[option]
+                delattr(meta, option)
+        meta._paranoid_options = options
+
+    @staticmethod
+    def _add_paranoid_options(new_class, meta):
+        options = getattr(meta, '_paranoid_options', {})
+        for option, default in PARANOID_OPTIONS.items():
+            setattr(new_class._meta, option, options.get(option, default))
 
 
 class Paranoid(models.Model, metaclass=ParanoidMeta):
@@ -63,6 +112,7 @@ class Paranoid(models.Model, metaclass=ParanoidMeta):
         is_soft_deleted: bool
     """
     IsNotSoftDeleted = IsNotSoftDeleted
+    SoftDeleted = SoftDeletedDescriptor()
     objects = ParanoidManager()
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -85,63 +135,30 @@ class Paranoid(models.Model, metaclass=ParanoidMeta):
         """
         Override default delete method so Soft Delete can be made.
         If delete is hard_delete, the soft delete is ignored and the
-        instance is deleted from the database
+        instance is deleted from the database.
+        Soft delete doesn't call save(), so pre_save and post_save are not
+        sent, paranoid_model.signals.pre_soft_delete and post_soft_delete are.
         Args:
             using: default None
             keep_parents: default False
             hard_delete: boolean default False
         """
         if not hard_delete:
-            self.deleted_at = timezone.now()
-            self.save(using=using)
-
-            for instance in self._related_objects(using):
-                if isinstance(instance, Paranoid):
-                    instance.delete(using=using)
+            using = using or router.db_for_write(self.__class__, instance=self)
+            self.deleted_at = Cascade(self.__class__, [self.pk], using).soft_delete()
+            self.updated_at = self.deleted_at
         else:
-            super(Paranoid, self).delete(using=using, keep_parents=keep_parents)
+            with instrument(PURGE, self.__class__) as operation:
+                _, deleted = super(Paranoid, self).delete(using=using, keep_parents=keep_parents)
+                for label, amount in deleted.items():
+                    operation.add(apps.get_model(label), amount)
 
     def restore(self, using=None):
         """
-        Restore an instance once deleted and instance's related objects
-        """
-        self.deleted_at = None
-        self.save(using=using)
-
-        for related in self._related_objects(using):
-            if 'deleted_at' in related.__dict__.keys():
-                related.deleted_at = None
-                related.save(using=using)
-
-    def _related_objects(self, using):
-        """
-        Method to get all objects with foreign key the relation with self instance
-        Args:
-            self
-        Returns:
-            List(): all related objects
+        Restore an instance once deleted and instance's related objects.
+        Restore doesn't call save(), so pre_save and post_save are not
+        sent, paranoid_model.signals.pre_restore and post_restore are.
         """
         using = using or router.db_for_write(self.__class__, instance=self)
-
-        collector = NestedObjects(using=using)
-        collector.collect([self])
-
-        def parse_list(obj):
-            """
-            Parse to nested objects
-            Args:
-                obj: list instance or models object instance
-            Returns:
-                list(): list with objects
-            """
-            if isinstance(obj, list):
-                array = []
-                for item in obj:
-                    array += parse_list(item)
-                return array
-            return [obj]
-
-        colletion = parse_list(collector.nested())
-        colletion.remove(self)
-
-        return colletion
+        self.updated_at = Cascade(self.__class__, [self.pk], using).restore()
+        self.deleted_at = None
@@ -0,0 +1,104 @@
+"""
+File with migration operations of Paranoid Model
+"""
+
+
+from django.db.migrations.operations.base import Operation
+from paranoid_model import partitions, triggers
+
+
+class InstallCascadeTriggers(Operation):
+    """
+    Install the database triggers that soft delete and restore model's
+    children on cascade, see paranoid_model.triggers.
+    Model's Meta must have ``paranoid_db_cascade = True``, so Paranoid
+    leaves that cascade to the database.
+
+    Supported on PostgreSQL and SQLite, other databases are ignored.
+    Args:
+        model_name: name of the model
+    """
+
+    reversible = True
+    reduces_to_sql = True
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def deconstruct(self):
+        return self.__class__.__name__, [self.model_name], {}
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            for sql in triggers.install_sql(schema_editor.connection, model):
+                schema_editor.execute(sql, params=None)
+            triggers.installed.cache_clear()
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            for sql in triggers.drop_sql(schema_editor.connection, model):
+                schema_editor.execute(sql, params=None)
+            triggers.installed.cache_clear()
+
+    def describe(self):
+        return 'Install soft delete cascade triggers on %s' % self.model_name
+
+    @property
+    def migration_name_fragment(self):
+        return 'paranoid_triggers_%s' % self.model_name.lower()
+
+
+class PartitionByDeletedAt(Operation):
+    """
+    Partition model's table by ``deleted_at``, see paranoid_model.partitions.
+    Model's Meta must have ``paranoid_partition`` with the same value of ``by``,
+    so soft delete and purge know about the partitions.
+
+    The table can't be referenced by foreign keys nor have unique fields
+    other than the primary key.
+
+    Supported on PostgreSQL 11+, other databases are ignored.
+    Args:
+        model_name: name of the model
+        by: 'state' or 'month'
+    """
+
+    reversible = True
+    reduces_to_sql = True
+
+    def __init__(self, model_name, by):
+        if by not in (partitions.STATE, partitions.MONTH):
+            raise ValueError("PartitionByDeletedAt 'by' must be 'state' or 'month', not %r." % by)
+
+        self.model_name = model_name
+        self.by = by
+
+    def deconstruct(self):
+        return self.__class__.__name__, [self.model_name, self.by], {}
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            for sql in partitions.partition_sql(schema_editor, model, self.by):
+                schema_editor.execute(sql, params=None)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            for sql in partitions.unpartition_sql(schema_editor, model):
+                schema_editor.execute(sql, params=None)
+
+    def describe(self):
+        return 'Partition %s by deleted_at %s' % (self.model_name, self.by)
+
+    @property
+    def migration_name_fragment(self):
+        return 'paranoid_partition_%s' % self.model_name.lower()
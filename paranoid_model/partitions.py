@@ -0,0 +1,334 @@
+"""
+File with the PostgreSQL partitioning of Paranoid tables by ``deleted_at``.
+Live rows (deleted_at NULL) are kept on the DEFAULT partition, so queries
+filtering ``deleted_at IS NULL`` are pruned to it and never touch dead rows.
+Soft deleted rows are kept on:
+    - 'state': a single partition with every soft deleted row
+    - 'month': a partition per month of deleted_at, so a purge can drop it
+
+Partition a table with paranoid_model.operations.PartitionByDeletedAt and set
+``paranoid_partition`` on the model's Meta. Other databases are ignored.
+
+Partitions dropped or truncated by a purge send ``pre_purge`` and
+``post_purge`` with their primary keys, when they have receivers.
+"""
+
+
+import datetime
+
+from django.db import connections, transaction
+from django.db.backends.utils import truncate_name
+from django.db.utils import DatabaseError
+from django.utils import timezone
+from paranoid_model.instrumentation import instrument, stage, PURGE, SIGNALS, WRITE
+from paranoid_model.pkset import PkSet
+from paranoid_model.signals import pre_purge, post_purge
+
+
+STATE = 'state'
+MONTH = 'month'
+
+# (table, using, month) whose partition was created, or could not be
+_checked_months = set()
+
+
+def is_partitioned(model, using):
+    """
+    Check if model's table is partitioned on database
+    Args:
+        model: model class
+        using: database alias
+    Returns:
+        bool
+    """
+    return (
+        getattr(model._meta, 'paranoid_partition', None) in (STATE, MONTH) and
+        connections[using].vendor == 'postgresql'
+    )
+
+
+def partition_name(model, suffix):
+    """
+    Name of a partition, or other object, of model's table. Only the
+    table's name is truncated, so names can be told apart by its suffix.
+    Args:
+        model: model class
+        suffix: str
+    Returns:
+        str
+    """
+    return '%s_%s' % (truncate_name(model._meta.db_table, 63 - len(suffix) - 1), suffix)
+
+
+def _utc(timestamp):
+    """Partitions are bounded on the connection's time zone, UTC"""
+    if timezone.is_aware(timestamp):
+        return timestamp.astimezone(datetime.timezone.utc)
+    return timestamp
+
+
+def month_start(timestamp):
+    timestamp = _utc(timestamp)
+    return datetime.date(timestamp.year, timestamp.month, 1)
+
+
+def next_month(month):
+    if month.month == 12:
+        return datetime.date(month.year + 1, 1, 1)
+    return datetime.date(month.year, month.month + 1, 1)
+
+
+def month_partition_prefix(model):
+    """Name of model's month partitions without its 'YYYYMM' ending"""
+    return partition_name(model, 'pYYYYMM')[:-len('YYYYMM')]
+
+
+def month_partition_name(model, month):
+    return '%s%04d%02d' % (month_partition_prefix(model), month.year, month.month)
+
+
+def check_partitionable(model):
+    """
+    Raise ValueError if model's table can not be partitioned: PostgreSQL
+    requires unique constraints to include the partition key, so the table
+    can't be referenced by foreign keys nor have unique fields.
+    Args:
+        model: model class, may be a historical model from migrations
+    """
+    opts = model._meta
+    if opts.related_objects:
+        raise ValueError(
+            '%s can not be partitioned because it is referenced by %s.' % (
+                opts.object_name,
+                ', '.join(sorted(rel.related_model._meta.object_name for rel in opts.related_objects)))
+        )
+
+    unique = [field.name for field in opts.local_fields if field.unique and not field.primary_key]
+    if unique or opts.unique_together:
+        raise ValueError(
+            '%s can not be partitioned because it has unique constraints.' % opts.object_name)
+
+
+def _copy_table_sql(schema_editor, model, old_table, partition_by):
+    """SQL to create model's table from old_table and move its rows"""
+    qn = schema_editor.quote_name
+    table = model._meta.db_table
+    pk = model._meta.pk.column
+
+    sql = [
+        'CREATE TABLE %s (LIKE %s INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING CONSTRAINTS)%s;' % (
+            qn(table), qn(old_table), partition_by),
+    ]
+    return sql, [
+        'INSERT INTO %s SELECT * FROM %s;' % (qn(table), qn(old_table)),
+        # serial columns keep their sequence, owned by the new table
+        "DO $$ DECLARE seq text := pg_get_serial_sequence('%(old)s', '%(pk)s'); BEGIN "
+        "IF seq IS NOT NULL AND NOT EXISTS (SELECT 1 FROM information_schema.columns "
+        "WHERE table_name = '%(old)s' AND column_name = '%(pk)s' AND is_identity = 'YES') "
+        "THEN EXECUTE format('ALTER SEQUENCE %%s OWNED BY %%I.%%I', seq, '%(table)s', '%(pk)s'); "
+        "END IF; END $$;" % {'old': old_table, 'table': table, 'pk': pk},
+        "SELECT setval(pg_get_serial_sequence('%(table)s', '%(pk)s'), COALESCE(MAX(%(qpk)s), 1)) "
+        "FROM %(qtable)s;" % {'table': table, 'pk': pk, 'qpk': qn(pk), 'qtable': qn(table)},
+        'DROP TABLE %s CASCADE;' % qn(old_table),
+    ]
+
+
+def _constraints_sql(schema_editor, model):
+    """SQL to recreate model's foreign keys and indexes"""
+    sql = [
+        schema_editor._create_fk_sql(model, field, '_fk_%(to_table)s_%(to_column)s')
+        for field in model._meta.local_fields
+        if field.remote_field and field.db_constraint
+    ]
+    return sql + schema_editor._model_indexes_sql(model)
+
+
+def partition_sql(schema_editor, model, by):
+    """
+    SQL statements to partition model's table by deleted_at
+    Args:
+        schema_editor: Django's schema editor
+        model: model class, may be a historical model from migrations
+        by: 'state' or 'month'
+    Returns:
+        list(str)
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return []
+
+    check_partitionable(model)
+
+    qn = schema_editor.quote_name
+    table = model._meta.db_table
+    old_table = partition_name(model, 'unpartitioned')
+
+    create, move = _copy_table_sql(schema_editor, model, old_table, ' PARTITION BY RANGE (%s)' % qn('deleted_at'))
+    sql = ['ALTER TABLE %s RENAME TO %s;' % (qn(table), qn(old_table))] + create + [
+        'ALTER TABLE %s ADD CONSTRAINT %s UNIQUE (%s, %s);' % (
+            qn(table), qn(partition_name(model, 'pk_deleted_at_uniq')),
+            qn(model._meta.pk.column), qn('deleted_at')),
+        'CREATE TABLE %s PARTITION OF %s DEFAULT;' % (qn(partition_name(model, 'live')), qn(table)),
+    ]
+
+    if by == STATE:
+        sql.append('CREATE TABLE %s PARTITION OF %s FOR VALUES FROM (MINVALUE) TO (MAXVALUE);' % (
+            qn(partition_name(model, 'deleted')), qn(table)))
+    else:
+        # a partition for every month with soft deleted rows
+        sql.append(
+            "DO $$ DECLARE month date; BEGIN FOR month IN SELECT DISTINCT "
+            "date_trunc('month', %(deleted_at)s)::date FROM %(old)s WHERE %(deleted_at)s IS NOT NULL LOOP "
+            "EXECUTE format('CREATE TABLE %%I PARTITION OF %%I FOR VALUES FROM (%%L) TO (%%L)', "
+            "'%(prefix)s' || to_char(month, 'YYYYMM'), '%(table)s', month, month + interval '1 month'); "
+            "END LOOP; END $$;" % {
+                'deleted_at': qn('deleted_at'), 'old': qn(old_table), 'table': table,
+                'prefix': month_partition_prefix(model),
+            }
+        )
+
+    return sql + move + _constraints_sql(schema_editor, model)
+
+
+def unpartition_sql(schema_editor, model):
+    """
+    SQL statements to turn model's partitioned table back into a regular one
+    Args:
+        schema_editor: Django's schema editor
+        model: model class, may be a historical model from migrations
+    Returns:
+        list(str)
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return []
+
+    qn = schema_editor.quote_name
+    table = model._meta.db_table
+    old_table = partition_name(model, 'partitioned')
+
+    create, move = _copy_table_sql(schema_editor, model, old_table, '')
+    return ['ALTER TABLE %s RENAME TO %s;' % (qn(table), qn(old_table))] + create + [
+        'ALTER TABLE %s ADD PRIMARY KEY (%s);' % (qn(table), qn(model._meta.pk.column)),
+    ] + move + _constraints_sql(schema_editor, model)
+
+
+def ensure_month_partition(model, timestamp, using):
+    """
+    Create the partition of timestamp's month, if it doesn't exist yet, so
+    rows soft deleted now are not kept on the live partition.
+    It is tried once per month and process: when it fails, like when the
+    live partition already has rows of that month, those rows stay on the
+    live partition, and trying again would lock and scan it every time.
+    Creating a partition locks the table and scans the live partition, so
+    it is made on its own transaction, before the soft delete's one, see
+    Cascade.soft_delete(), unless the soft delete is inside a transaction.
+    Args:
+        model: model class with paranoid_partition = 'month'
+        timestamp: datetime
+        using: database alias
+    """
+    if not is_partitioned(model, using) or model._meta.paranoid_partition != MONTH:
+        return
+
+    month = month_start(timestamp)
+    key = (model._meta.db_table, using, month)
+    if key in _checked_months:
+        return
+
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    try:
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'CREATE TABLE IF NOT EXISTS %s PARTITION OF %s FOR VALUES FROM (%%s) TO (%%s);' % (
+                        qn(month_partition_name(model, month)), qn(model._meta.db_table)),
+                    [month, next_month(month)]
+                )
+    except DatabaseError:
+        # live partition already has rows of this month, they stay there
+        pass
+
+    _checked_months.add(key)
+
+
+def _remove(cursor, model, name, statement, using):
+    """
+    Run statement, a DROP or TRUNCATE of a partition, sending pre_purge and
+    post_purge with the partition's primary keys, a batch at a time, when
+    they have receivers, like paranoid_model.cascade.FastPurge
+    Returns:
+        int: amount of rows removed
+    """
+    from paranoid_model.cascade import batches
+
+    qn = cursor.db.ops.quote_name
+    if not (pre_purge.has_listeners(model) or post_purge.has_listeners(model)):
+        cursor.execute('SELECT COUNT(*) FROM %s;' % qn(name))
+        amount = cursor.fetchone()[0]
+        with stage(WRITE):
+            cursor.execute(statement)
+        return amount
+
+    cursor.execute('SELECT %s FROM %s;' % (qn(model._meta.pk.column), qn(name)))
+    pks = PkSet()
+    try:
+        for rows in iter(lambda: cursor.fetchmany(1000), []):
+            pks.update(pk for pk, in rows)
+
+        for batch in batches(pks):
+            with stage(SIGNALS):
+                pre_purge.send(sender=model, pks=batch, using=using)
+        with stage(WRITE):
+            cursor.execute(statement)
+        for batch in batches(pks):
+            with stage(SIGNALS):
+                post_purge.send(sender=model, pks=batch, using=using)
+        return len(pks)
+    finally:
+        pks.close()
+
+
+def purge_partitions(model, before, using):
+    """
+    Hard delete soft deleted rows by dropping whole partitions, without
+    scanning them: month partitions with every row soft deleted before
+    ``before`` are dropped, and with ``before`` None the 'state' partition
+    of soft deleted rows is truncated.
+    Rows on other partitions are left to a regular DELETE.
+    Args:
+        model: model class
+        before: datetime or None for every soft deleted row
+        using: database alias
+    Returns:
+        int: amount of rows removed
+    """
+    if not is_partitioned(model, using):
+        return 0
+
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    amount = 0
+
+    with instrument(PURGE, model) as operation, connection.cursor() as cursor:
+        if model._meta.paranoid_partition == STATE:
+            if before is None:
+                name = partition_name(model, 'deleted')
+                amount = _remove(cursor, model, name, 'TRUNCATE TABLE %s;' % qn(name), using)
+        else:
+            prefix = month_partition_prefix(model)
+            cursor.execute(
+                'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+                'WHERE i.inhparent = %s::regclass', [model._meta.db_table])
+            names = sorted(name for name, in cursor.fetchall() if name.startswith(prefix))
+
+            for name in names:
+                month = datetime.date(int(name[-6:-2]), int(name[-2:]), 1)
+                if before is not None and next_month(month) > _utc(before).date():
+                    continue
+
+                amount += _remove(cursor, model, name, 'DROP TABLE %s;' % qn(name), using)
+                _checked_months.discard((model._meta.db_table, using, month))
+
+        operation.add(model, amount)
+
+    return amount
@@ -0,0 +1,167 @@
+"""
+File with PkSet, the compact set of primary keys used by the cascade.
+Integer primary keys are kept on sorted ``array('q')`` segments, 8 bytes
+per key instead of a Python int on a set, and segments above setting
+CASCADE_MEMORY_ROWS are spilled to temporary files read with mmap, so the
+memory used by a cascade stays bounded however many rows it reaches.
+Other primary keys, like UUIDs, are kept on a regular set.
+"""
+
+
+import heapq
+import mmap
+import tempfile
+from array import array
+from bisect import bisect_left
+
+from paranoid_model.conf import get_setting
+
+
+# Keys added since the last flush, kept on a set until they are sorted into a segment
+BUFFER_SIZE = 4096
+
+
+def _contains(segment, pk):
+    index = bisect_left(segment, pk)
+    return index < len(segment) and segment[index] == pk
+
+
+def _is_compact(pk):
+    return isinstance(pk, int) and not isinstance(pk, bool) and -2 ** 63 <= pk < 2 ** 63
+
+
+class PkSet:
+    """
+    Set of primary keys, supporting only what the cascade needs: add,
+    membership, length and iteration, in ascending order for integers.
+    Args:
+        pks: iterable of primary keys
+        spill_rows: int max amount of keys kept in memory. Default {setting CASCADE_MEMORY_ROWS}
+    """
+
+    def __init__(self, pks=(), spill_rows=None):
+        self.spill_rows = spill_rows or get_setting('CASCADE_MEMORY_ROWS')
+        self.compact = True
+        self._buffer = set()
+        self._segments = []
+        self._spilled = []
+        self._files = []
+        self._size = 0
+        self.update(pks)
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, pk):
+        if pk in self._buffer:
+            return True
+        if not self.compact or not _is_compact(pk):
+            return False
+        return any(_contains(segment, pk) for segment in self._spilled + self._segments)
+
+    def __iter__(self):
+        if not self.compact:
+            return iter(self._buffer)
+        return heapq.merge(*(self._spilled + self._segments + [sorted(self._buffer)]))
+
+    def __repr__(self):
+        return '<PkSet of %s keys>' % self._size
+
+    @property
+    def spilled(self):
+        """Amount of keys kept on temporary files"""
+        return sum(len(segment) for segment in self._spilled)
+
+    def add(self, pk):
+        """
+        Add a primary key
+        Returns:
+            bool: False if it was already there
+        """
+        return bool(self.add_new([pk]))
+
+    def update(self, pks):
+        """Add many primary keys, a buffer at a time"""
+        chunk = []
+        for pk in pks:
+            chunk.append(pk)
+            if len(chunk) >= BUFFER_SIZE:
+                self.add_new(chunk)
+                chunk = []
+        if chunk:
+            self.add_new(chunk)
+
+    def add_new(self, pks):
+        """
+        Add many primary keys
+        Returns:
+            list: primary keys that were not there yet
+        """
+        new = set(pks)
+        if self.compact and not all(_is_compact(pk) for pk in new):
+            self._expand()
+
+        new -= self._buffer
+        if self.compact and new:
+            low, high = min(new), max(new)
+            for segment in self._spilled + self._segments:
+                # only keys within the segment's range may be there
+                if new and low <= segment[-1] and high >= segment[0]:
+                    new = {pk for pk in new if not (segment[0] <= pk <= segment[-1] and _contains(segment, pk))}
+
+        self._buffer |= new
+        self._size += len(new)
+        if self.compact and len(self._buffer) >= BUFFER_SIZE:
+            self._flush()
+        return list(new)
+
+    def difference(self, other):
+        """
+        Returns:
+            PkSet: keys not in other
+        """
+        return PkSet((pk for pk in self if pk not in other), self.spill_rows)
+
+    def _expand(self):
+        """Move every key to the buffer set, once a key can't be compacted"""
+        pks = set(self)
+        self.close()
+        self.compact = False
+        self._buffer = pks
+
+    def _flush(self):
+        """
+        Sort the buffer into a segment, merging and spilling segments when needed.
+        A segment is merged with the previous one while it is not smaller, so
+        there are only a logarithmic amount of segments and each key is merged
+        a logarithmic amount of times.
+        """
+        self._segments.append(array('q', sorted(self._buffer)))
+        self._buffer = set()
+
+        while len(self._segments) > 1 and len(self._segments[-1]) >= len(self._segments[-2]):
+            last = self._segments.pop()
+            # timsort merges the two sorted runs in linear time
+            self._segments[-1] = array('q', sorted(self._segments[-1] + last))
+
+        in_memory = sum(len(segment) for segment in self._segments)
+        if in_memory >= self.spill_rows:
+            merged = array('q', sorted(sum(self._segments, array('q'))))
+            self._segments = []
+            self._spill(merged)
+
+    def _spill(self, segment):
+        file = tempfile.TemporaryFile(prefix='paranoid_model_')
+        segment.tofile(file)
+        file.flush()
+        self._files.append((file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)))
+        self._spilled.append(memoryview(self._files[-1][1]).cast('q'))
+
+    def close(self):
+        """Remove the temporary files"""
+        for view in self._spilled:
+            view.release()
+        for file, mapped in self._files:
+            mapped.close()
+            file.close()
+        self._spilled, self._segments, self._files = [], [], []
@@ -0,0 +1,169 @@
+"""
+File with the profiling of Paranoid Model operations.
+``profile()`` captures every query made on current thread, and by the
+threads writing a parallel cascade, grouped by the stage of the operation
+making it: 'discovery' of the cascade, 'write' of its rows, 'signals'
+receivers, 'audit' log, 'finish' callbacks, or 'other' outside them.
+"""
+
+
+import heapq
+import itertools
+import json
+import random
+import threading
+import time
+from collections import namedtuple, OrderedDict
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections, DatabaseError, NotSupportedError
+from paranoid_model.instrumentation import current_stage
+
+
+OTHER = 'other'
+EXPLAINABLE = ('SELECT', 'UPDATE', 'DELETE')
+
+Query = namedtuple('Query', 'sql params using stage duration')
+
+_local = threading.local()
+
+
+def current_profile():
+    """
+    Profile capturing queries of current thread
+    Returns:
+        Profile or None
+    """
+    return getattr(_local, 'profile', None)
+
+
+class Profile:
+    """
+    Queries captured by profile(): amount and time per stage, and the
+    heaviest ones, with their plan.
+    Args:
+        top: int amount of heaviest queries kept
+        explain: int amount of heaviest queries to EXPLAIN
+        sampled: bool, False when queries are not captured
+    """
+
+    def __init__(self, top=10, explain=0, sampled=True):
+        self.top = max(top, explain)
+        self.explain = explain
+        self.sampled = sampled
+        self.queries = 0
+        self.duration = 0.0
+        self.stages = OrderedDict()
+        self.plans = {}
+        self._heaviest = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper recording the query, of any thread"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            query = Query(sql, None if many else params, context['connection'].alias,
+                          current_stage() or OTHER, duration)
+            self._add(query)
+
+    def _add(self, query):
+        with self._lock:
+            self.queries += 1
+            self.duration += query.duration
+            stage = self.stages.setdefault(query.stage, {'queries': 0, 'duration': 0.0})
+            stage['queries'] += 1
+            stage['duration'] += query.duration
+
+            item = (query.duration, next(self._counter), query)
+            if len(self._heaviest) < self.top:
+                heapq.heappush(self._heaviest, item)
+            elif self._heaviest and item > self._heaviest[0]:
+                heapq.heapreplace(self._heaviest, item)
+
+    def heaviest(self):
+        """
+        Returns:
+            list of Query, slowest first
+        """
+        return [query for _, _, query in sorted(self._heaviest, reverse=True)]
+
+    def run_explain(self):
+        """EXPLAIN the heaviest queries, kept on ``plans`` by position on heaviest()"""
+        for index, query in enumerate(self.heaviest()[:self.explain]):
+            if query.params is None or not query.sql.lstrip().upper().startswith(EXPLAINABLE):
+                continue
+
+            connection = connections[query.using]
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('%s %s' % (connection.ops.explain_query_prefix(), query.sql), query.params)
+                    self.plans[index] = '\n'.join(' '.join(str(value) for value in row) for row in cursor.fetchall())
+            except (DatabaseError, NotSupportedError) as error:
+                self.plans[index] = 'EXPLAIN failed: %s' % error
+
+    def report(self):
+        """
+        Structured report of the profile
+        Returns:
+            dict {
+                'sampled': bool,
+                'queries': int,
+                'duration': float seconds,
+                'stages': {stage: {'queries': int, 'duration': float}},
+                'heaviest': [{'sql', 'params', 'using', 'stage', 'duration', 'plan'}],
+            }
+        """
+        return {
+            'sampled': self.sampled,
+            'queries': self.queries,
+            'duration': self.duration,
+            'stages': {name: dict(stage) for name, stage in self.stages.items()},
+            'heaviest': [
+                dict(query._asdict(), plan=self.plans.get(index))
+                for index, query in enumerate(self.heaviest())
+            ],
+        }
+
+    def to_json(self, **kwargs):
+        """
+        Args:
+            **kwargs: passed to json.dumps
+        Returns:
+            str: report() as JSON
+        """
+        return json.dumps(self.report(), default=str, **kwargs)
+
+
+@contextmanager
+def profile(top=10, explain=0, sample_rate=1.0):
+    """
+    Context manager to profile the queries made inside it, like a slow
+    soft delete or restore, including its cascade.
+    EXPLAIN is run once the block has finished, and it is not captured.
+    Args:
+        top: int amount of heaviest queries reported. Default {10}
+        explain: int amount of heaviest queries to EXPLAIN. Default {0}
+        sample_rate: float between 0 and 1, chance of capturing the queries,
+            to profile a sample of production requests. Default {1.0}
+    Yields:
+        Profile: its ``report()`` is complete once the block has finished
+    """
+    if current_profile() is not None or random.random() >= sample_rate:
+        yield Profile(top, explain, sampled=False)
+        return
+
+    result = _local.profile = Profile(top, explain)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(result))
+            yield result
+    finally:
+        _local.profile = None
+
+    if explain:
+        result.run_explain()
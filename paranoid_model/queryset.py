@@ -3,8 +3,17 @@ File with QuerySet used on Paranoid Model
 """
 
 
-from django.db import models
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import IntegrityError, models, router, transaction
+from django.db.models import BooleanField, Case, F, Q, Value, When
+from django.db.models.constants import LOOKUP_SEP
 from paranoid_model.exceptions import IsNotSoftDeleted
+from paranoid_model.cascade import (
+    Cascade, FastPurge, PurgeCascade, read_database, batches, is_paranoid, fast_purge_paths, BATCH_SIZE
+)
+from paranoid_model.instrumentation import instrument, PURGE, SOFT_DELETE
+from paranoid_model.pkset import PkSet
 import paranoid_model.models
 
 
@@ -13,11 +22,56 @@ class ParanoidQuerySet(models.query.QuerySet):
     QuerySet for a Paranoid Model with field ``deleted_at`` as a mask
     """
 
-    def get(self, *args, **kwargs):
+    _state_cache = None
+
+    def _clone(self, *args, **kwargs):
+        clone = super(ParanoidQuerySet, self)._clone(*args, **kwargs)
+        clone._state_cache = self._state_cache
+        return clone
+
+    def _cached_pk(self, args, kwargs):
+        """
+        Primary key of a get(pk=...) that can be served by the state cache
+        Returns:
+            primary key or None if query can not use the cache
+        """
+        query = self.query
+        if (self._state_cache is None or args or len(kwargs) != 1 or query.where or
+                query.low_mark or query.high_mark is not None or query.select_related or
+                query.annotations or query.extra or query.deferred_loading[0] or
+                self._iterable_class is not models.query.ModelIterable or
+                self._prefetch_related_lookups):
+            return None
+
+        key, value = next(iter(kwargs.items()))
+        pk = self.model._meta.pk
+        if key not in ('pk', 'pk__exact', pk.name, pk.name + '__exact', pk.attname):
+            return None
+
+        try:
+            return pk.get_prep_value(pk.to_python(value))
+        except (ValidationError, TypeError, ValueError):
+            return None
+
+    def _get_with_cache(self, *args, **kwargs):
+        """Django's get(), served by the state cache when possible"""
+        pk = self._cached_pk(args, kwargs)
+        if pk is None or not self._state_cache.usable(self.db):
+            return super(ParanoidQuerySet, self).get(*args, **kwargs)
+
+        obj = self._state_cache.get_instance(self.model, self.db, pk)
+        if obj is None:
+            version = self._state_cache.version(self.model, self.db, pk)
+            obj = super(ParanoidQuerySet, self).get(*args, **kwargs)
+            self._state_cache.set_instance(obj, self.db, version)
+        return obj
+
+    def get(self, *args, with_deleted=False, **kwargs):
         """
         Override default behavior of Django's get() to apply a custom validation
         Args:
              *args: passed to Django's get
+             with_deleted: bool to also get a soft deleted instance. Default {False}
              **kwargs: passed to Django's get
         Returns:
             Object, instance of object not soft deleted or not hard deleted
@@ -26,9 +80,9 @@ class ParanoidQuerySet(models.query.QuerySet):
             paranoid_model.SoftDeleted: object has been soft deleted
             model.MultipleObjectsReturned: if filtered more than 1 instance
         """
-        obj = super(ParanoidQuerySet, self).get(*args, **kwargs)
+        obj = self._get_with_cache(*args, **kwargs)
 
-        if obj.is_soft_deleted:
+        if obj.is_soft_deleted and not with_deleted:
             raise obj.SoftDeleted(
                 "Object %s has been soft deleted. Try use get_deleted() or get_or_restore()." %
                 self.model._meta.object_name)
@@ -48,8 +102,19 @@ class ParanoidQuerySet(models.query.QuerySet):
             paranoid_model.IsNotSoftDeleted: object has not been soft deleted yet
             model.MultipleObjectsReturned: if filtered more than 1 instance
         """
-        kwargs['deleted_at__isnull'] = False
-        objeto = super(ParanoidQuerySet, self).get(*arg, **kwargs)
+        if self._cached_pk(arg, kwargs) is not None:
+            objeto = self._get_with_cache(*arg, **kwargs)
+        else:
+            # Only a soft deleted row is fully loaded, a live one is told
+            # apart from a missing one by a probe of pk and deleted_at.
+            try:
+                objeto = super(ParanoidQuerySet, self).get(Q(deleted_at__isnull=False), *arg, **kwargs)
+            except self.model.DoesNotExist:
+                probe = self.values_list('pk', 'deleted_at')
+                super(ParanoidQuerySet, probe).get(*arg, **kwargs)
+                raise IsNotSoftDeleted(
+                    "Object %s has not been soft deleted yet. Try get()" %
+                    self.model._meta.object_name)
 
         if not objeto.is_soft_deleted:
             raise IsNotSoftDeleted(
@@ -71,12 +136,127 @@ class ParanoidQuerySet(models.query.QuerySet):
             model.MultipleObjectsReturned: (Django) more than 1 instances with matches querry
         """
 
+        using = self._db_for_write(kwargs.pop('using', None))
         objeto = super(ParanoidQuerySet, self).get(*args, **kwargs)
-        using = kwargs.pop('using', None)
         if objeto.is_soft_deleted:
             objeto.restore(using)
         return objeto
 
+    def _live_or_last_deleted(self, kwargs, with_deleted, lock):
+        """
+        Instance matching kwargs with a single query: the live one or, when
+        there is none and with_deleted, the last soft deleted one.
+        Raise:
+            model.MultipleObjectsReturned: more than 1 live instance
+        Returns:
+            Object or None
+        """
+        queryset = self.filter(**kwargs)
+        if not with_deleted:
+            queryset = queryset.filter(Q(deleted_at__isnull=True))
+        if lock:
+            queryset = queryset.select_for_update()
+
+        found = list(queryset.order_by(F('deleted_at').desc(nulls_first=True), '-pk')[:2])
+        if len(found) == 2 and not found[1].is_soft_deleted:
+            raise self.model.MultipleObjectsReturned(
+                'get_or_create() returned more than one live %s.' % self.model._meta.object_name)
+        return found[0] if found else None
+
+    def _create_or_get_live(self, defaults, kwargs):
+        """
+        Create an instance with kwargs and defaults, like Django's get_or_create().
+        When a concurrent create wins, the live instance it created is returned.
+        """
+        params = {key: value for key, value in kwargs.items() if LOOKUP_SEP not in key}
+        params.update(defaults or {})
+        params = {key: value() if callable(value) else value for key, value in params.items()}
+        try:
+            with transaction.atomic(using=self.db):
+                return self.create(**params), True
+        except IntegrityError:
+            try:
+                return self.filter(Q(deleted_at__isnull=True)).get(**kwargs), False
+            except self.model.DoesNotExist:
+                pass
+            raise
+
+    def get_or_create(self, defaults=None, restore=False, **kwargs):
+        """
+        Override default behavior of Django's get_or_create() to tell live,
+        soft deleted and missing instances apart with a single query.
+        With restore, the last soft deleted instance is restored, with its
+        cascade, instead of creating a new one. It is locked with
+        ``select_for_update()`` until restored, so concurrent calls don't
+        create duplicates.
+        Args:
+            defaults: dict of fields used to create. Default {None}
+            restore: bool to restore a soft deleted instance. Default {False}
+            **kwargs: lookups
+        Returns:
+            tuple(Object, bool created)
+        Raise:
+            model.MultipleObjectsReturned: if more than 1 live instance matches
+        """
+        self._for_write = True
+        if restore:
+            with transaction.atomic(using=self.db):
+                obj = self._live_or_last_deleted(kwargs, with_deleted=True, lock=True)
+                if obj is not None and obj.is_soft_deleted:
+                    obj.restore(self.db)
+        else:
+            obj = self._live_or_last_deleted(kwargs, with_deleted=False, lock=False)
+
+        if obj is not None:
+            return obj, False
+        return self._create_or_get_live(defaults, kwargs)
+
+    def update_or_create(self, defaults=None, restore=False, **kwargs):
+        """
+        Override default behavior of Django's update_or_create() like
+        get_or_create(): with restore, the last soft deleted instance is
+        restored and updated instead of creating a new one.
+        Args:
+            defaults: dict of fields to update or create. Default {None}
+            restore: bool to restore a soft deleted instance. Default {False}
+            **kwargs: lookups
+        Returns:
+            tuple(Object, bool created)
+        Raise:
+            model.MultipleObjectsReturned: if more than 1 live instance matches
+        """
+        defaults = defaults or {}
+        self._for_write = True
+        with transaction.atomic(using=self.db):
+            obj = self._live_or_last_deleted(kwargs, with_deleted=restore, lock=True)
+            if obj is None:
+                obj, created = self._create_or_get_live(defaults, kwargs)
+                if created:
+                    return obj, True
+            elif obj.is_soft_deleted:
+                obj.restore(self.db)
+
+            for key, value in defaults.items():
+                setattr(obj, key, value() if callable(value) else value)
+            obj.save(using=self.db)
+        return obj, False
+
+    def soft_delete_state(self, pks):
+        """
+        Soft delete state of many instances at once, fetching only primary
+        key and deleted_at instead of full rows.
+        Args:
+            pks: iterable of primary keys
+        Returns:
+            dict {pk: deleted_at}: deleted_at is None for instances not soft
+            deleted, and pks not found on database are left out
+        """
+        state = {}
+        queryset = self.all(with_deleted=True)
+        for batch in batches(pks):
+            state.update(queryset.filter(pk__in=batch).values_list('pk', 'deleted_at'))
+        return state
+
     def all(self, with_deleted=False):
         """"
         Override default behavior of Django's all() to filter only not soft deleted or
@@ -97,7 +277,8 @@ class ParanoidQuerySet(models.query.QuerySet):
         this method, like a ManyToMant field with related name, and in that case we want
         to have the default behavior and not be on Django's way. So we assume that
         every paranoid method that calls this filter() will pass a with_deleted and so
-        work as user expects.
+        work as user expects. Use paranoid_model.fields.ParanoidManyToManyField to
+        have a ManyToMany that excludes soft deleted links and targets.
 
         It is also assumed that a ParanoidQueryset[] has already filtered the instances
         soft deleted according to the param whith_delted and the nested filter() wont need
@@ -135,41 +316,295 @@ class ParanoidQuerySet(models.query.QuerySet):
             kwargs['deleted_at__isnull'] = True
         return super(ParanoidQuerySet, self).filter(*args_copy, **kwargs)
 
-    def delete(self, hard_delete=False, using=None):
+    def delete(self, hard_delete=False, using=None, dry_run=False, concurrent=False, fast=False):
         """
         Delet instances from current QuerySet
         Args:
             hard_delete: bool to check if apply soft delete or django's delete
+            dry_run: bool to only count the rows the cascade would reach,
+                without writing. Default {False}
+            concurrent: bool to soft delete in batches of rows locked with
+                ``select_for_update(skip_locked=True)``, so workers can soft
+                delete overlapping selections at the same time. Default {False}
+            fast: bool to hard delete without loading instances, see
+                paranoid_model.cascade.FastPurge. Default {False}
         Returns:
-            int(): amount deleted
+            int(): amount deleted, by this call only if concurrent
+            tuple(int total, dict {model label: amount}): if dry_run or hard_delete
         """
 
+        if dry_run:
+            using = self._db_for_write(using)
+            pks = PkSet(self._for_cascade(using).values_list('pk', flat=True).iterator())
+            cascade = PurgeCascade if hard_delete else Cascade
+            return cascade(self.model, pks, using).summary()
+
+        if concurrent and not hard_delete:
+            return self._delete_concurrently(self._db_for_write(using))
+
         if not hard_delete:
-            cont = 0
-            for instance in self:
-                instance.delete(using=using)
-                cont += 1
+            using = self._db_for_write(using)
+            pks = PkSet(self._for_cascade(using).values_list('pk', flat=True).iterator())
+            Cascade(self.model, pks, using).soft_delete()
             # Clear the result cache, in case this QuerySet gets reused.
             self._result_cache = None
-            return cont
+            return len(pks)
         else:
-            return super(ParanoidQuerySet, self).delete()
+            return self._hard_delete(fast)
 
-    def restore(self, using=None):
+    def _hard_delete(self, fast=False):
+        """
+        Hard delete current QuerySet with Django's delete, or with FastPurge
+        when fast and every relation reached allows it
+        Returns:
+            tuple(int total, dict {model label: amount})
+        """
+        with instrument(PURGE, self.model) as operation:
+            if fast and not self.query.is_sliced and fast_purge_paths(self.model) is not None:
+                collected = self._fast_delete(self._db_for_write())
+            else:
+                collected = super(ParanoidQuerySet, self).delete()
+            for label, amount in collected[1].items():
+                operation.add(apps.get_model(label), amount)
+        return collected
+
+    def _fast_delete(self, using, batch_size=BATCH_SIZE):
+        """Hard delete current QuerySet with FastPurge, a batch of roots at a time"""
+        purge = FastPurge(self.model, using)
+        roots = self.using(using).order_by('pk').values_list('pk', flat=True)
+        last = None
+
+        while True:
+            pks = list((roots if last is None else roots.filter(pk__gt=last))[:batch_size])
+            if not pks:
+                break
+            purge.delete(pks)
+            if len(pks) < batch_size:
+                break
+            last = pks[-1]
+
+        # Clear the result cache, in case this QuerySet gets reused.
+        self._result_cache = None
+        return purge.collected()
+
+    def _delete_concurrently(self, using, batch_size=BATCH_SIZE):
+        """
+        Soft delete current QuerySet a batch at a time. Each batch is a
+        transaction that claims live rows not locked by other transactions,
+        and stamps its cascade only on rows still live.
+        Returns:
+            int(): amount of rows soft deleted by this call
+        """
+        claim = self.using(using).filter(Q(deleted_at__isnull=True)).order_by('pk')
+        deleted = 0
+
+        with instrument(SOFT_DELETE, self.model):
+            while True:
+                with transaction.atomic(using=using):
+                    pks = list(claim.select_for_update(skip_locked=True).values_list('pk', flat=True)[:batch_size])
+                    if not pks:
+                        break
+
+                    cascade = Cascade(self.model, pks, using)
+                    cascade.soft_delete(live_only=True)
+                    deleted += cascade.updated.get(self.model, 0)
+
+        # Clear the result cache, in case this QuerySet gets reused.
+        self._result_cache = None
+        return deleted
+
+    def restore(self, using=None, dry_run=False):
         """
         Restore instances from current QuerySet
+        Args:
+            dry_run: bool to only count the rows the cascade would reach,
+                without writing. Default {False}
         Returns:
             int(): amount restored
+            tuple(int total, dict {model label: amount}): if dry_run
         """
 
-        cont = 0
-        for instance in self:
-            if instance.is_soft_deleted:
-                instance.restore(using)
-                cont += 1
+        using = self._db_for_write(using)
+        pks = PkSet(self._for_cascade(using).deleted_only().values_list('pk', flat=True).iterator())
+        if dry_run:
+            return Cascade(self.model, pks, using).summary()
+
+        Cascade(self.model, pks, using).restore()
         # Clear the result cache, in case this QuerySet gets reused.
         self._result_cache = None
-        return cont
+        return len(pks)
+
+    def purge(self, before=None, dry_run=False, fast=False):
+        """
+        Hard delete soft deleted instances from current QuerySet
+        Args:
+            before: datetime to purge only instances soft deleted before it.
+                Default {None}, every soft deleted instance.
+            dry_run: bool to only count the rows the cascade would reach,
+                without writing. Default {False}
+            fast: bool to hard delete without loading instances, see
+                paranoid_model.cascade.FastPurge. Default {False}
+        Returns:
+            int(): amount hard deleted, cascade included
+            tuple(int total, dict {model label: amount}): if dry_run
+        """
+        queryset = self.deleted_only()
+        if before is not None:
+            queryset = queryset.filter(Q(deleted_at__lt=before))
+
+        if dry_run:
+            return queryset.delete(hard_delete=True, dry_run=True)
+
+        collected = queryset._hard_delete(fast)
+
+        # Clear the result cache, in case this QuerySet gets reused.
+        self._result_cache = None
+        return collected[0]
+
+    def _db_for_write(self, using=None):
+        """Database alias used to write, like Django's QuerySet.delete() does"""
+        return using or self._db or router.db_for_write(self.model, **self._hints)
+
+    def _for_cascade(self, using):
+        """QuerySet to read the roots of a cascade written on ``using``"""
+        return self.using(self._db or read_database(self.model, using))
+
+    def as_of(self, timestamp):
+        """
+        Filter instances that were live at a point in time: created at or
+        before it and not soft deleted yet or soft deleted after it.
+        Use paranoid_model.indexes.AsOfIndex to have an indexed query.
+        Args:
+            timestamp: datetime
+        Returns:
+            ParanoidQuerySet[]
+        """
+        return self.filter(
+            Q(deleted_at__isnull=True) | Q(deleted_at__gt=timestamp),
+            created_at__lte=timestamp,
+        )
+
+    def alive_between(self, start, end):
+        """
+        Filter instances that were live at any moment of a period: created
+        at or before its end and not soft deleted yet or soft deleted at or
+        after its start.
+        Use paranoid_model.indexes.AsOfIndex to have an indexed query.
+        Args:
+            start: datetime
+            end: datetime
+        Returns:
+            ParanoidQuerySet[]
+        """
+        return self.filter(
+            Q(deleted_at__isnull=True) | Q(deleted_at__gte=start),
+            created_at__lte=end,
+        )
+
+    def _related_deleted_lookup(self, name):
+        """
+        Lookup of deleted_at of a single related Paranoid object
+        Args:
+            name: ForeignKey or OneToOneField name, or a reverse OneToOne query name
+        Returns:
+            str: like 'owner__deleted_at'
+        """
+        field = self.model._meta.get_field(name)
+        if not (field.is_relation and (field.many_to_one or field.one_to_one)):
+            raise ValueError("'%s' is not a ForeignKey nor a OneToOne relation of %s." % (
+                name, self.model._meta.object_name))
+        if not is_paranoid(field.related_model):
+            raise ValueError("'%s' of %s is not related to a Paranoid model." % (
+                name, self.model._meta.object_name))
+        return '%s__deleted_at' % name
+
+    def with_related_state(self, *names):
+        """
+        Annotate ``<name>_is_deleted`` for each related Paranoid object, on
+        the same query with a JOIN. It is False when there is no related object.
+        Args:
+            *names: ForeignKey or OneToOneField names, or reverse OneToOne query names
+        Returns:
+            ParanoidQuerySet[]
+        """
+        return self.annotate(**{
+            '%s_is_deleted' % name: Case(
+                When(**{'%s__isnull' % self._related_deleted_lookup(name): False, 'then': Value(True)}),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+            for name in names
+        })
+
+    def exclude_dead_related(self, *names):
+        """
+        Exclude instances whose related Paranoid object has been soft deleted,
+        on the same query with a JOIN. Instances without related object are kept.
+        Args:
+            *names: ForeignKey or OneToOneField names, or reverse OneToOne query names
+        Returns:
+            ParanoidQuerySet[]
+        """
+        return self.filter(*[
+            Q(**{'%s__isnull' % self._related_deleted_lookup(name): True})
+            for name in names
+        ])
+
+    def iter_batches(self, batch_size=1000, order_by='pk', flat=False):
+        """
+        Iterate over current QuerySet in batches, with keyset pagination.
+        Every batch is a short and independent query filtering the ordering
+        field after the last value seen, instead of an OFFSET or a long
+        running cursor.
+        Args:
+            batch_size: int max amount of instances per batch. Default {1000}
+            order_by: 'pk' or a unique field, '-' prefix for descending. Default {'pk'}
+            flat: bool to yield primary keys instead of instances. Default {False}
+        Yields:
+            list(): instances, or primary keys if flat
+        Raise:
+            ValueError: order_by is not the primary key nor a unique and
+                not null field, rows tied on it would be skipped
+        """
+        if self.query.low_mark or self.query.high_mark is not None:
+            raise TypeError('Cannot iterate in batches a sliced QuerySet.')
+
+        field = order_by.lstrip('-')
+        if field != 'pk':
+            try:
+                model_field = self.model._meta.get_field(field)
+            except FieldDoesNotExist:
+                model_field = None
+            if not (getattr(model_field, 'concrete', False) and
+                    (model_field.primary_key or (model_field.unique and not model_field.null))):
+                raise ValueError(
+                    "Cannot iterate in batches ordered by '%s', it must be 'pk' or a unique "
+                    "and not null field." % field)
+            # column of a foreign key, so the related instance is neither joined nor loaded
+            field = model_field.attname
+        descending = order_by.startswith('-')
+        lookup = '%s__%s' % (field, 'lt' if descending else 'gt')
+
+        queryset = self.order_by('-' + field if descending else field)
+        if flat:
+            queryset = queryset.values_list(field, 'pk')
+
+        last = None
+        while True:
+            page = queryset if last is None else queryset.filter(**{lookup: last})
+            batch = list(page[:batch_size])
+            if not batch:
+                return
+
+            if flat:
+                last = batch[-1][0]
+                yield [pk for _, pk in batch]
+            else:
+                last = getattr(batch[-1], field)
+                yield batch
+
+            if len(batch) < batch_size:
+                return
 
     def deleted_only(self):
         """
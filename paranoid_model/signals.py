@@ -0,0 +1,27 @@
+"""
+File with signals sent by Paranoid Model
+"""
+
+
+from django.dispatch import Signal
+
+
+# Sent once a soft delete, restore or purge (and all its cascade) has finished.
+# Arguments: sender (root model), operation, operation_id, rows, depth, queries, duration
+paranoid_operation = Signal()
+
+# Sent once per model of a soft delete cascade, before and after its rows are soft deleted.
+# Arguments: sender (model), pks, using, deleted_at
+pre_soft_delete = Signal()
+post_soft_delete = Signal()
+
+# Sent once per model of a restore cascade, before and after its rows are restored.
+# Arguments: sender (model), pks, using, updated_at
+pre_restore = Signal()
+post_restore = Signal()
+
+# Sent per model and batch of a fast hard delete, before and after its rows are deleted,
+# instead of Django's pre_delete and post_delete, see paranoid_model.cascade.FastPurge.
+# Arguments: sender (model), pks, using
+pre_purge = Signal()
+post_purge = Signal()
@@ -1,5 +1,11 @@
 from django.db import models
 from paranoid_model import models as paranoid_model
+from paranoid_model.audit import AbstractAuditEntry
+from paranoid_model.background import AbstractCascadeJob
+from paranoid_model.cache import LocalCache
+from paranoid_model.fields import LiveCounterField, ParanoidManyToManyField
+from paranoid_model.indexes import AsOfIndex
+from paranoid_model.manager import ParanoidManager
 
 
 class Person(paranoid_model.Paranoid):
@@ -13,6 +19,9 @@ class Person(paranoid_model.Paranoid):
     """
     name = models.CharField(max_length=255)
 
+    class Meta:
+        indexes = [AsOfIndex(name='person_as_of_idx')]
+
 
 class Phone(paranoid_model.Paranoid):
     """
@@ -59,3 +68,220 @@ class Clothes(models.Model):
     """
     description = models.CharField(max_length=255)
     person = models.ForeignKey(Person, on_delete=models.CASCADE, related_name='my_clothes')
+
+
+class Product(paranoid_model.Paranoid):
+    """
+    Product model with a cached Paranoid Manager
+    Attributes:
+         name: CharField
+         created_at: DateTimeField
+         updated_at: DateTimeField
+         deleted_at: DateTimeField
+    """
+    name = models.CharField(max_length=255)
+
+    objects = ParanoidManager(cache=LocalCache(size=100, timeout=60))
+
+
+class Folder(paranoid_model.Paranoid):
+    """
+    Folder model with cascade made by database triggers
+    Attributes:
+         name: CharField
+         created_at: DateTimeField
+         updated_at: DateTimeField
+         deleted_at: DateTimeField
+    """
+    name = models.CharField(max_length=255)
+
+    class Meta:
+        paranoid_db_cascade = True
+
+
+class Document(paranoid_model.Paranoid):
+    """
+    Document model with Paranoid inheritance
+    Attributes:
+         folder: ForeignKey to Folder
+         created_at: DateTimeField
+         updated_at: DateTimeField
+         deleted_at: DateTimeField
+    """
+    folder = models.ForeignKey(Folder, on_delete=models.CASCADE, related_name='documents')
+
+
+class Page(paranoid_model.Paranoid):
+    """
+    Page model with Paranoid inheritance, below Document, which has no triggers
+    Attributes:
+         document: ForeignKey to Document
+         created_at: DateTimeField
+         updated_at: DateTimeField
+         deleted_at: DateTimeField
+    """
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name='pages')
+
+
+class Tag(paranoid_model.Paranoid):
+    """
+    Tag model with Paranoid inheritance
+    Attributes:
+         name: CharField
+         created_at: DateTimeField
+         updated_at: DateTimeField
+         deleted_at: DateTimeField
+    """
+    name = models.CharField(max_length=255)
+
+
+class Post(paranoid_model.Paranoid):
+    """
+    Post model with a Paranoid ManyToMany
+    Attributes:
+         title: CharField
+         tags: ParanoidManyToManyField to Tag through Tagging
+         created_at: DateTimeField
+         updated_at: DateTimeField
+         deleted_at: DateTimeField
+    """
+    title = models.CharField(max_length=255)
+    tags = ParanoidManyToManyField(Tag, through='Tagging', related_name='posts')
+
+
+class Tagging(paranoid_model.Paranoid):
+    """
+    Paranoid through model of Post.tags
+    Attributes:
+         post: ForeignKey to Post
+         tag: ForeignKey to Tag
+         created_at: DateTimeField
+         updated_at: DateTimeField
+         deleted_at: DateTimeField
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE)
+
+
+class Event(paranoid_model.Paranoid):
+    """
+    Event model with table partitioned by deleted_at month
+    Attributes:
+         name: CharField
+         created_at: DateTimeField
+         updated_at: DateTimeField
+         deleted_at: DateTimeField
+    """
+    name = models.CharField(max_length=255)
+
+    class Meta:
+        paranoid_partition = 'month'
+
+
+class AuditEntry(AbstractAuditEntry):
+    """
+    Audit log of Paranoid operations, see paranoid_model.audit
+    """
+
+
+class Comment(paranoid_model.Paranoid):
+    """
+    Comment model referencing itself, a tree of replies
+    Attributes:
+         parent: ForeignKey to Comment
+         created_at: DateTimeField
+         updated_at: DateTimeField
+         deleted_at: DateTimeField
+    """
+    parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, related_name='replies')
+
+
+class Author(paranoid_model.Paranoid):
+    """
+    Author model with a counter of live books
+    Attributes:
+         name: CharField
+         books_count: LiveCounterField of books
+         created_at: DateTimeField
+         updated_at: DateTimeField
+         deleted_at: DateTimeField
+    """
+    name = models.CharField(max_length=255)
+    books_count = LiveCounterField('books')
+
+
+class Book(paranoid_model.Paranoid):
+    """
+    Book model with Paranoid inheritance
+    Attributes:
+         author: ForeignKey to Author
+         created_at: DateTimeField
+         updated_at: DateTimeField
+         deleted_at: DateTimeField
+    """
+    author = models.ForeignKey(Author, on_delete=models.CASCADE, related_name='books')
+
+
+class Board(paranoid_model.Paranoid):
+    """
+    Board model with a cascade limited to 4 rows and 2 levels
+    Attributes:
+         name: CharField
+         created_at: DateTimeField
+         updated_at: DateTimeField
+         deleted_at: DateTimeField
+    """
+    name = models.CharField(max_length=255)
+
+    class Meta:
+        paranoid_cascade_limits = {'rows': 4, 'depth': 2}
+
+
+class Topic(paranoid_model.Paranoid):
+    """
+    Topic model with Paranoid inheritance
+    Attributes:
+         board: ForeignKey to Board
+         created_at: DateTimeField
+         updated_at: DateTimeField
+         deleted_at: DateTimeField
+    """
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='topics')
+
+
+class Reply(paranoid_model.Paranoid):
+    """
+    Reply model with Paranoid inheritance
+    Attributes:
+         topic: ForeignKey to Topic
+         created_at: DateTimeField
+         updated_at: DateTimeField
+         deleted_at: DateTimeField
+    """
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE, related_name='replies')
+
+
+class CascadeJob(AbstractCascadeJob):
+    """
+    Rest of cascades over its limits, see paranoid_model.background
+    """
+
+
+class Account(paranoid_model.Paranoid):
+    """
+    Account model with an email unique among live accounts only
+    Attributes:
+         email: CharField
+         plan: CharField
+         created_at: DateTimeField
+         updated_at: DateTimeField
+         deleted_at: DateTimeField
+    """
+    email = models.CharField(max_length=255)
+    plan = models.CharField(max_length=255, default='free')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['email'], condition=models.Q(deleted_at__isnull=True), name='account_live_email_uniq'),
+        ]
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from model_bakery import baker
+
+from paranoid_model.indexes import AsOfIndex
+from paranoid_model.tests.models import Person
+
+
+class TestPointInTimeQueries(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.day = timedelta(days=1)
+
+        self.old = self.make(created_at=self.now - 10 * self.day)
+        self.deleted = self.make(created_at=self.now - 10 * self.day, deleted_at=self.now - 5 * self.day)
+        self.new = self.make(created_at=self.now - 2 * self.day)
+
+    def make(self, **fields):
+        person = baker.make(Person)
+        Person.objects.all(with_deleted=True).filter(pk=person.pk).update(**fields)
+        return person
+
+    def pks(self, queryset):
+        return set(queryset.values_list('pk', flat=True))
+
+    def test_as_of(self):
+        self.assertEqual(self.pks(Person.objects.as_of(self.now - 7 * self.day)), {self.old.pk, self.deleted.pk})
+        self.assertEqual(self.pks(Person.objects.as_of(self.now - 5 * self.day)), {self.old.pk})
+        self.assertEqual(self.pks(Person.objects.as_of(self.now)), {self.old.pk, self.new.pk})
+        self.assertEqual(self.pks(Person.objects.as_of(self.now - 11 * self.day)), set())
+
+    def test_alive_between(self):
+        self.assertEqual(
+            self.pks(Person.objects.alive_between(self.now - 4 * self.day, self.now)),
+            {self.old.pk, self.new.pk}
+        )
+        self.assertEqual(
+            self.pks(Person.objects.alive_between(self.now - 6 * self.day, self.now - 3 * self.day)),
+            {self.old.pk, self.deleted.pk}
+        )
+
+    def test_as_of_chained_with_filter(self):
+        queryset = Person.objects.as_of(self.now).filter(name=self.new.name)
+        self.assertEqual(self.pks(queryset), {self.new.pk})
+
+
+class TestAsOfIndex(TestCase):
+    def test_fields(self):
+        index = AsOfIndex(name='as_of_idx')
+
+        self.assertEqual(index.fields, ['created_at', 'deleted_at'])
+        self.assertEqual(
+            index.deconstruct(),
+            ('paranoid_model.indexes.AsOfIndex', (), {'name': 'as_of_idx'})
+        )
@@ -0,0 +1,137 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+
+from paranoid_model import audit
+from paranoid_model.tests.models import AuditEntry, Person, Phone
+
+
+class MemorySink(audit.AuditSink):
+    def __init__(self):
+        self.writes = []
+
+    def write(self, records):
+        self.writes.append(records)
+
+
+class TestAuditModelSink(TestCase):
+    def setUp(self):
+        audit.enable(audit.ModelSink(AuditEntry))
+        self.addCleanup(audit.disable)
+
+    def test_soft_delete_cascade_is_recorded(self):
+        person = baker.make(Person)
+        phones = baker.make(Phone, owner=person, _quantity=3)
+
+        with audit.actor('alice'):
+            person.delete()
+
+        entries = AuditEntry.objects.all()
+        self.assertEqual(len(entries), 4)
+        self.assertEqual({entry.action for entry in entries}, {'soft_delete'})
+        self.assertEqual({entry.actor for entry in entries}, {'alice'})
+        self.assertEqual(len({entry.operation_id for entry in entries}), 1)
+        self.assertEqual({entry.created_at for entry in entries}, {person.deleted_at})
+        self.assertEqual(
+            {(entry.model, entry.object_pk) for entry in entries},
+            {('tests.person', str(person.pk))} | {('tests.phone', str(phone.pk)) for phone in phones}
+        )
+
+    def test_one_insert_per_operation(self):
+        person = baker.make(Person)
+        baker.make(Phone, owner=person, _quantity=10)
+
+        with CaptureQueriesContext(connection) as queries:
+            person.delete()
+
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+
+    def test_restore_and_purge_are_recorded(self):
+        person = baker.make(Person)
+        person.delete()
+        person.restore()
+        person.delete(hard_delete=True)
+
+        self.assertEqual(
+            list(AuditEntry.objects.order_by('id').values_list('action', flat=True)),
+            ['soft_delete', 'restore', 'purge']
+        )
+        self.assertEqual(len(set(AuditEntry.objects.values_list('operation_id', flat=True))), 3)
+
+    def test_restore_is_recorded_at_the_cascade_timestamp(self):
+        person = baker.make(Person)
+        baker.make(Phone, owner=person, _quantity=2)
+        person.delete()
+        person.restore()
+
+        entries = AuditEntry.objects.filter(action='restore')
+        self.assertEqual(len(entries), 3)
+        self.assertEqual({entry.created_at for entry in entries}, {person.updated_at})
+
+    def test_admin_user_is_the_actor(self):
+        user = User(username='admin')
+        person = baker.make(Person)
+
+        with audit.actor(user):
+            Person.objects.filter(pk=person.pk).delete()
+
+        self.assertEqual(AuditEntry.objects.get().actor, 'admin')
+
+
+class TestAuditSink(TestCase):
+    def setUp(self):
+        self.sink = MemorySink()
+        audit.enable(self.sink)
+        self.addCleanup(audit.disable)
+
+    def test_records_are_written_once_per_operation(self):
+        people = baker.make(Person, _quantity=3)
+        Person.objects.filter(pk__in=[person.pk for person in people]).delete()
+
+        self.assertEqual(len(self.sink.writes), 1)
+        self.assertEqual(
+            {record.pk for record in self.sink.writes[0]},
+            {person.pk for person in people}
+        )
+        self.assertEqual(self.sink.writes[0][0].actor, '')
+
+    def test_nothing_is_written_when_nothing_changes(self):
+        Person.objects.all().delete()
+        self.assertEqual(self.sink.writes, [])
+
+    def test_purge(self):
+        person = baker.make(Person)
+        person.delete()
+        self.sink.writes.clear()
+
+        Person.objects.purge(before=timezone.now() + datetime.timedelta(days=1))
+
+        self.assertEqual([(record.action, record.pk) for record in self.sink.writes[0]], [('purge', person.pk)])
+
+    def test_records_are_written_in_chunks(self):
+        people = baker.make(Person, _quantity=5)
+
+        with mock.patch.object(audit, 'BATCH_SIZE', 2):
+            Person.objects.filter(pk__in=[person.pk for person in people]).delete()
+
+        self.assertEqual([len(records) for records in self.sink.writes], [2, 2, 1])
+        self.assertEqual(
+            {record.pk for records in self.sink.writes for record in records},
+            {person.pk for person in people}
+        )
+
+    def test_sink_must_implement_write(self):
+        with self.assertRaises(TypeError):
+            audit.AuditSink()
+
+    def test_disabled(self):
+        audit.disable()
+        baker.make(Person).delete()
+        self.assertEqual(self.sink.writes, [])
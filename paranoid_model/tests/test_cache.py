@@ -0,0 +1,158 @@
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from model_bakery import baker
+
+from paranoid_model.cache import LocalCache, StateCache
+from paranoid_model.tests.models import Product
+
+
+class Rollback(Exception):
+    pass
+
+
+# TestCase runs inside a transaction, where the cache is not used
+class TestCachedManager(TransactionTestCase):
+    def setUp(self):
+        Product.objects.cache._data.clear()
+        self.product = baker.make(Product)
+
+    def test_get_by_pk_is_cached(self):
+        Product.objects.get(pk=self.product.pk)
+
+        with self.assertNumQueries(0):
+            found = Product.objects.get(pk=self.product.pk)
+            Product.objects.get(id=str(self.product.pk))
+
+        self.assertEqual(found, self.product)
+        self.assertEqual(found.name, self.product.name)
+
+    def test_other_queries_are_not_cached(self):
+        Product.objects.get(pk=self.product.pk)
+
+        with self.assertNumQueries(2):
+            Product.objects.get(name=self.product.name)
+            Product.objects.filter(name=self.product.name).get(pk=self.product.pk)
+
+    def test_soft_deleted_is_cached(self):
+        self.product.delete()
+        with self.assertRaises(Product.SoftDeleted):
+            Product.objects.get(pk=self.product.pk)
+
+        with self.assertNumQueries(0):
+            with self.assertRaises(Product.SoftDeleted):
+                Product.objects.get(pk=self.product.pk)
+            self.assertEqual(Product.objects.get_deleted(pk=self.product.pk), self.product)
+
+    def test_get_deleted_on_live_row_is_cached(self):
+        Product.objects.get(pk=self.product.pk)
+
+        with self.assertNumQueries(0):
+            with self.assertRaises(Product.IsNotSoftDeleted):
+                Product.objects.get_deleted(pk=self.product.pk)
+
+    def test_soft_delete_and_restore_invalidate(self):
+        Product.objects.get(pk=self.product.pk)
+
+        self.product.delete()
+        with self.assertRaises(Product.SoftDeleted):
+            Product.objects.get(pk=self.product.pk)
+
+        Product.objects.all(with_deleted=True).restore()
+        self.assertFalse(Product.objects.get(pk=self.product.pk).is_soft_deleted)
+
+    def test_save_invalidates(self):
+        Product.objects.get(pk=self.product.pk)
+
+        self.product.name = 'new name'
+        self.product.save()
+
+        self.assertEqual(Product.objects.get(pk=self.product.pk).name, 'new name')
+
+    def test_hard_delete_invalidates(self):
+        Product.objects.get(pk=self.product.pk)
+
+        self.product.delete(hard_delete=True)
+
+        with self.assertRaises(Product.DoesNotExist):
+            Product.objects.get(pk=self.product.pk)
+
+    def test_not_used_inside_transaction(self):
+        with transaction.atomic():
+            Product.objects.get(pk=self.product.pk)
+            with self.assertNumQueries(1):
+                Product.objects.get(pk=self.product.pk)
+
+        self.assertIsNone(Product.objects.cache.get_instance(Product, 'default', self.product.pk))
+
+    def test_rolled_back_create_is_not_cached(self):
+        with self.assertRaises(Rollback), transaction.atomic():
+            created = baker.make(Product)
+            Product.objects.get(pk=created.pk)
+            raise Rollback()
+
+        with self.assertRaises(Product.DoesNotExist):
+            Product.objects.get(pk=created.pk)
+
+    def test_rolled_back_delete_is_not_cached(self):
+        Product.objects.get(pk=self.product.pk)
+
+        with self.assertRaises(Rollback), transaction.atomic():
+            self.product.delete()
+            with self.assertRaises(Product.SoftDeleted):
+                Product.objects.get(pk=self.product.pk)
+            raise Rollback()
+
+        self.assertFalse(Product.objects.get(pk=self.product.pk).is_soft_deleted)
+
+    def test_invalidated_on_commit(self):
+        cache = Product.objects.cache
+        live = Product.objects.get(pk=self.product.pk)
+
+        with transaction.atomic():
+            self.product.delete()
+            # cached by another thread before the commit
+            cache._set(cache.key(Product, 'default', self.product.pk), (live.pk,))
+
+        with self.assertRaises(Product.SoftDeleted):
+            Product.objects.get(pk=self.product.pk)
+
+    def test_read_before_invalidation_is_not_cached(self):
+        cache = Product.objects.cache
+        # read by another process before the soft delete commits, cached after it
+        version = cache.version(Product, 'default', self.product.pk)
+        live = Product.objects.all().get(name=self.product.name)
+
+        self.product.delete()
+        cache.set_instance(live, 'default', version)
+
+        with self.assertRaises(Product.SoftDeleted):
+            Product.objects.get(pk=self.product.pk)
+
+    def test_invalidated_without_caching_first(self):
+        self.assertIn(Product, Product.objects.cache._connected)
+        cache = Product.objects.cache
+        cache._set(cache.key(Product, 'default', self.product.pk), ('stale',))
+
+        self.product.save()
+
+        self.assertIsNone(cache.get_instance(Product, 'default', self.product.pk))
+
+
+class TestLocalCache(TestCase):
+    def test_state_cache_is_abstract(self):
+        with self.assertRaises(TypeError):
+            StateCache()
+
+    def test_size_is_bounded(self):
+        cache = LocalCache(size=2)
+        for key in range(3):
+            cache._set(key, key)
+
+        self.assertIsNone(cache._get(0))
+        self.assertEqual(cache._get(2), 2)
+
+    def test_expired_rows_are_not_returned(self):
+        cache = LocalCache(timeout=-1)
+        cache._set('key', 'value')
+
+        self.assertIsNone(cache._get('key'))
@@ -0,0 +1,90 @@
+import threading
+from collections import Counter
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from paranoid_model.instrumentation import instrument, visited, SOFT_DELETE
+from paranoid_model.pkset import PkSet
+from paranoid_model.signals import post_soft_delete
+from paranoid_model.tests.models import Comment
+
+
+class TestCascadeDedup(TestCase):
+    def setUp(self):
+        self.root = baker.make(Comment)
+        self.replies = baker.make(Comment, parent=self.root, _quantity=2)
+        self.nested = baker.make(Comment, parent=self.replies[0], _quantity=2)
+
+        self.written = Counter()
+        post_soft_delete.connect(self.receiver, sender=Comment)
+        self.addCleanup(post_soft_delete.disconnect, self.receiver, sender=Comment)
+
+    def receiver(self, sender, pks, **kwargs):
+        self.written.update(pks)
+
+    def test_overlapping_roots(self):
+        roots = [self.root.pk, self.replies[0].pk, self.nested[1].pk]
+
+        with CaptureQueriesContext(connection) as queries:
+            deleted = Comment.objects.filter(pk__in=roots).delete()
+
+        self.assertEqual(deleted, 3)
+        self.assertEqual(Comment.objects.deleted_only().count(), 5)
+        self.assertEqual(set(self.written.values()), {1})
+        self.assertEqual(len(self.written), 5)
+
+        updates = [query for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+
+    def test_cycle(self):
+        first = baker.make(Comment)
+        second = baker.make(Comment, parent=first)
+        Comment.objects.filter(pk=first.pk).update(parent=second)
+
+        first.delete()
+
+        self.assertEqual(self.written, Counter({first.pk: 1, second.pk: 1}))
+
+    def test_delete_inside_cascade_skips_written_rows(self):
+        def delete_again(sender, pks, **kwargs):
+            Comment.objects.all(with_deleted=True).filter(pk__in=pks).delete()
+
+        post_soft_delete.connect(delete_again, sender=Comment)
+        self.addCleanup(post_soft_delete.disconnect, delete_again, sender=Comment)
+
+        self.root.delete()
+
+        self.assertEqual(len(self.written), 5)
+        self.assertEqual(set(self.written.values()), {1})
+
+    def test_concurrent_batches(self):
+        Comment.objects.filter(pk__in=[self.root.pk, self.replies[1].pk])._delete_concurrently('default', batch_size=1)
+
+        self.assertEqual(len(self.written), 5)
+        self.assertEqual(set(self.written.values()), {1})
+
+
+class TestVisited(TestCase):
+    def test_outside_operation(self):
+        visited(SOFT_DELETE, 'default')['model'] = {1}
+
+        self.assertEqual(visited(SOFT_DELETE, 'default'), {})
+
+    def test_per_operation_and_thread(self):
+        pks = PkSet([1])
+        with instrument(SOFT_DELETE, Comment):
+            visited(SOFT_DELETE, 'default')['model'] = pks
+
+            self.assertEqual(visited(SOFT_DELETE, 'default'), {'model': pks})
+            self.assertEqual(visited(SOFT_DELETE, 'db2'), {})
+
+            other = []
+            thread = threading.Thread(target=lambda: other.append(visited(SOFT_DELETE, 'default')))
+            thread.start()
+            thread.join()
+            self.assertEqual(other, [{}])
+
+        self.assertEqual(visited(SOFT_DELETE, 'default'), {})
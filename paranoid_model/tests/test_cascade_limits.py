@@ -0,0 +1,196 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from model_bakery import baker
+
+from paranoid_model import background
+from paranoid_model.audit import actor
+from paranoid_model.cascade import Cascade
+from paranoid_model.signals import post_soft_delete
+from paranoid_model.tests.models import Board, CascadeJob, Reply, Topic
+
+
+@override_settings(PARANOID_MODEL_CASCADE_JOB_MODEL='tests.CascadeJob')
+class TestCascadeLimits(TestCase):
+    def setUp(self):
+        self.board = baker.make(Board)
+        self.topics = baker.make(Topic, board=self.board, _quantity=2)
+        for topic in self.topics:
+            baker.make(Reply, topic=topic, _quantity=2)
+
+    def test_within_limits(self):
+        board = baker.make(Board)
+        baker.make(Topic, board=board, _quantity=3)
+
+        board.delete()
+
+        self.assertEqual(Topic.objects.deleted_only().count(), 3)
+        self.assertFalse(CascadeJob.objects.exists())
+
+    def test_over_rows_only_roots_are_written(self):
+        self.board.delete()
+
+        self.assertTrue(Board.objects.get_deleted(pk=self.board.pk).is_soft_deleted)
+        self.assertEqual(Topic.objects.deleted_only().count(), 0)
+        self.assertEqual(Reply.objects.deleted_only().count(), 0)
+
+        job = CascadeJob.objects.get()
+        self.assertEqual(job.operation, 'soft_delete')
+        self.assertEqual(job.model, 'tests.board')
+        self.assertEqual(json.loads(job.pks), [self.board.pk])
+        self.assertEqual(job.timestamp, self.board.deleted_at)
+        self.assertEqual(job.status, background.PENDING)
+
+    def test_over_depth(self):
+        board = baker.make(Board)
+        baker.make(Reply, topic=baker.make(Topic, board=board))
+
+        with mock.patch.object(Board._meta, 'paranoid_cascade_limits', {'depth': 1}):
+            board.delete()
+
+        self.assertEqual(Topic.objects.deleted_only().count(), 0)
+        self.assertEqual(CascadeJob.objects.count(), 1)
+
+    def test_job_writes_the_rest(self):
+        self.board.delete()
+
+        senders = []
+        receiver = lambda sender, **kwargs: senders.append(sender)  # noqa: E731
+        post_soft_delete.connect(receiver)
+        self.addCleanup(post_soft_delete.disconnect, receiver)
+
+        jobs = background.run_pending()
+
+        # a job per level: the topics, and then the replies of the topics
+        self.assertEqual([(job.model, job.status) for job in jobs],
+                         [('tests.board', background.DONE), ('tests.topic', background.DONE)])
+        self.assertEqual(json.loads(jobs[1].pks), sorted(topic.pk for topic in self.topics))
+        self.assertIsNotNone(jobs[0].finished_at)
+        self.assertEqual(senders, [Topic, Reply])
+        self.assertEqual(
+            set(Reply.objects.deleted_only().values_list('deleted_at', flat=True)), {self.board.deleted_at})
+        self.assertEqual(Topic.objects.all().count(), 0)
+        self.assertEqual(background.run_pending(), [])
+
+    def test_restore(self):
+        with mock.patch.object(Board._meta, 'paranoid_cascade_limits', None):
+            self.board.delete()
+
+        self.board.restore()
+
+        self.assertFalse(Board.objects.get(pk=self.board.pk).is_soft_deleted)
+        self.assertEqual(Reply.objects.all().count(), 0)
+        self.assertEqual(CascadeJob.objects.get().operation, 'restore')
+
+        background.run_pending()
+        self.assertEqual(Reply.objects.all().count(), 4)
+
+    def test_root_restored_before_the_job(self):
+        self.board.delete()
+        with mock.patch.object(Board._meta, 'paranoid_cascade_limits', None):
+            Board.objects.get_deleted(pk=self.board.pk).restore()
+
+        jobs = background.run_pending()
+
+        self.assertEqual([job.status for job in jobs], [background.DONE])
+        self.assertEqual(Topic.objects.deleted_only().count(), 0)
+        self.assertEqual(Reply.objects.deleted_only().count(), 0)
+
+    def test_root_deleted_again_before_the_restore_job(self):
+        with mock.patch.object(Board._meta, 'paranoid_cascade_limits', None):
+            self.board.delete()
+        self.board.restore()
+        Board.objects.get(pk=self.board.pk).delete()  # a new job, at a new timestamp
+
+        background.run_pending()
+
+        self.assertEqual(Topic.objects.deleted_only().count(), 2)
+        self.assertEqual(Reply.objects.deleted_only().count(), 4)
+
+    def test_job_is_resumed_after_the_last_batch(self):
+        self.board.delete()
+        background.run_next()
+        job = CascadeJob.objects.get(model='tests.topic')
+
+        soft_delete = Cascade.soft_delete
+        calls = []
+
+        def second_batch_fails(cascade, **kwargs):
+            calls.append(cascade)
+            if len(calls) == 2:
+                raise ValueError('boom')
+            return soft_delete(cascade, **kwargs)
+
+        with mock.patch.object(background, 'BATCH_SIZE', 1), \
+                mock.patch.object(Cascade, 'soft_delete', second_batch_fails):
+            background.run_next()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress, job.attempts), (background.PENDING, 1, 1))
+        self.assertIsNone(job.locked_until)
+        self.assertEqual(Reply.objects.deleted_only().count(), 2)
+
+        with mock.patch.object(background, 'BATCH_SIZE', 1):
+            background.run_next()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress), (background.DONE, 2))
+        self.assertEqual(Reply.objects.deleted_only().count(), 4)
+
+    def test_leased_job_is_skipped(self):
+        self.board.delete()
+        CascadeJob.objects.update(locked_until=timezone.now() + background.LEASE)
+
+        self.assertIsNone(background.run_next())
+
+        CascadeJob.objects.update(locked_until=timezone.now() - background.LEASE)
+        self.assertEqual(background.run_next().status, background.DONE)
+
+    def test_actor_is_kept(self):
+        with actor('alice'):
+            self.board.delete()
+        background.run_next()
+
+        self.assertEqual(set(CascadeJob.objects.values_list('actor', flat=True)), {'alice'})
+
+    def test_failed_job_is_retried(self):
+        self.board.delete()
+
+        with mock.patch.object(CascadeJob, 'run', side_effect=ValueError('boom')):
+            job = background.run_next()
+            self.assertEqual((job.status, job.attempts, job.error), (background.PENDING, 1, 'ValueError: boom'))
+
+            background.run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (background.FAILED, background.MAX_ATTEMPTS))
+        self.assertEqual(Topic.objects.deleted_only().count(), 0)
+
+    def test_dry_run_is_not_limited(self):
+        total, _ = Board.objects.filter(pk=self.board.pk).delete(dry_run=True)
+
+        self.assertEqual(total, 7)
+        self.assertFalse(CascadeJob.objects.exists())
+
+    def test_command(self):
+        self.board.delete()
+        out = StringIO()
+
+        call_command('paranoid_jobs', stdout=out)
+
+        self.assertIn('soft_delete of tests.board done.', out.getvalue())
+        self.assertIn('soft_delete of tests.topic done.', out.getvalue())
+        self.assertIn('2 jobs run.', out.getvalue())
+        self.assertEqual(Reply.objects.deleted_only().count(), 4)
+
+    @override_settings(PARANOID_MODEL_CASCADE_JOB_MODEL=None)
+    def test_job_model_is_required(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.board.delete()
+
+        self.assertFalse(Board.objects.get(pk=self.board.pk).is_soft_deleted)
@@ -0,0 +1,107 @@
+import datetime
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+from django.utils import timezone
+from model_bakery import baker
+
+from paranoid_model.tests.models import Person, Phone
+
+
+def paranoid(*args, **kwargs):
+    out = StringIO()
+    call_command('paranoid', *args, stdout=out, **kwargs)
+    return out.getvalue()
+
+
+class TestParanoidCommand(TestCase):
+    def setUp(self):
+        self.foo = baker.make(Person, name='foo', _quantity=3)
+        self.bar = baker.make(Person, name='bar')
+        for person in self.foo:
+            baker.make(Phone, owner=person, _quantity=2)
+
+    def test_soft_delete_by_filter(self):
+        out = paranoid('soft-delete', 'tests.Person', '--filter', '{"name": "foo"}', '--batch-size', '2')
+
+        self.assertEqual(Person.objects.deleted_only().count(), 3)
+        self.assertEqual(Phone.objects.deleted_only().count(), 6)
+        self.assertFalse(Person.objects.get(pk=self.bar.pk).is_soft_deleted)
+
+        self.assertIn('Batch 1: 2 ', out)
+        self.assertIn('Batch 2: 3 ', out)
+        self.assertRegex(out, r'tests.Person\s+3 ')
+        self.assertRegex(out, r'tests.Phone\s+6 ')
+        self.assertRegex(out, r'Total\s+9 ')
+
+    def test_restore(self):
+        Person.objects.all().delete()
+        paranoid('restore', 'tests.Person', '--filter', '{"name": "bar"}')
+
+        self.assertEqual(list(Person.objects.all()), [self.bar])
+
+    def test_purge_before(self):
+        Person.objects.filter(name='foo').delete()
+        Person.objects.deleted_only().filter(pk=self.foo[0].pk).update(
+            deleted_at=timezone.now() - datetime.timedelta(days=10))
+
+        before = (timezone.now() - datetime.timedelta(days=5)).date().isoformat()
+        paranoid('purge', 'tests.Person', '--before', before)
+
+        self.assertFalse(Person.objects.all(with_deleted=True).filter(pk=self.foo[0].pk).exists())
+        self.assertEqual(Person.objects.deleted_only().count(), 2)
+
+    def test_fast_purge(self):
+        Person.objects.filter(name='foo').delete()
+        paranoid('purge', 'tests.Person', '--fast', '--batch-size', '2')
+
+        self.assertEqual(list(Person.objects.all(with_deleted=True)), [self.bar])
+        self.assertFalse(Phone.objects.all(with_deleted=True).exists())
+
+    def test_dry_run(self):
+        out = paranoid('soft-delete', 'tests.Person', '--dry-run')
+
+        self.assertRegex(out, r'Total\s+10')
+        self.assertFalse(Person.objects.deleted_only().exists())
+
+    def test_stats(self):
+        self.bar.delete()
+        out = paranoid('stats', 'tests.Person')
+
+        self.assertIn('Live: 3', out)
+        self.assertIn('Soft deleted: 1', out)
+        self.assertIn('Total: 4', out)
+
+    def test_checkpoint_resumes_and_is_cleared(self):
+        path = os.path.join(tempfile.mkdtemp(), 'checkpoint.json')
+        pks = sorted(person.pk for person in self.foo)
+        with open(path, 'w') as file:
+            json.dump({'action': 'soft-delete', 'model': 'tests.Person', 'last_pk': pks[0]}, file)
+
+        out = paranoid('soft-delete', 'tests.Person', '--filter', '{"name": "foo"}', '--checkpoint', path)
+
+        self.assertIn('Resuming after pk %s.' % pks[0], out)
+        self.assertFalse(Person.objects.get(pk=pks[0]).is_soft_deleted)
+        self.assertEqual(Person.objects.deleted_only().count(), 2)
+        self.assertFalse(os.path.exists(path))
+
+    def test_rate_limit(self):
+        with mock.patch('paranoid_model.management.commands.paranoid.time.sleep') as sleep:
+            paranoid('soft-delete', 'tests.Person', '--batch-size', '1', '--rate', '1')
+
+        self.assertEqual(sleep.call_count, 4)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(CommandError):
+            paranoid('soft-delete', 'tests.Clothes')
+        with self.assertRaises(CommandError):
+            paranoid('soft-delete', 'tests.Person', '--filter', '[1]')
+        with self.assertRaises(CommandError):
+            paranoid('restore', 'tests.Person', '--before', '2020-01-01')
+        with self.assertRaises(CommandError):
+            paranoid('soft-delete', 'tests.Person', '--fast')
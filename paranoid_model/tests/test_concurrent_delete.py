@@ -0,0 +1,52 @@
+import datetime
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+
+from paranoid_model.tests.models import Person, Phone
+
+
+class TestConcurrentSoftDelete(TestCase):
+    def test_soft_delete(self):
+        people = baker.make(Person, _quantity=3)
+        for person in people:
+            baker.make(Phone, owner=person, _quantity=2)
+
+        self.assertEqual(Person.objects.all().delete(concurrent=True), 3)
+        self.assertFalse(Person.objects.all().exists())
+        self.assertEqual(Phone.objects.deleted_only().count(), 6)
+
+    def test_reports_only_rows_processed(self):
+        people = baker.make(Person, _quantity=3)
+        people[0].delete()
+
+        queryset = Person.objects.all(with_deleted=True)
+        self.assertEqual(queryset.delete(concurrent=True), 2)
+        self.assertEqual(queryset.delete(concurrent=True), 0)
+
+    def test_rows_already_soft_deleted_keep_deleted_at(self):
+        person = baker.make(Person)
+        old_phone, phone = baker.make(Phone, owner=person, _quantity=2)
+        deleted_at = timezone.now() - datetime.timedelta(days=1)
+        Phone.objects.all(with_deleted=True).filter(pk=old_phone.pk).update(deleted_at=deleted_at)
+
+        Person.objects.all().delete(concurrent=True)
+
+        self.assertEqual(Phone.objects.get_deleted(pk=old_phone.pk).deleted_at, deleted_at)
+        self.assertIsNotNone(Phone.objects.get_deleted(pk=phone.pk).deleted_at)
+
+    def test_claims_in_batches(self):
+        baker.make(Person, _quantity=5)
+
+        with CaptureQueriesContext(connection) as queries:
+            deleted = Person.objects.all()._delete_concurrently('default', batch_size=2)
+
+        self.assertEqual(deleted, 5)
+        claims = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'LIMIT 2' in query['sql']
+        ]
+        self.assertEqual(len(claims), 4)
@@ -0,0 +1,133 @@
+from io import StringIO
+
+from django.core import checks
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, isolate_apps
+from model_bakery import baker
+
+from paranoid_model.cascade import FastPurge
+from paranoid_model.fields import LiveCounterField
+from paranoid_model.models import Paranoid
+from paranoid_model.tests.models import Author, Book
+
+
+def books_count(author):
+    return Author.objects.get(pk=author.pk, with_deleted=True).books_count
+
+
+class TestLiveCounter(TestCase):
+    def setUp(self):
+        self.author = baker.make(Author)
+        self.books = baker.make(Book, author=self.author, _quantity=3)
+
+    def test_create(self):
+        self.assertEqual(books_count(self.author), 3)
+
+    def test_soft_delete_and_restore(self):
+        self.books[0].delete()
+        self.assertEqual(books_count(self.author), 2)
+
+        self.books[0].restore()
+        self.assertEqual(books_count(self.author), 3)
+
+    def test_queryset_soft_delete_is_set_wise(self):
+        other = baker.make(Author)
+        baker.make(Book, author=other, _quantity=2)
+
+        with CaptureQueriesContext(connection) as queries:
+            Book.objects.all().delete()
+
+        updates = [query for query in queries.captured_queries if query['sql'].startswith('UPDATE "tests_author"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(books_count(self.author), 0)
+        self.assertEqual(books_count(other), 0)
+
+    def test_move_to_other_parent(self):
+        other = baker.make(Author)
+        book = Book.objects.get(pk=self.books[0].pk)
+
+        book.author = other
+        book.save()
+        self.assertEqual(books_count(self.author), 2)
+        self.assertEqual(books_count(other), 1)
+
+        book.author = self.author
+        book.save()
+        self.assertEqual(books_count(self.author), 3)
+        self.assertEqual(books_count(other), 0)
+
+    def test_parent_cascade(self):
+        self.author.delete()
+        self.assertEqual(books_count(self.author), 0)
+
+        self.author.restore()
+        self.assertEqual(books_count(self.author), 3)
+
+    def test_hard_delete_is_set_wise(self):
+        with CaptureQueriesContext(connection) as queries:
+            Book.objects.all(with_deleted=True).delete(hard_delete=True)
+
+        updates = [query for query in queries.captured_queries if query['sql'].startswith('UPDATE "tests_author"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(books_count(self.author), 0)
+
+    def test_fast_purge_outside_an_operation(self):
+        purge = FastPurge(Book, 'default')
+        purge.delete([self.books[0].pk])
+
+        self.assertEqual(purge.collected(), (1, {'tests.Book': 1}))
+        self.assertEqual(books_count(self.author), 2)
+
+    def test_saving_parent_keeps_counter(self):
+        author = Author.objects.get(pk=self.author.pk)
+        baker.make(Book, author=author)
+        author.name = 'changed'
+        author.save()
+
+        self.assertEqual(books_count(author), 4)
+
+    def test_saving_parent_is_a_single_update(self):
+        author = Author.objects.get(pk=self.author.pk)
+        author.books_count = 10
+
+        with CaptureQueriesContext(connection) as queries:
+            author.save()
+
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertEqual(books_count(author), 3)
+
+    def test_saving_child_without_its_parent(self):
+        book = Book.objects.get(pk=self.books[0].pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            book.save(update_fields=['updated_at'])
+
+        self.assertEqual(len([query for query in queries.captured_queries
+                              if query['sql'].startswith('SELECT')]), 0)
+        self.assertEqual(books_count(self.author), 3)
+
+    def test_rebuild_command(self):
+        Book.objects.all(with_deleted=True).filter(pk=self.books[0].pk).update(deleted_at='2020-01-01')
+        self.assertEqual(books_count(self.author), 3)
+
+        out = StringIO()
+        call_command('paranoid', 'rebuild-counters', 'tests.Author', stdout=out)
+
+        self.assertIn('1 authors rebuilt', out.getvalue())
+        self.assertEqual(books_count(self.author), 2)
+
+    def test_deconstruct(self):
+        name, path, args, kwargs = Author._meta.get_field('books_count').deconstruct()
+        self.assertEqual(path, 'paranoid_model.fields.LiveCounterField')
+        self.assertEqual(kwargs, {'relation': 'books'})
+
+    @isolate_apps('paranoid_model.tests')
+    def test_check_relation(self):
+        class Shelf(Paranoid):
+            books_count = LiveCounterField('missing')
+
+        errors = Shelf._meta.get_field('books_count').check()
+        self.assertEqual([error.id for error in errors], ['paranoid_model.E002'])
+        self.assertIsInstance(errors[0], checks.Error)
@@ -0,0 +1,78 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from paranoid_model.cascade import Cascade
+from paranoid_model.tests.models import Person, Phone, Address, Clothes, Folder, Document
+
+
+class TestDryRun(TestCase):
+    def setUp(self):
+        self.people = baker.make(Person, _quantity=2)
+        for person in self.people:
+            baker.make(Phone, owner=person, _quantity=3)
+            baker.make(Address, owner=person)
+            baker.make(Clothes, person=person, _quantity=2)
+
+    def assertNoWrites(self, queries):
+        self.assertTrue(all(query['sql'].startswith('SELECT') for query in queries.captured_queries))
+
+    def test_soft_delete(self):
+        with CaptureQueriesContext(connection) as queries:
+            total, counts = Person.objects.all().delete(dry_run=True)
+
+        self.assertNoWrites(queries)
+        self.assertEqual(counts, {'tests.Person': 2, 'tests.Phone': 6, 'tests.Address': 2})
+        self.assertEqual(total, 10)
+        self.assertEqual(Person.objects.count(), 2)
+
+    def test_leaves_are_counted(self):
+        with CaptureQueriesContext(connection) as queries:
+            Person.objects.all().delete(dry_run=True)
+
+        counts = [query for query in queries.captured_queries if 'COUNT(' in query['sql']]
+        self.assertTrue(any(Phone._meta.db_table in query['sql'] for query in counts))
+
+    def test_matches_soft_delete(self):
+        total, _ = Person.objects.all().delete(dry_run=True)
+
+        deleted = Person.objects.all().delete()
+        self.assertEqual(deleted, 2)
+        self.assertEqual(
+            total,
+            sum(model.objects.deleted_only().count() for model in (Person, Phone, Address))
+        )
+
+    def test_restore(self):
+        self.people[0].delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            total, counts = Person.objects.all(with_deleted=True).restore(dry_run=True)
+
+        self.assertNoWrites(queries)
+        self.assertEqual(counts, {'tests.Person': 1, 'tests.Phone': 3, 'tests.Address': 1})
+        self.assertEqual(Person.objects.deleted_only().count(), 1)
+
+    def test_purge_preview_includes_every_model(self):
+        self.people[0].delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            total, counts = Person.objects.purge(dry_run=True)
+
+        self.assertNoWrites(queries)
+        self.assertEqual(
+            counts,
+            {'tests.Person': 1, 'tests.Phone': 3, 'tests.Address': 1, 'tests.Clothes': 2}
+        )
+        self.assertEqual(total, Person.objects.purge())
+
+    def test_hard_delete_preview_matches_django(self):
+        preview = Person.objects.all().delete(hard_delete=True, dry_run=True)
+        self.assertEqual(preview, Person.objects.all().delete(hard_delete=True))
+
+    def test_cascade_made_by_database_is_counted(self):
+        folder = baker.make(Folder)
+        baker.make(Document, folder=folder, _quantity=2)
+
+        self.assertEqual(Cascade(Folder, [folder.pk], 'default').count()[Document], 2)
@@ -0,0 +1,124 @@
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from paranoid_model import audit
+from paranoid_model.cascade import fast_purge_paths
+from paranoid_model.signals import pre_purge, post_purge
+from paranoid_model.tests.models import (
+    Author, Book, Board, Topic, Reply, Car, Clothes, Comment, Person, Phone, Address
+)
+from paranoid_model.tests.test_audit import MemorySink
+
+
+class TestFastPurgePaths(TestCase):
+    def test_leaves_first(self):
+        self.assertEqual(fast_purge_paths(Board), (
+            ((Topic, Topic._meta.get_field('board')), (Reply, Reply._meta.get_field('topic'))),
+            ((Topic, Topic._meta.get_field('board')),),
+        ))
+
+    def test_cycle_is_not_supported(self):
+        self.assertIsNone(fast_purge_paths(Comment))
+
+
+class TestFastPurge(TestCase):
+    def setUp(self):
+        self.people = baker.make(Person, _quantity=3)
+        for person in self.people:
+            baker.make(Phone, owner=person, _quantity=2)
+            baker.make(Address, owner=person)
+            baker.make(Car, owner=person)
+            baker.make(Clothes, person=person)
+        self.kept = baker.make(Person)
+        self.kept_phone = baker.make(Phone, owner=self.kept)
+
+    def purged(self):
+        return Person.objects.all(with_deleted=True).exclude(pk=self.kept.pk)
+
+    def test_delete_without_loading(self):
+        with CaptureQueriesContext(connection) as queries:
+            deleted = self.purged().delete(hard_delete=True, fast=True)
+
+        self.assertEqual(deleted, (18, {
+            'tests.Phone': 6, 'tests.Address': 3, 'tests.Car': 3, 'tests.Clothes': 3, 'tests.Person': 3,
+        }))
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 1)  # the roots' primary keys
+        self.assertEqual(list(Person.objects.all(with_deleted=True)), [self.kept])
+        self.assertEqual(list(Phone.objects.all(with_deleted=True)), [self.kept_phone])
+        self.assertFalse(Clothes.objects.exists())
+
+    def test_batches(self):
+        deleted = self.purged()._fast_delete('default', batch_size=2)
+
+        self.assertEqual(deleted[0], 18)
+        self.assertEqual(Person.objects.all(with_deleted=True).count(), 1)
+
+    def test_same_result_as_django(self):
+        expected = self.purged().delete(hard_delete=True, dry_run=True)
+        self.assertEqual(self.purged().delete(hard_delete=True, fast=True), expected)
+
+    def test_purge(self):
+        Person.objects.filter(pk=self.people[0].pk).delete()
+
+        self.assertEqual(Person.objects.purge(fast=True), 6)
+        self.assertEqual(Person.objects.all(with_deleted=True).count(), 3)
+        self.assertEqual(Phone.objects.all(with_deleted=True).count(), 5)
+
+    def test_signals(self):
+        sent = []
+
+        def receiver(signal, sender, pks, using, **kwargs):
+            sent.append((signal, sender, sorted(pks)))
+
+        def instance_receiver(sender, **kwargs):
+            sent.append(sender)
+
+        phones = sorted(Phone.objects.filter(owner__in=self.people).values_list('pk', flat=True))
+        for signal in (pre_purge, post_purge):
+            signal.connect(receiver, sender=Phone)
+            self.addCleanup(signal.disconnect, receiver, sender=Phone)
+        post_delete.connect(instance_receiver, sender=Phone)
+        self.addCleanup(post_delete.disconnect, instance_receiver, sender=Phone)
+
+        self.purged().delete(hard_delete=True, fast=True)
+
+        self.assertEqual(sent, [(pre_purge, Phone, phones), (post_purge, Phone, phones)])
+
+    def test_not_supported_falls_back(self):
+        root = baker.make(Comment)
+        baker.make(Comment, parent=root, _quantity=2)
+
+        deleted = Comment.objects.filter(pk=root.pk).delete(hard_delete=True, fast=True)
+
+        self.assertEqual(deleted, (3, {'tests.Comment': 3}))
+
+
+class TestFastPurgeReceivers(TestCase):
+    def test_counters(self):
+        author = baker.make(Author)
+        books = baker.make(Book, author=author, _quantity=3)
+
+        Book.objects.filter(pk__in=[book.pk for book in books[:2]]).delete(hard_delete=True, fast=True)
+
+        self.assertEqual(Author.objects.get(pk=author.pk).books_count, 1)
+
+    def test_audit(self):
+        sink = MemorySink()
+        audit.enable(sink)
+        self.addCleanup(audit.disable)
+
+        person = baker.make(Person)
+        phone = baker.make(Phone, owner=person)
+        baker.make(Clothes, person=person)
+
+        Person.objects.filter(pk=person.pk).delete(hard_delete=True, fast=True)
+
+        self.assertEqual(len(sink.writes), 1)
+        self.assertEqual(
+            {(record.action, record.model, record.pk) for record in sink.writes[0]},
+            {('purge', Phone, phone.pk), ('purge', Person, person.pk)},
+        )
@@ -0,0 +1,143 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from paranoid_model.tests.models import Account, Person, Phone
+
+
+def selects(queries):
+    return [query for query in queries.captured_queries if query['sql'].startswith('SELECT')]
+
+
+class TestGetOrCreate(TestCase):
+    def test_missing(self):
+        with CaptureQueriesContext(connection) as queries:
+            account, created = Account.objects.get_or_create(email='a@b.c', defaults={'plan': lambda: 'pro'})
+
+        self.assertTrue(created)
+        self.assertEqual((account.email, account.plan), ('a@b.c', 'pro'))
+        self.assertEqual(len(selects(queries)), 1)
+
+    def test_live(self):
+        live = baker.make(Account, email='a@b.c')
+
+        with self.assertNumQueries(1):
+            account, created = Account.objects.get_or_create(email='a@b.c')
+
+        self.assertFalse(created)
+        self.assertEqual(account, live)
+
+    def test_soft_deleted_is_not_restored(self):
+        dead = baker.make(Account, email='a@b.c')
+        dead.delete()
+
+        account, created = Account.objects.get_or_create(email='a@b.c')
+
+        self.assertTrue(created)
+        self.assertNotEqual(account.pk, dead.pk)
+        self.assertTrue(Account.objects.get_deleted(pk=dead.pk).is_soft_deleted)
+
+    def test_restore_last_soft_deleted(self):
+        older = baker.make(Account, email='a@b.c')
+        older.delete()
+        last = baker.make(Account, email='a@b.c')
+        last.delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            account, created = Account.objects.get_or_create(email='a@b.c', restore=True)
+
+        self.assertFalse(created)
+        self.assertEqual(account.pk, last.pk)
+        self.assertFalse(account.is_soft_deleted)
+        self.assertEqual(len(selects(queries)), 1)
+        self.assertTrue(Account.objects.get_deleted(pk=older.pk).is_soft_deleted)
+
+    def test_restore_cascade(self):
+        person = baker.make(Person, name='foo')
+        baker.make(Phone, owner=person, _quantity=2)
+        person.delete()
+
+        restored, created = Person.objects.get_or_create(name='foo', restore=True)
+
+        self.assertFalse(created)
+        self.assertEqual(restored.pk, person.pk)
+        self.assertEqual(Phone.objects.all().count(), 2)
+
+    def test_restore_live(self):
+        baker.make(Account, email='a@b.c').delete()
+        live = baker.make(Account, email='a@b.c')
+
+        self.assertEqual(Account.objects.get_or_create(email='a@b.c', restore=True), (live, False))
+
+    def test_multiple_live(self):
+        baker.make(Person, name='foo', _quantity=2)
+
+        with self.assertRaises(Person.MultipleObjectsReturned):
+            Person.objects.get_or_create(name='foo')
+
+    def test_concurrent_create(self):
+        live = baker.make(Account, email='a@b.c')
+
+        with mock.patch('paranoid_model.queryset.ParanoidQuerySet._live_or_last_deleted', return_value=None):
+            account, created = Account.objects.get_or_create(email='a@b.c')
+
+        self.assertFalse(created)
+        self.assertEqual(account, live)
+
+    def test_related_manager(self):
+        person = baker.make(Person)
+
+        phone, created = person.phones.get_or_create(phone='123')
+        self.assertTrue(created)
+        self.assertEqual(phone.owner, person)
+        self.assertEqual(person.phones.get_or_create(phone='123'), (phone, False))
+
+
+class TestUpdateOrCreate(TestCase):
+    def test_missing(self):
+        account, created = Account.objects.update_or_create(email='a@b.c', defaults={'plan': 'pro'})
+
+        self.assertTrue(created)
+        self.assertEqual(account.plan, 'pro')
+
+    def test_live(self):
+        live = baker.make(Account, email='a@b.c')
+
+        account, created = Account.objects.update_or_create(email='a@b.c', defaults={'plan': 'pro'})
+
+        self.assertFalse(created)
+        self.assertEqual(account.pk, live.pk)
+        self.assertEqual(Account.objects.get(pk=live.pk).plan, 'pro')
+
+    def test_soft_deleted(self):
+        dead = baker.make(Account, email='a@b.c')
+        dead.delete()
+
+        account, created = Account.objects.update_or_create(email='a@b.c', defaults={'plan': 'pro'})
+        self.assertTrue(created)
+        self.assertEqual(Account.objects.get_deleted(pk=dead.pk).plan, 'free')
+
+    def test_restore(self):
+        dead = baker.make(Account, email='a@b.c')
+        dead.delete()
+
+        account, created = Account.objects.update_or_create(email='a@b.c', defaults={'plan': 'pro'}, restore=True)
+
+        self.assertFalse(created)
+        self.assertEqual(account.pk, dead.pk)
+        account = Account.objects.get(pk=dead.pk)
+        self.assertEqual(account.plan, 'pro')
+        self.assertFalse(account.is_soft_deleted)
+
+    def test_concurrent_create(self):
+        live = baker.make(Account, email='a@b.c')
+
+        with mock.patch('paranoid_model.queryset.ParanoidQuerySet._live_or_last_deleted', return_value=None):
+            account, created = Account.objects.update_or_create(email='a@b.c', defaults={'plan': 'pro'})
+
+        self.assertFalse(created)
+        self.assertEqual(account.pk, live.pk)
+        self.assertEqual(Account.objects.get(pk=live.pk).plan, 'pro')
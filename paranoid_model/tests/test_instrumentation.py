@@ -0,0 +1,72 @@
+from django.test import TestCase
+from model_bakery import baker
+
+from paranoid_model.instrumentation import instrument, NULL_OPERATION
+from paranoid_model.signals import paranoid_operation
+from paranoid_model.tests.models import Person, Phone, Address
+
+
+class TestParanoidOperationSignal(TestCase):
+    def setUp(self):
+        self.received = []
+        paranoid_operation.connect(self.receiver)
+
+    def tearDown(self):
+        paranoid_operation.disconnect(self.receiver)
+
+    def receiver(self, sender, **kwargs):
+        self.received.append(dict(kwargs, sender=sender))
+
+    def test_soft_delete_sends_one_signal_for_whole_cascade(self):
+        person = baker.make(Person)
+        baker.make(Phone, owner=person, _quantity=3)
+        baker.make(Address, owner=person, _quantity=2)
+
+        person.delete()
+
+        self.assertEqual(len(self.received), 1)
+        signal = self.received[0]
+        self.assertEqual(signal['sender'], Person)
+        self.assertEqual(signal['operation'], 'soft_delete')
+        self.assertEqual(signal['rows'], {Person: 1, Phone: 3, Address: 2})
+        self.assertEqual(signal['depth'], 1)
+        self.assertGreater(signal['queries'], 0)
+        self.assertGreaterEqual(signal['duration'], 0)
+
+    def test_restore_sends_signal(self):
+        person = baker.make(Person)
+        baker.make(Phone, owner=person, _quantity=2)
+        person.delete()
+        self.received.clear()
+
+        person.restore()
+
+        self.assertEqual(len(self.received), 1)
+        self.assertEqual(self.received[0]['operation'], 'restore')
+        self.assertEqual(self.received[0]['rows'], {Person: 1, Phone: 2})
+
+    def test_queryset_operation_is_a_single_operation(self):
+        people = baker.make(Person, _quantity=3)
+        for person in people:
+            baker.make(Phone, owner=person)
+
+        Person.objects.all().delete()
+
+        self.assertEqual(len(self.received), 1)
+        self.assertEqual(self.received[0]['rows'], {Person: 3, Phone: 3})
+
+    def test_purge_sends_signal(self):
+        person = baker.make(Person)
+        baker.make(Phone, owner=person, _quantity=2)
+
+        person.delete(hard_delete=True)
+
+        self.assertEqual(len(self.received), 1)
+        self.assertEqual(self.received[0]['operation'], 'purge')
+        self.assertEqual(self.received[0]['rows'], {Person: 1, Phone: 2})
+
+
+class TestInstrumentWithoutReceivers(TestCase):
+    def test_nothing_is_measured(self):
+        with instrument('soft_delete', Person) as operation:
+            self.assertIs(operation, NULL_OPERATION)
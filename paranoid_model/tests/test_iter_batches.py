@@ -0,0 +1,71 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from paranoid_model.tests.models import Car, Person
+
+
+class TestIterBatches(TestCase):
+    def setUp(self):
+        self.people = baker.make(Person, _quantity=10)
+        for person in self.people[::2]:
+            person.delete()
+
+    def test_iter_live_instances(self):
+        batches = list(Person.objects.iter_batches(batch_size=2))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(
+            [person.pk for batch in batches for person in batch],
+            [person.pk for person in self.people[1::2]]
+        )
+
+    def test_iter_deleted_primary_keys(self):
+        batches = list(Person.objects.deleted_only().iter_batches(batch_size=3, flat=True))
+
+        self.assertEqual(batches, [
+            [person.pk for person in self.people[0:6:2]],
+            [person.pk for person in self.people[6::2]],
+        ])
+
+    def test_iter_descending(self):
+        batches = Person.objects.all(with_deleted=True).iter_batches(batch_size=4, order_by='-pk')
+
+        self.assertEqual(
+            [person.pk for batch in batches for person in batch],
+            [person.pk for person in reversed(self.people)]
+        )
+
+    def test_uses_keyset_pagination(self):
+        with CaptureQueriesContext(connection) as queries:
+            list(Person.objects.iter_batches(batch_size=2))
+
+        self.assertEqual(len(queries), 3)
+        for query in queries.captured_queries:
+            self.assertNotIn('OFFSET', query['sql'])
+            self.assertIn('"deleted_at" IS NULL', query['sql'])
+
+    def test_sliced_queryset(self):
+        with self.assertRaises(TypeError):
+            next(Person.objects.all()[:2].iter_batches())
+
+    def test_order_by_must_be_unique(self):
+        for order_by in ('name', '-deleted_at', 'phones'):
+            with self.assertRaises(ValueError):
+                next(Person.objects.iter_batches(order_by=order_by))
+
+        self.assertEqual(len(next(Person.objects.iter_batches(order_by='-id'))), 5)
+
+    def test_order_by_foreign_key(self):
+        cars = [baker.make(Car, owner=person) for person in self.people]
+
+        with CaptureQueriesContext(connection) as queries:
+            batches = list(Car.objects.iter_batches(batch_size=4, order_by='-owner'))
+
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(
+            [car.pk for batch in batches for car in batch],
+            [car.pk for car in reversed(cars)]
+        )
+        self.assertEqual(list(Car.objects.iter_batches(order_by='owner', flat=True)), [[car.pk for car in cars]])
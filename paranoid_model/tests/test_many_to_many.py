@@ -0,0 +1,94 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from model_bakery import baker
+
+from paranoid_model.tests.models import Post, Tag, Tagging
+
+
+class TestParanoidManyToMany(TestCase):
+    def setUp(self):
+        self.post = baker.make(Post)
+        self.tags = baker.make(Tag, _quantity=3)
+        self.post.tags.add(*self.tags)
+
+    def test_add(self):
+        self.assertEqual(self.post.tags.count(), 3)
+        self.assertEqual(self.tags[0].posts.get(), self.post)
+
+    def test_remove_soft_deletes_link(self):
+        self.post.tags.remove(self.tags[0])
+
+        self.assertEqual(self.post.tags.count(), 2)
+        self.assertEqual(self.tags[0].posts.count(), 0)
+        self.assertEqual(Tagging.objects.deleted_only().count(), 1)
+        self.assertFalse(Tag.objects.get(pk=self.tags[0].pk).is_soft_deleted)
+
+    def test_clear_soft_deletes_links(self):
+        self.post.tags.clear()
+
+        self.assertEqual(self.post.tags.count(), 0)
+        self.assertEqual(Tagging.objects.deleted_only().count(), 3)
+
+    def test_soft_deleted_targets_are_filtered(self):
+        self.tags[0].delete()
+
+        self.assertEqual(self.post.tags.count(), 2)
+        self.assertEqual(self.post.tags.all().count(), 2)
+        self.assertNotIn(self.tags[0], self.post.tags.all())
+
+    def test_filtered_on_a_single_join(self):
+        with CaptureQueriesContext(connection) as queries:
+            list(self.post.tags.all())
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(queries[0]['sql'].count('JOIN'), 1)
+
+    def test_add_restores_soft_deleted_link(self):
+        self.post.tags.remove(self.tags[0])
+        self.post.tags.add(self.tags[0])
+
+        self.assertEqual(self.post.tags.count(), 3)
+        self.assertEqual(Tagging.objects.all(with_deleted=True).count(), 3)
+
+    def test_set_restores_soft_deleted_links(self):
+        self.post.tags.set(self.tags[:1])
+        self.assertEqual(self.post.tags.count(), 1)
+
+        self.post.tags.set(self.tags)
+
+        self.assertEqual(self.post.tags.count(), 3)
+        self.assertEqual(Tagging.objects.all(with_deleted=True).count(), 3)
+        self.assertEqual(Tagging.objects.deleted_only().count(), 0)
+
+    def test_prefetch_related(self):
+        other = baker.make(Post)
+        other.tags.add(self.tags[0])
+        self.post.tags.remove(self.tags[1])
+        self.tags[2].delete()
+
+        posts = {post.pk: post for post in Post.objects.all().prefetch_related('tags')}
+
+        self.assertEqual(list(posts[self.post.pk].tags.all()), [self.tags[0]])
+        self.assertEqual(list(posts[other.pk].tags.all()), [self.tags[0]])
+
+    def test_prefetch_link_removed_from_one_instance(self):
+        other = baker.make(Post)
+        other.tags.add(self.tags[1])
+        self.post.tags.remove(self.tags[1])
+
+        with CaptureQueriesContext(connection) as queries:
+            posts = {post.pk: post for post in Post.objects.all().prefetch_related('tags')}
+            tags = {tag.pk: tag for tag in Tag.objects.all().prefetch_related('posts')}
+
+        self.assertEqual(list(posts[self.post.pk].tags.all()), [self.tags[0], self.tags[2]])
+        self.assertEqual(list(posts[other.pk].tags.all()), [self.tags[1]])
+        self.assertEqual(list(tags[self.tags[1].pk].posts.all()), [other])
+        for query in queries.captured_queries[1::2]:
+            self.assertEqual(query['sql'].count('JOIN "tests_tagging"'), 1)
+
+    def test_delete_post_soft_deletes_links(self):
+        self.post.delete()
+
+        self.assertEqual(Tagging.objects.deleted_only().count(), 3)
+        self.assertEqual(self.tags[0].posts.count(), 0)
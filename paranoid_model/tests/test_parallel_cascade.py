@@ -0,0 +1,132 @@
+import threading
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from model_bakery import baker
+
+from paranoid_model import audit
+from paranoid_model.cascade import Cascade
+from paranoid_model.signals import post_soft_delete
+from paranoid_model.tests.models import Person, Phone, Address, Car
+from paranoid_model.tests.test_audit import MemorySink
+
+
+@override_settings(PARANOID_MODEL_CASCADE_WORKERS=3)
+class TestParallelCascade(TransactionTestCase):
+    def setUp(self):
+        self.person = baker.make(Person)
+        baker.make(Phone, owner=self.person, _quantity=3)
+        baker.make(Address, owner=self.person, _quantity=2)
+        baker.make(Car, owner=self.person)
+
+        # SQLite is always serial: its single writer would fail with
+        # "database table is locked", so the pool's writes take turns.
+        self.threads = {}
+        lock = threading.Lock()
+        write_branch = Cascade._write_branch
+
+        def one_writer(cascade, operation, model, pks, live_only, values):
+            self.threads[model] = threading.current_thread()
+            with lock:
+                return write_branch(cascade, operation, model, pks, live_only, values)
+
+        for patcher in (mock.patch.object(Cascade, 'parallel', lambda cascade: True),
+                        mock.patch.object(Cascade, '_write_branch', one_writer)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_branches_are_written_on_the_pool(self):
+        threads = self.threads
+        self.person.delete()
+
+        self.assertEqual(set(threads), {Phone, Address, Car})
+        self.assertNotIn(threading.current_thread(), threads.values())
+        self.assertEqual(Phone.objects.deleted_only().count(), 3)
+        self.assertEqual(Address.objects.deleted_only().count(), 2)
+        self.assertEqual(Car.objects.deleted_only().count(), 1)
+        self.assertTrue(Person.objects.get_deleted(pk=self.person.pk).is_soft_deleted)
+
+    def test_restore(self):
+        self.person.delete()
+        self.person.restore()
+
+        self.assertEqual(Phone.objects.all().count(), 3)
+        self.assertEqual(Address.objects.all().count(), 2)
+        self.assertEqual(Car.objects.all().count(), 1)
+
+    def test_roots_are_left_live_when_a_branch_fails(self):
+        def fail(cascade, operation, model, pks, live_only, values):
+            if model is Address:
+                raise RuntimeError
+            return 0
+
+        with mock.patch.object(Cascade, '_write_branch', fail):
+            with self.assertRaises(RuntimeError):
+                self.person.delete()
+
+        self.assertFalse(Person.objects.get(pk=self.person.pk).is_soft_deleted)
+
+    def test_committed_branches_send_post_signal_when_a_branch_fails(self):
+        write_branch = Cascade._write_branch
+        senders = []
+
+        def fail(cascade, operation, model, pks, live_only, values):
+            if model is Address:
+                raise RuntimeError
+            return write_branch(cascade, operation, model, pks, live_only, values)
+
+        def receiver(sender, pks, **kwargs):
+            senders.append((sender, len(pks)))
+
+        post_soft_delete.connect(receiver)
+        self.addCleanup(post_soft_delete.disconnect, receiver)
+
+        with mock.patch.object(Cascade, '_write_branch', fail):
+            with self.assertRaises(RuntimeError):
+                self.person.delete()
+
+        self.assertEqual(Phone.objects.deleted_only().count(), 3)
+        self.assertEqual(sorted(senders, key=str), sorted([(Phone, 3), (Car, 1)], key=str))
+
+    def test_committed_branches_are_audited_when_a_branch_fails(self):
+        sink = MemorySink()
+        audit.enable(sink)
+        self.addCleanup(audit.disable)
+        write_branch = Cascade._write_branch
+
+        def fail(cascade, operation, model, pks, live_only, values):
+            if model is Address:
+                raise RuntimeError
+            return write_branch(cascade, operation, model, pks, live_only, values)
+
+        with mock.patch.object(Cascade, '_write_branch', fail):
+            with self.assertRaises(RuntimeError):
+                self.person.delete()
+
+        self.assertEqual(len(sink.writes), 1)
+        self.assertEqual(sorted(record.model.__name__ for record in sink.writes[0]), ['Car', 'Phone', 'Phone', 'Phone'])
+
+    def test_signals_are_sent_once_per_model(self):
+        senders = []
+
+        def receiver(sender, **kwargs):
+            senders.append(sender)
+
+        post_soft_delete.connect(receiver)
+        self.addCleanup(post_soft_delete.disconnect, receiver)
+        self.person.delete()
+
+        self.assertEqual(sorted(senders, key=str), sorted([Person, Phone, Address, Car], key=str))
+
+
+class TestSerialFallback(TestCase):
+    @override_settings(PARANOID_MODEL_CASCADE_WORKERS=3)
+    def test_serial_inside_transaction(self):
+        person = baker.make(Person)
+        self.assertFalse(Cascade(Person, [person.pk], 'default').parallel())
+
+    def test_serial_by_default(self):
+        person = baker.make(Person)
+        with mock.patch('paranoid_model.cascade.ThreadPoolExecutor') as executor:
+            person.delete()
+        executor.assert_not_called()
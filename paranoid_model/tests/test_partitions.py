@@ -0,0 +1,160 @@
+import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from model_bakery import baker
+
+from paranoid_model import partitions
+from paranoid_model.operations import PartitionByDeletedAt
+from paranoid_model.signals import pre_purge, post_purge
+from paranoid_model.tests.models import Event, Folder, Person, Phone
+
+
+class TestPartitionSql(TestCase):
+    def test_meta_option(self):
+        self.assertEqual(Event._meta.paranoid_partition, 'month')
+        self.assertIsNone(Person._meta.paranoid_partition)
+
+    def test_is_ignored_on_sqlite(self):
+        self.assertFalse(partitions.is_partitioned(Event, 'default'))
+        editor = connection.schema_editor(collect_sql=True)
+        self.assertEqual(partitions.partition_sql(editor, Event, 'month'), [])
+        self.assertEqual(partitions.unpartition_sql(editor, Event), [])
+
+    def test_postgresql_sql(self):
+        editor = connection.schema_editor(collect_sql=True)
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            sql = [str(each) for each in partitions.partition_sql(editor, Event, 'state')]
+
+        self.assertIn('PARTITION BY RANGE ("deleted_at")', sql[1])
+        self.assertTrue(any('"tests_event_live" PARTITION OF "tests_event" DEFAULT' in each for each in sql))
+        self.assertTrue(any('"tests_event_deleted" PARTITION OF' in each for each in sql))
+        self.assertTrue(sql[-1].startswith('DROP TABLE "tests_event_unpartitioned"'))
+
+    def test_referenced_table_can_not_be_partitioned(self):
+        with self.assertRaises(ValueError):
+            partitions.check_partitionable(Folder)
+
+    def test_month_helpers(self):
+        month = partitions.month_start(datetime.datetime(2020, 12, 31, 23, 0, tzinfo=datetime.timezone.utc))
+        self.assertEqual(month, datetime.date(2020, 12, 1))
+        self.assertEqual(partitions.next_month(month), datetime.date(2021, 1, 1))
+        self.assertEqual(partitions.month_partition_name(Event, month), 'tests_event_p202012')
+
+    def test_long_table_names_keep_the_suffix(self):
+        model = SimpleNamespace(_meta=SimpleNamespace(db_table='tests_' + 'x' * 70))
+        name = partitions.month_partition_name(model, datetime.date(2020, 12, 1))
+
+        self.assertEqual(len(name), 63)
+        self.assertTrue(name.startswith(partitions.month_partition_prefix(model)))
+        self.assertTrue(name.endswith('_p202012'))
+        self.assertEqual(len(partitions.partition_name(model, 'live')), 63)
+        self.assertTrue(partitions.partition_name(model, 'live').endswith('_live'))
+
+    def test_month_partitions_of_existing_rows_are_named_by_prefix(self):
+        editor = connection.schema_editor(collect_sql=True)
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            sql = [str(each) for each in partitions.partition_sql(editor, Event, 'month')]
+
+        self.assertTrue(any("'tests_event_p' || to_char(month, 'YYYYMM')" in each for each in sql))
+
+    def test_operation(self):
+        self.assertEqual(
+            PartitionByDeletedAt('Event', 'month').deconstruct(),
+            ('PartitionByDeletedAt', ['Event', 'month'], {})
+        )
+        with self.assertRaises(ValueError):
+            PartitionByDeletedAt('Event', 'year')
+
+    @mock.patch.object(partitions, '_checked_months', set())
+    @mock.patch.object(partitions, 'is_partitioned', lambda model, using: True)
+    def test_failed_month_partition_is_not_retried(self):
+        timestamp = timezone.now()
+
+        # SQLite fails to CREATE TABLE ... PARTITION OF, like PostgreSQL does when
+        # the live partition already has rows of the month
+        with self.assertNumQueries(4):  # CREATE inside a savepoint
+            partitions.ensure_month_partition(Event, timestamp, 'default')
+        with self.assertNumQueries(0):
+            partitions.ensure_month_partition(Event, timestamp, 'default')
+
+
+class TestMonthPartitionTransaction(TransactionTestCase):
+    def test_created_before_the_soft_delete_transaction(self):
+        person = baker.make(Person)
+        baker.make(Phone, owner=person)
+        calls = []
+
+        def ensure(model, timestamp, using):
+            calls.append((model, connection.in_atomic_block))
+
+        with mock.patch('paranoid_model.cascade.ensure_month_partition', ensure):
+            person.delete()
+
+        self.assertIn((Person, False), calls)
+        self.assertIn((Phone, False), calls)
+        self.assertEqual({in_atomic_block for _, in_atomic_block in calls}, {False})
+
+
+class TestPurge(TestCase):
+    def test_removed_partition_sends_purge_signals(self):
+        events = baker.make(Event, _quantity=3)
+        sent = []
+        receiver = lambda signal, sender, pks, **kwargs: sent.append((signal, sender, list(pks)))  # noqa: E731
+        pre_purge.connect(receiver, sender=Event)
+        post_purge.connect(receiver, sender=Event)
+        self.addCleanup(pre_purge.disconnect, receiver, sender=Event)
+        self.addCleanup(post_purge.disconnect, receiver, sender=Event)
+
+        # SQLite has no partitions, the whole table stands for one
+        with connection.cursor() as cursor:
+            amount = partitions._remove(cursor, Event, 'tests_event', 'DELETE FROM "tests_event";', 'default')
+
+        pks = sorted(event.pk for event in events)
+        self.assertEqual(amount, 3)
+        self.assertEqual(sent, [(pre_purge, Event, pks), (post_purge, Event, pks)])
+        self.assertFalse(Event.objects.all(with_deleted=True).exists())
+
+    def test_soft_delete_on_sqlite(self):
+        event = baker.make(Event)
+        event.delete()
+        self.assertTrue(Event.objects.get_deleted(pk=event.pk).is_soft_deleted)
+
+    def test_purge(self):
+        live = baker.make(Event)
+        baker.make(Event, _quantity=2)
+        Event.objects.exclude(pk=live.pk).delete()
+
+        self.assertEqual(Event.objects.purge(), 2)
+        self.assertEqual(list(Event.objects.all(with_deleted=True)), [live])
+
+    def test_purge_before(self):
+        old, recent = baker.make(Event, _quantity=2)
+        Event.objects.all().delete()
+        Event.objects.deleted_only().filter(pk=old.pk).update(deleted_at=timezone.now() - datetime.timedelta(days=40))
+
+        self.assertEqual(Event.objects.purge(before=timezone.now() - datetime.timedelta(days=30)), 1)
+        self.assertEqual(list(Event.objects.all(with_deleted=True)), [recent])
+
+    def test_filtered_manager_does_not_purge_partitions(self):
+        person = baker.make(Person)
+        baker.make(Phone, owner=person).delete()
+        baker.make(Phone).delete()
+
+        with mock.patch('paranoid_model.manager.purge_partitions', return_value=0) as purge:
+            self.assertEqual(person.phones.purge(), 1)
+            purge.assert_not_called()
+
+            Phone.objects.purge()
+            purge.assert_called_once_with(Phone, None, 'default')
+
+    def test_queryset_purge_cascade(self):
+        person = baker.make(Person)
+        baker.make('tests.Phone', owner=person)
+        person.delete()
+
+        self.assertEqual(Person.objects.all(with_deleted=True).purge(), 2)
+        self.assertFalse(Person.objects.all(with_deleted=True).exists())
@@ -0,0 +1,119 @@
+import random
+import tracemalloc
+import uuid
+from unittest import mock
+
+from django.test import TestCase, SimpleTestCase, override_settings
+from model_bakery import baker
+
+from paranoid_model.cascade import Cascade
+from paranoid_model.instrumentation import instrument, visited, SOFT_DELETE
+from paranoid_model.pkset import PkSet
+from paranoid_model.tests.models import Person, Phone
+
+
+@mock.patch('paranoid_model.pkset.BUFFER_SIZE', 4)
+class TestPkSet(SimpleTestCase):
+    def setUp(self):
+        self.pks = list(range(1, 200, 2))
+        random.Random(0).shuffle(self.pks)
+
+    def test_set_behavior(self):
+        pks = PkSet(self.pks + self.pks[:10], spill_rows=1000)
+
+        self.assertEqual(len(pks), 100)
+        self.assertEqual(list(pks), sorted(self.pks))
+        self.assertIn(101, pks)
+        self.assertNotIn(100, pks)
+        self.assertEqual(pks.add_new([1, 2, 3, 4]), [2, 4])
+        self.assertEqual(pks.spilled, 0)
+
+    def test_spill(self):
+        pks = PkSet(self.pks, spill_rows=10)
+
+        self.assertGreater(pks.spilled, 50)
+        self.assertEqual(len(pks), 100)
+        self.assertEqual(list(pks), sorted(self.pks))
+        self.assertTrue(all(pk in pks for pk in self.pks))
+        self.assertFalse(any(pk + 1 in pks for pk in self.pks))
+
+        pks.close()
+
+    def test_not_compact_keys(self):
+        pks = PkSet(self.pks, spill_rows=10)
+        key = uuid.uuid4()
+        pks.update([key, 'a', 2 ** 64])
+
+        self.assertFalse(pks.compact)
+        self.assertEqual(len(pks), 103)
+        self.assertEqual(set(pks), set(self.pks) | {key, 'a', 2 ** 64})
+        self.assertEqual(pks.spilled, 0)
+
+    def test_difference(self):
+        pks = PkSet(self.pks, spill_rows=10)
+        self.assertEqual(list(pks.difference(PkSet(range(100)))), sorted(pk for pk in self.pks if pk >= 100))
+
+    @mock.patch('paranoid_model.pkset.BUFFER_SIZE', 4096)
+    def test_memory(self):
+        pks = list(range(50000))
+
+        tracemalloc.start()
+        compact = PkSet(pks, spill_rows=10 ** 6)
+        compact_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        regular = set(pk + 10 ** 6 for pk in pks)
+        regular_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        self.assertEqual(len(compact), len(regular))
+        self.assertLess(compact_size * 3, regular_size)
+
+
+class TestCascadeSpill(TestCase):
+    @override_settings(PARANOID_MODEL_CASCADE_MEMORY_ROWS=8)
+    @mock.patch('paranoid_model.pkset.BUFFER_SIZE', 4)
+    def test_soft_delete_and_restore(self):
+        person = baker.make(Person)
+        baker.make(Phone, owner=person, _quantity=30)
+
+        spill = PkSet._spill
+        spilled = []
+
+        def record(pks, segment):
+            spilled.append(len(segment))
+            return spill(pks, segment)
+
+        cascade = Cascade(Person, [person.pk], 'default')
+        with mock.patch.object(PkSet, '_spill', record):
+            cascade.soft_delete()
+
+        self.assertTrue(spilled)
+        # temporary files are removed once the operation has finished
+        self.assertEqual((cascade.data[Phone].spilled, cascade.data[Phone]._files), (0, []))
+        self.assertEqual(cascade.updated[Phone], 30)
+        self.assertEqual(Phone.objects.deleted_only().count(), 30)
+
+        person.restore()
+        self.assertEqual(Phone.objects.all().count(), 30)
+
+    def test_roots_are_not_copied(self):
+        person = baker.make(Person)
+        baker.make(Phone, owner=person, _quantity=3)
+
+        with mock.patch('paranoid_model.queryset.Cascade', wraps=Cascade) as cascade:
+            Person.objects.all().delete()
+
+        roots = cascade.call_args[0][1]
+        self.assertIsInstance(roots, PkSet)
+        self.assertEqual(len(roots), 1)
+
+    def test_collected_rows_are_given_to_the_operation(self):
+        person = baker.make(Person)
+        baker.make(Phone, owner=person, _quantity=3)
+        cascade = Cascade(Person, [person.pk], 'default')
+
+        with instrument(SOFT_DELETE, Person):
+            cascade.soft_delete()
+            self.assertIs(visited(SOFT_DELETE, 'default')[Phone], cascade.data[Phone])
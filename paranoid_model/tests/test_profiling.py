@@ -0,0 +1,120 @@
+import json
+import threading
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from model_bakery import baker
+
+import paranoid_model
+from paranoid_model import audit
+from paranoid_model.cascade import Cascade
+from paranoid_model.profiling import current_profile
+from paranoid_model.tests.models import Author, Book, Person, Phone, Address
+from paranoid_model.tests.test_audit import MemorySink
+
+
+class TestProfile(TestCase):
+    def setUp(self):
+        self.person = baker.make(Person)
+        baker.make(Phone, owner=self.person, _quantity=3)
+
+    def test_stages(self):
+        with paranoid_model.profile(top=100) as result:
+            self.person.delete()
+
+        report = result.report()
+        self.assertTrue(report['sampled'])
+        self.assertEqual(set(report['stages']), {'discovery', 'write', 'other'})
+        self.assertTrue(all(query['sql'].startswith(('SAVEPOINT', 'RELEASE')) for query in report['heaviest']
+                            if query['stage'] == 'other'))
+        self.assertEqual(report['queries'], sum(stage['queries'] for stage in report['stages'].values()))
+        self.assertIsNone(current_profile())
+
+    def test_signals_and_audit_stages(self):
+        sink = MemorySink()
+        audit.enable(sink)
+        self.addCleanup(audit.disable)
+
+        def receiver(sender, **kwargs):
+            list(Phone.objects.all(with_deleted=True))
+
+        paranoid_model.signals.post_soft_delete.connect(receiver, sender=Phone)
+        self.addCleanup(paranoid_model.signals.post_soft_delete.disconnect, receiver, sender=Phone)
+
+        with paranoid_model.profile() as result:
+            self.person.delete()
+
+        self.assertEqual(result.stages['signals']['queries'], 1)
+        self.assertEqual(len(sink.writes), 1)
+        self.assertNotIn('audit', result.stages)  # the memory sink makes no query
+
+    def test_finish_stage(self):
+        author = baker.make(Author)
+        book = baker.make(Book, author=author)
+
+        with paranoid_model.profile() as result:
+            book.delete(hard_delete=True)
+
+        self.assertEqual(result.stages['finish']['queries'], 1)  # the counter refresh
+
+    def test_other_stage(self):
+        with paranoid_model.profile() as result:
+            list(Person.objects.all())
+
+        self.assertEqual(dict(result.stages), {'other': {'queries': 1, 'duration': result.duration}})
+
+    def test_heaviest_and_explain(self):
+        with paranoid_model.profile(top=2, explain=1) as result:
+            self.person.delete()
+
+        heaviest = result.report()['heaviest']
+        self.assertEqual(len(heaviest), 2)
+        self.assertGreaterEqual(heaviest[0]['duration'], heaviest[1]['duration'])
+        self.assertTrue(heaviest[0]['plan'])
+        self.assertIsNone(heaviest[1]['plan'])
+
+    def test_to_json(self):
+        with paranoid_model.profile(explain=1) as result:
+            self.person.delete()
+
+        self.assertEqual(json.loads(result.to_json())['queries'], result.queries)
+
+    def test_not_sampled(self):
+        with paranoid_model.profile(sample_rate=0) as result:
+            self.person.delete()
+
+        self.assertFalse(result.sampled)
+        self.assertEqual(result.queries, 0)
+
+    def test_nested(self):
+        with paranoid_model.profile() as outer:
+            with paranoid_model.profile() as inner:
+                self.person.delete()
+
+        self.assertFalse(inner.sampled)
+        self.assertGreater(outer.queries, 0)
+
+
+@override_settings(PARANOID_MODEL_CASCADE_WORKERS=2)
+class TestProfileParallelCascade(TransactionTestCase):
+    def test_branch_threads_are_captured(self):
+        person = baker.make(Person)
+        baker.make(Phone, owner=person, _quantity=2)
+        baker.make(Address, owner=person)
+
+        # SQLite has a single writer, see test_parallel_cascade
+        lock = threading.Lock()
+        write_branch = Cascade._write_branch
+
+        def one_writer(*args):
+            with lock:
+                return write_branch(*args)
+
+        with mock.patch.object(Cascade, 'parallel', lambda cascade: True), \
+                mock.patch.object(Cascade, '_write_branch', one_writer):
+            with paranoid_model.profile(top=100) as result:
+                person.delete()
+
+        written = [query for query in result.heaviest() if query.stage == 'write']
+        self.assertTrue(any('tests_phone' in query.sql for query in written))
+        self.assertTrue(any('tests_address' in query.sql for query in written))
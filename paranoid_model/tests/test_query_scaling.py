@@ -0,0 +1,145 @@
+"""
+Query count regression tests: paranoid operations must run a number of
+queries bounded by the models and batches of the cascade, never by its rows.
+
+Set environment variable PARANOID_BENCH_OUTPUT to a file path to record the
+queries and seconds of every size as a JSON artifact.
+"""
+
+
+import json
+import os
+import time
+from functools import partial
+from unittest import mock
+from unittest.mock import MagicMock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from paranoid_model.admin import ParanoidAdmin
+from paranoid_model.cascade import batches
+from paranoid_model.tests.models import Person, Phone, Address, Car, Comment
+
+
+FAN_OUTS = (1, 10, 100)
+DEPTHS = (1, 3, 5)
+
+
+def make_people(fan_out, people=2):
+    """People with ``fan_out`` phones and addresses each, and a car"""
+    people = baker.make(Person, _quantity=people)
+    for person in people:
+        Phone.objects.bulk_create(baker.prepare(Phone, owner=person, _quantity=fan_out))
+        Address.objects.bulk_create(baker.prepare(Address, owner=person, _quantity=fan_out))
+        baker.make(Car, owner=person)
+    return people
+
+
+def make_thread(depth, fan_out=2):
+    """Tree of comments with ``depth`` levels of replies"""
+    root = baker.make(Comment)
+    level = [root]
+    for _ in range(depth):
+        level = [baker.make(Comment, parent=parent) for parent in level for _ in range(fan_out)]
+    return root
+
+
+class TestQueryScaling(TestCase):
+    results = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        path = os.environ.get('PARANOID_BENCH_OUTPUT')
+        if path:
+            with open(path, 'w') as file:
+                json.dump(cls.results, file, indent=2, sort_keys=True)
+
+    def measure(self, name, size, function):
+        """Run function, record its queries and seconds, and return the amount of queries"""
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            function()
+            seconds = time.perf_counter() - start
+
+        self.results.setdefault(name, []).append({
+            'size': size, 'queries': len(queries), 'seconds': seconds,
+        })
+        return len(queries)
+
+    def assertConstant(self, name, sizes, setup, operation):
+        counts = []
+        for size in sizes:
+            sid = connection.savepoint()
+            value = setup(size)
+            counts.append(self.measure(name, size, lambda: operation(value)))
+            connection.savepoint_rollback(sid)
+
+        self.assertEqual(len(set(counts)), 1, '%s queries by size: %s' % (name, dict(zip(sizes, counts))))
+        return counts[0]
+
+    def test_soft_delete_instance(self):
+        self.assertConstant('soft_delete_instance', FAN_OUTS, make_people, lambda people: people[0].delete())
+
+    def test_soft_delete_queryset(self):
+        queries = self.assertConstant(
+            'soft_delete_queryset', FAN_OUTS, make_people, lambda people: Person.objects.all().delete())
+
+        # roots + 3 relations to discover + 4 models to update, plus savepoints
+        self.assertLessEqual(queries, 1 + 3 + 4 + 2)
+
+    def test_restore_queryset(self):
+        def setup(fan_out):
+            make_people(fan_out)
+            Person.objects.all().delete()
+
+        self.assertConstant(
+            'restore_queryset', FAN_OUTS, setup, lambda _: Person.objects.all(with_deleted=True).restore())
+
+    def test_get_or_restore(self):
+        def setup(fan_out):
+            person = make_people(fan_out)[0]
+            person.delete()
+            return person
+
+        self.assertConstant(
+            'get_or_restore', FAN_OUTS, setup, lambda person: Person.objects.get_or_restore(pk=person.pk))
+
+    def test_admin_actions(self):
+        admin = ParanoidAdmin(model=Person, admin_site=MagicMock())
+
+        self.assertConstant(
+            'admin_delete_queryset', FAN_OUTS, make_people,
+            lambda _: admin.delete_queryset(MagicMock(), Person.objects.all()))
+
+        def setup(fan_out):
+            make_people(fan_out)
+            Person.objects.all().delete()
+
+        self.assertConstant(
+            'admin_restore_selected', FAN_OUTS, setup,
+            lambda _: admin.restore_selected(MagicMock(), Person.objects.all(with_deleted=True)))
+
+    def test_queries_grow_with_depth_not_rows(self):
+        for depth in DEPTHS:
+            self.assertConstant(
+                'soft_delete_depth_%s' % depth, (1, 3), lambda fan_out: make_thread(depth, fan_out),
+                lambda root: root.delete())
+
+        by_depth = [self.results['soft_delete_depth_%s' % depth][-1]['queries'] for depth in DEPTHS]
+        # one query to discover each level, every level is updated at once
+        self.assertEqual(by_depth[1] - by_depth[0], DEPTHS[1] - DEPTHS[0])
+        self.assertEqual(by_depth[2] - by_depth[1], DEPTHS[2] - DEPTHS[1])
+
+    def test_queries_grow_with_batches(self):
+        make_people(fan_out=25)
+
+        with mock.patch('paranoid_model.cascade.batches', partial(batches, batch_size=10)):
+            queries = self.measure('soft_delete_batches', 10, lambda: Person.objects.all().delete())
+
+        # roots + 1 batch of 2 people per relation to discover, then
+        # 1 update of people, 5 of 50 phones, 5 of 50 addresses and 1 of cars, plus savepoints
+        self.assertEqual(queries, 1 + 3 + (1 + 5 + 5 + 1) + 2)
@@ -0,0 +1,52 @@
+from django.test import TestCase
+from model_bakery import baker
+
+from paranoid_model.tests.models import Car, Person, Phone
+
+
+class TestRelatedState(TestCase):
+    def setUp(self):
+        self.live = baker.make(Person, name='live')
+        self.dead = baker.make(Person, name='dead')
+        self.carless = baker.make(Person, name='carless')
+
+        self.live_car = baker.make(Car, owner=self.live)
+        self.dead_car = baker.make(Car, owner=self.dead)
+        self.dead_car.delete()
+
+        self.phone = baker.make(Phone, owner=self.live)
+        self.orphan = baker.make(Phone, owner=self.dead)
+        Person.objects.filter(pk=self.dead.pk).update(deleted_at=self.dead_car.deleted_at)
+
+    def test_forward_relation(self):
+        with self.assertNumQueries(1):
+            state = dict(Phone.objects.with_related_state('owner').values_list('pk', 'owner_is_deleted'))
+
+        self.assertEqual(state, {self.phone.pk: False, self.orphan.pk: True})
+
+    def test_reverse_one_to_one(self):
+        queryset = Person.objects.all(with_deleted=True).with_related_state('car')
+
+        self.assertIn('LEFT OUTER JOIN', str(queryset.query))
+        with self.assertNumQueries(1):
+            state = {person.name: person.car_is_deleted for person in queryset}
+
+        self.assertEqual(state, {'live': False, 'dead': True, 'carless': False})
+
+    def test_exclude_dead_related(self):
+        people = Person.objects.all(with_deleted=True).exclude_dead_related('car')
+        self.assertEqual(set(people.values_list('name', flat=True)), {'live', 'carless'})
+
+        phones = Phone.objects.exclude_dead_related('owner')
+        self.assertEqual(list(phones), [self.phone])
+
+    def test_chained(self):
+        state = Phone.objects.all(with_deleted=True).with_related_state('owner').exclude_dead_related('owner')
+        self.assertEqual([phone.owner_is_deleted for phone in state], [False])
+
+    def test_invalid_relation(self):
+        with self.assertRaises(ValueError):
+            Person.objects.with_related_state('phones')
+
+        with self.assertRaises(ValueError):
+            Person.objects.exclude_dead_related('name')
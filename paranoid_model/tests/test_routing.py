@@ -0,0 +1,62 @@
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from paranoid_model.tests.models import Person, Phone
+
+
+class ReplicaRouter:
+    """Router sending every read to db2, like a read replica"""
+
+    def db_for_read(self, model, **hints):
+        return 'db2'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+
+class TestRouting(TestCase):
+    databases = '__all__'
+
+    def test_get_or_restore_using(self):
+        person = baker.make(Person, _save_kwargs={'using': 'db2'})
+        person.delete()
+
+        restored = Person.objects.using('db2').get_or_restore(pk=person.pk, using='db2')
+
+        self.assertFalse(restored.is_soft_deleted)
+        self.assertFalse(Person.objects.using('db2').get(pk=person.pk).is_soft_deleted)
+
+    def test_cascade_is_read_from_written_database_by_default(self):
+        person = baker.make(Person)
+        baker.make(Phone, owner=person)
+
+        with override_settings(DATABASE_ROUTERS=[ReplicaRouter()]):
+            with CaptureQueriesContext(connections['db2']) as replica:
+                person.delete()
+
+        self.assertEqual(len(replica), 0)
+        self.assertEqual(Phone.objects.deleted_only().count(), 1)
+
+    @override_settings(PARANOID_MODEL_CASCADE_READ_DATABASE='read')
+    def test_cascade_is_read_from_replica(self):
+        person = baker.make(Person)
+        baker.make(Phone, owner=person)
+
+        with override_settings(DATABASE_ROUTERS=[ReplicaRouter()]):
+            with CaptureQueriesContext(connections['db2']) as replica:
+                person.delete()
+
+        self.assertTrue(replica.captured_queries)
+        self.assertTrue(all(query['sql'].startswith('SELECT') for query in replica.captured_queries))
+
+    @override_settings(PARANOID_MODEL_CASCADE_READ_DATABASE='read')
+    def test_explicit_database_is_not_sent_to_replica(self):
+        person = baker.make(Person, _save_kwargs={'using': 'db2'})
+        baker.make(Phone, owner=person, _save_kwargs={'using': 'db2'})
+
+        with override_settings(DATABASE_ROUTERS=[ReplicaRouter()]):
+            person.delete(using='db2')
+
+        self.assertEqual(Phone.objects.using('db2').deleted_only().count(), 1)
@@ -0,0 +1,78 @@
+from django.db.models.signals import pre_save, post_save
+from django.test import TestCase
+from model_bakery import baker
+
+from paranoid_model import signals
+from paranoid_model.tests.models import Person, Phone, Address
+
+
+class TestSoftDeleteSignals(TestCase):
+    def setUp(self):
+        self.received = []
+        for signal in (signals.pre_soft_delete, signals.post_soft_delete,
+                       signals.pre_restore, signals.post_restore, pre_save, post_save):
+            signal.connect(self.receiver)
+            self.addCleanup(signal.disconnect, self.receiver)
+
+    def receiver(self, signal, sender, **kwargs):
+        self.received.append((signal, sender, kwargs))
+
+    def signals_sent(self, signal):
+        return [(sender, kwargs) for sent, sender, kwargs in self.received if sent is signal]
+
+    def test_soft_delete_sends_one_signal_per_model(self):
+        person = baker.make(Person)
+        phones = baker.make(Phone, owner=person, _quantity=3)
+        address = baker.make(Address, owner=person)
+        self.received.clear()
+
+        person.delete()
+
+        pre = self.signals_sent(signals.pre_soft_delete)
+        post = self.signals_sent(signals.post_soft_delete)
+        self.assertEqual([sender for sender, _ in pre], [Person, Phone, Address])
+        self.assertEqual([sender for sender, _ in post], [Person, Phone, Address])
+
+        pks = {sender: set(kwargs['pks']) for sender, kwargs in post}
+        self.assertEqual(pks[Person], {person.pk})
+        self.assertEqual(pks[Phone], {phone.pk for phone in phones})
+        self.assertEqual(pks[Address], {address.pk})
+        self.assertEqual(post[0][1]['deleted_at'], person.deleted_at)
+        self.assertEqual(post[0][1]['using'], 'default')
+
+    def test_soft_delete_does_not_send_save_signals(self):
+        person = baker.make(Person)
+        baker.make(Phone, owner=person, _quantity=3)
+        self.received.clear()
+
+        person.delete()
+        Phone.objects.all().delete()
+
+        self.assertEqual(self.signals_sent(pre_save), [])
+        self.assertEqual(self.signals_sent(post_save), [])
+
+    def test_restore_sends_one_signal_per_model(self):
+        person = baker.make(Person)
+        baker.make(Phone, owner=person, _quantity=3)
+        person.delete()
+        self.received.clear()
+
+        person.restore()
+
+        pre = self.signals_sent(signals.pre_restore)
+        post = self.signals_sent(signals.post_restore)
+        self.assertEqual([sender for sender, _ in pre], [Person, Phone])
+        self.assertEqual(len(post[1][1]['pks']), 3)
+        self.assertEqual(self.signals_sent(post_save), [])
+
+    def test_queryset_delete_sends_one_signal_per_model(self):
+        for person in baker.make(Person, _quantity=5):
+            baker.make(Phone, owner=person, _quantity=2)
+        self.received.clear()
+
+        Person.objects.all().delete()
+
+        post = self.signals_sent(signals.post_soft_delete)
+        self.assertEqual([sender for sender, _ in post], [Person, Phone])
+        self.assertEqual(len(post[0][1]['pks']), 5)
+        self.assertEqual(len(post[1][1]['pks']), 10)
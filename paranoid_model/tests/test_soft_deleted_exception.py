@@ -1,10 +1,17 @@
+import threading
+import time
+from unittest import mock
+
+from django.apps.registry import Apps
 from django.core.exceptions import ObjectDoesNotExist
 from django.http import Http404
 import django.shortcuts
-from django.test import TestCase
+from django.db.models.base import subclass_exception
+from django.test import SimpleTestCase, TestCase
 from model_bakery import baker
 
 from paranoid_model.exceptions import SoftDeleted
+from paranoid_model.models import Paranoid, SoftDeletedDescriptor
 from paranoid_model.tests.models import Person
 
 
@@ -25,3 +32,73 @@ class TestSoftDeletedExceptions(TestCase):
 
         with self.assertRaises(Person.SoftDeleted):
             Person.objects.get(id=person.id)
+
+
+def make_models(amount, apps):
+    """Create ``amount`` Paranoid models, registered on apps"""
+    for i in range(amount):
+        meta = type('Meta', (), {'app_label': 'bench', 'apps': apps})
+        type('Model%d' % i, (Paranoid,), {'__module__': __name__, 'Meta': meta})
+
+
+class TestLazySoftDeleted(SimpleTestCase):
+    def setUp(self):
+        self.apps = Apps()
+
+        class Meta:
+            app_label = 'bench'
+            apps = self.apps
+
+        self.model = type('Lazy', (Paranoid,), {'__module__': __name__, 'Meta': Meta})
+
+    def test_is_created_on_first_access(self):
+        self.assertNotIn(SoftDeletedDescriptor.cache_name, self.model.__dict__)
+
+        exception = self.model.SoftDeleted
+        self.assertIs(self.model.__dict__[SoftDeletedDescriptor.cache_name], exception)
+        self.assertIs(self.model.SoftDeleted, exception)
+        self.assertEqual(exception.__qualname__, 'Lazy.SoftDeleted')
+
+    def test_abstract_model_has_no_exception(self):
+        self.assertFalse(hasattr(Paranoid, 'SoftDeleted'))
+
+    def test_multi_table_inheritance(self):
+        meta = type('Meta', (), {'app_label': 'bench', 'apps': self.apps})
+        child = type('LazyChild', (self.model,), {'__module__': __name__, 'Meta': meta})
+
+        self.assertIsNot(child.SoftDeleted, self.model.SoftDeleted)
+        self.assertTrue(issubclass(child.SoftDeleted, self.model.SoftDeleted))
+        self.assertTrue(issubclass(child.SoftDeleted, child.DoesNotExist))
+        self.assertTrue(issubclass(child.SoftDeleted, SoftDeleted))
+
+    def test_class_creation_does_not_build_the_exception(self):
+        apps = Apps()
+        make_models(20, apps)
+
+        created = list(apps.all_models['bench'].values())
+        self.assertEqual(len(created), 20)
+        for model in created:
+            self.assertNotIn(SoftDeletedDescriptor.cache_name, model.__dict__)
+
+    def test_threads_get_the_same_class(self):
+        def slow_subclass_exception(*args, **kwargs):
+            time.sleep(0.05)
+            return subclass_exception(*args, **kwargs)
+
+        barrier = threading.Barrier(4)
+        found = []
+
+        def access():
+            barrier.wait()
+            found.append(self.model.SoftDeleted)
+
+        with mock.patch('paranoid_model.models.subclass_exception', slow_subclass_exception):
+            threads = [threading.Thread(target=access) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(found), 4)
+        self.assertEqual(len(set(found)), 1)
+        self.assertIs(found[0], self.model.SoftDeleted)
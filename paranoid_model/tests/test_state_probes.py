@@ -0,0 +1,68 @@
+from unittest.mock import MagicMock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from paranoid_model.admin import ParanoidAdmin
+from paranoid_model.tests.models import Person
+
+
+class TestSoftDeleteState(TestCase):
+    def test_state_of_many_pks(self):
+        live, deleted, hard_deleted = baker.make(Person, _quantity=3)
+        deleted.delete()
+        hard_deleted_pk = hard_deleted.pk
+        hard_deleted.delete(hard_delete=True)
+
+        with CaptureQueriesContext(connection) as queries:
+            state = Person.objects.soft_delete_state([live.pk, deleted.pk, hard_deleted_pk])
+
+        self.assertEqual(state, {live.pk: None, deleted.pk: deleted.deleted_at})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"name"', queries[0]['sql'])
+
+    def test_empty(self):
+        self.assertEqual(Person.objects.soft_delete_state([]), {})
+
+
+class TestGetDeletedProbe(TestCase):
+    def test_live_instance_is_not_loaded(self):
+        person = baker.make(Person)
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.assertRaises(Person.IsNotSoftDeleted):
+                Person.objects.get_deleted(name=person.name)
+
+        # the probe selects only pk and deleted_at
+        self.assertNotIn('"name"', queries[-1]['sql'].split(' FROM ')[0])
+
+    def test_missing_instance(self):
+        with self.assertRaises(Person.DoesNotExist):
+            Person.objects.get_deleted(name='missing')
+
+    def test_deleted_instance_is_a_single_query(self):
+        person = baker.make(Person)
+        person.delete()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(Person.objects.get_deleted(name=person.name), person)
+
+
+class TestGetWithDeleted(TestCase):
+    def test_get_with_deleted(self):
+        person = baker.make(Person)
+        person.delete()
+
+        with self.assertRaises(Person.SoftDeleted):
+            Person.objects.get(pk=person.pk)
+        self.assertEqual(Person.objects.get(pk=person.pk, with_deleted=True), person)
+
+    def test_admin_get_object_is_a_single_query(self):
+        person = baker.make(Person)
+        person.delete()
+        admin = ParanoidAdmin(model=Person, admin_site=MagicMock())
+
+        with self.assertNumQueries(1):
+            self.assertEqual(admin.get_object(MagicMock(), person.pk), person)
@@ -0,0 +1,133 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from paranoid_model import triggers
+from paranoid_model.operations import InstallCascadeTriggers
+from paranoid_model.signals import post_soft_delete
+from paranoid_model.tests.models import Folder, Document, Page, Person
+
+
+class TestCascadeTriggers(TestCase):
+    def setUp(self):
+        with connection.cursor() as cursor:
+            for sql in triggers.install_sql(connection, Folder):
+                cursor.execute(sql)
+        triggers.installed.cache_clear()
+        self.addCleanup(triggers.installed.cache_clear)
+
+    def test_meta_option(self):
+        self.assertTrue(Folder._meta.paranoid_db_cascade)
+        self.assertFalse(Person._meta.paranoid_db_cascade)
+
+    def test_trigger_relations(self):
+        self.assertEqual(
+            triggers.trigger_relations(Folder),
+            ((Document, Document._meta.get_field('folder')),)
+        )
+
+    def test_soft_delete_is_made_by_database(self):
+        folder = baker.make(Folder)
+        baker.make(Document, folder=folder, _quantity=3)
+
+        with CaptureQueriesContext(connection) as queries:
+            folder.delete()
+
+        # the triggers stamped every document, the cascade's own UPDATE leaves them out
+        updates = [query['sql'] for query in queries.captured_queries
+                   if query['sql'].startswith('UPDATE "%s"' % Document._meta.db_table)]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('NOT', updates[0])
+        self.assertEqual(Document.objects.deleted_only().count(), 3)
+        self.assertEqual(
+            set(Document.objects.values_list('deleted_at', flat=True)),
+            {folder.deleted_at}
+        )
+
+    def test_cascade_below_triggers(self):
+        folder = baker.make(Folder)
+        document = baker.make(Document, folder=folder)
+        baker.make(Page, document=document, _quantity=2)
+
+        senders = []
+        receiver = lambda sender, **kwargs: senders.append((sender, list(kwargs['pks'])))  # noqa: E731
+        post_soft_delete.connect(receiver)
+        self.addCleanup(post_soft_delete.disconnect, receiver)
+
+        folder.delete()
+
+        self.assertEqual(Page.objects.deleted_only().count(), 2)
+        self.assertEqual([sender for sender, _ in senders], [Folder, Document, Page])
+        self.assertEqual(senders[1][1], [document.pk])
+
+        Folder.objects.get_deleted(pk=folder.pk).restore()
+        self.assertEqual(Page.objects.all().count(), 2)
+
+    def test_same_result_as_without_triggers(self):
+        def delete_tree():
+            folder = baker.make(Folder)
+            deleted, live = baker.make(Document, folder=folder, _quantity=2)
+            deleted.delete()
+            Folder.objects.filter(pk=folder.pk).update(deleted_at=deleted.deleted_at)  # soft deleted before
+            Folder.objects.get_deleted(pk=folder.pk).delete()
+
+            folder = Folder.objects.get_deleted(pk=folder.pk)
+            return {
+                document.deleted_at == folder.deleted_at
+                for document in Document.objects.filter(folder=folder, with_deleted=True)
+            }
+
+        with_triggers = delete_tree()
+        with connection.cursor() as cursor:
+            for sql in triggers.drop_sql(connection, Folder):
+                cursor.execute(sql)
+        triggers.installed.cache_clear()
+
+        self.assertEqual(with_triggers, {True})
+        self.assertEqual(delete_tree(), with_triggers)
+
+    def test_restore_is_made_by_database(self):
+        folder = baker.make(Folder)
+        baker.make(Document, folder=folder, _quantity=3)
+        folder.delete()
+
+        folder.restore()
+
+        self.assertEqual(Document.objects.all().count(), 3)
+
+    def test_installed(self):
+        self.assertTrue(triggers.installed(Folder, 'default'))
+        self.assertFalse(triggers.installed(Person, 'default'))
+
+    def test_without_triggers_cascade_is_made_by_python(self):
+        with connection.cursor() as cursor:
+            for sql in triggers.drop_sql(connection, Folder):
+                cursor.execute(sql)
+        triggers.installed.cache_clear()
+
+        folder = baker.make(Folder)
+        baker.make(Document, folder=folder)
+
+        with CaptureQueriesContext(connection) as queries:
+            folder.delete()
+
+        self.assertTrue(any(
+            Document._meta.db_table in query['sql'] for query in queries.captured_queries
+        ))
+        self.assertEqual(Document.objects.deleted_only().count(), 1)
+
+
+class TestInstallCascadeTriggersOperation(TestCase):
+    def test_deconstruct(self):
+        operation = InstallCascadeTriggers('Folder')
+
+        self.assertEqual(operation.deconstruct(), ('InstallCascadeTriggers', ['Folder'], {}))
+        self.assertEqual(operation.describe(), 'Install soft delete cascade triggers on Folder')
+
+    def test_unsupported_database_has_no_sql(self):
+        class Connection:
+            vendor = 'oracle'
+
+        self.assertEqual(triggers.install_sql(Connection(), Folder), [])
+        self.assertEqual(triggers.drop_sql(Connection(), Folder), [])
@@ -0,0 +1,174 @@
+"""
+File with the database triggers that soft delete and restore on cascade.
+When a row's ``deleted_at`` changes from NULL to a date, the triggers soft
+delete its live children, and when it changes back to NULL they restore its
+soft deleted children. Children's own triggers continue the cascade.
+
+Install them with paranoid_model.operations.InstallCascadeTriggers and set
+``paranoid_db_cascade = True`` on the model's Meta.
+"""
+
+
+from functools import lru_cache
+
+from django.db import connections, models
+from django.db.backends.utils import truncate_name
+
+
+SUPPORTED_VENDORS = ('postgresql', 'sqlite')
+
+
+def _local_deleted_at(model):
+    """Field deleted_at when it is a column of model's own table, otherwise None"""
+    for field in model._meta.local_concrete_fields:
+        if field.name == 'deleted_at':
+            return field
+    return None
+
+
+def trigger_relations(model):
+    """
+    Relations soft deleted and restored by model's triggers
+    Args:
+        model: model class, may be a historical model from migrations
+    Returns:
+        tuple((related_model, field))
+    """
+    if _local_deleted_at(model) is None:
+        return ()
+
+    return tuple(
+        (related.related_model, related.field)
+        for related in model._meta.related_objects
+        if (related.one_to_one or related.one_to_many) and
+        related.field.concrete and
+        related.field.remote_field.on_delete is models.CASCADE and
+        _local_deleted_at(related.related_model) is not None
+    )
+
+
+def _name(model, suffix):
+    return truncate_name('paranoid_%s_%s' % (model._meta.db_table, suffix), 63)
+
+
+def _updates(connection, model, new):
+    """UPDATE statements of children, for soft delete and for restore"""
+    qn = connection.ops.quote_name
+    deletes, restores = [], []
+
+    for related_model, field in trigger_relations(model):
+        where = '%s = %s.%s' % (qn(field.column), new, qn(field.target_field.column))
+        table = qn(related_model._meta.db_table)
+
+        deletes.append(
+            'UPDATE %s SET %s = %s.%s, %s = %s.%s WHERE %s AND %s IS NULL;' % (
+                table, qn('deleted_at'), new, qn('deleted_at'),
+                qn('updated_at'), new, qn('deleted_at'), where, qn('deleted_at'))
+        )
+        restores.append(
+            'UPDATE %s SET %s = NULL, %s = %s.%s WHERE %s AND %s IS NOT NULL;' % (
+                table, qn('deleted_at'), qn('updated_at'), new, qn('updated_at'),
+                where, qn('deleted_at'))
+        )
+    return deletes, restores
+
+
+@lru_cache(maxsize=None)
+def installed(model, using):
+    """
+    Check if model's triggers are installed on a database, like when its
+    migrations have not run there. Cached until InstallCascadeTriggers runs.
+    Args:
+        model: model class
+        using: database alias
+    Returns:
+        bool
+    """
+    connection = connections[using]
+    if connection.vendor not in SUPPORTED_VENDORS or not trigger_relations(model):
+        return False
+
+    table = model._meta.db_table
+    if connection.vendor == 'sqlite':
+        names = [_name(model, 'delete'), _name(model, 'restore')]
+        sql = "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s AND name IN (%s, %s)"
+    else:
+        names = [_name(model, 'cascade')]
+        sql = 'SELECT COUNT(*) FROM pg_trigger WHERE tgrelid = %s::regclass AND tgname = %s'
+        table = connection.ops.quote_name(table)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table] + names)
+        return cursor.fetchone()[0] == len(names)
+
+
+def install_sql(connection, model):
+    """
+    SQL statements to install model's triggers
+    Args:
+        connection: database connection
+        model: model class
+    Returns:
+        list(str)
+    """
+    if connection.vendor not in SUPPORTED_VENDORS:
+        return []
+
+    deletes, restores = _updates(connection, model, 'NEW')
+    if not deletes:
+        return []
+
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    deleted_at = qn('deleted_at')
+
+    if connection.vendor == 'sqlite':
+        trigger = (
+            'CREATE TRIGGER %s AFTER UPDATE OF %s ON %s FOR EACH ROW '
+            'WHEN OLD.%s IS %s AND NEW.%s IS %s BEGIN %s END;'
+        )
+        return [
+            trigger % (qn(_name(model, 'delete')), deleted_at, table,
+                       deleted_at, 'NULL', deleted_at, 'NOT NULL', ' '.join(deletes)),
+            trigger % (qn(_name(model, 'restore')), deleted_at, table,
+                       deleted_at, 'NOT NULL', deleted_at, 'NULL', ' '.join(restores)),
+        ]
+
+    function = qn(_name(model, 'cascade'))
+    return [
+        'CREATE OR REPLACE FUNCTION %s() RETURNS trigger AS $$ BEGIN '
+        'IF OLD.%s IS NULL AND NEW.%s IS NOT NULL THEN %s '
+        'ELSIF OLD.%s IS NOT NULL AND NEW.%s IS NULL THEN %s '
+        'END IF; RETURN NULL; END; $$ LANGUAGE plpgsql;' % (
+            function, deleted_at, deleted_at, ' '.join(deletes),
+            deleted_at, deleted_at, ' '.join(restores)),
+        'CREATE TRIGGER %s AFTER UPDATE OF %s ON %s FOR EACH ROW EXECUTE PROCEDURE %s();' % (
+            function, deleted_at, table, function),
+    ]
+
+
+def drop_sql(connection, model):
+    """
+    SQL statements to drop model's triggers
+    Args:
+        connection: database connection
+        model: model class
+    Returns:
+        list(str)
+    """
+    if connection.vendor not in SUPPORTED_VENDORS:
+        return []
+
+    qn = connection.ops.quote_name
+
+    if connection.vendor == 'sqlite':
+        return [
+            'DROP TRIGGER IF EXISTS %s;' % qn(_name(model, 'delete')),
+            'DROP TRIGGER IF EXISTS %s;' % qn(_name(model, 'restore')),
+        ]
+
+    function = qn(_name(model, 'cascade'))
+    return [
+        'DROP TRIGGER IF EXISTS %s ON %s;' % (function, qn(model._meta.db_table)),
+        'DROP FUNCTION IF EXISTS %s();' % function,
+    ]
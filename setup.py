@@ -4,7 +4,7 @@ with open('README.md', 'r') as fh:
     long_description = fh.read()
 
 requires = [
-    'Django>=1.11.0',
+    'Django>=3.1',
 ]
 
 extras_require = {
@@ -44,7 +44,7 @@ setuptools.setup(
     ],
     install_requires=requires,
     extras_require=extras_require,
-    python_requires='>=3.4',
+    python_requires='>=3.6',
 
     project_urls={
         'Bug Reports': 'https://github.com/DarknessRdg/django-paranoid-model/issues',